@@ -21,43 +21,14 @@ from adapters.naohai.semantic_actions.actions import (
 )
 
 # Preserve core adapter capabilities
-import asyncio
 from concurrent.futures import Future as ThreadFuture
-import threading
+from core.async_bridge import AsyncLoopThread
 from core.events.event_bus import EventBus
 from core.monitoring.metrics_db import MetricsDB
 from core.monitoring.service import MonitoringService
 from core.plugins.plugin_manager import PluginManager
 from core.protocol.scenario_context import ScenarioContext
 
-class _AsyncLoopThread:
-    def __init__(self):
-        self._loop = asyncio.new_event_loop()
-        self._thread = threading.Thread(target=self._run, name="naohai-adapter-loop", daemon=True)
-        self._ready = threading.Event()
-        self._thread.start()
-        self._ready.wait(timeout=2)
-
-    def _run(self) -> None:
-        asyncio.set_event_loop(self._loop)
-        self._ready.set()
-        self._loop.run_forever()
-
-    def run(self, coro) -> Any:
-        fut = asyncio.run_coroutine_threadsafe(coro, self._loop)
-        return fut.result(timeout=5)
-
-    def start(self, coro) -> ThreadFuture:
-        return asyncio.run_coroutine_threadsafe(coro, self._loop)
-
-    def stop(self) -> None:
-        self._loop.call_soon_threadsafe(self._loop.stop)
-        self._thread.join(timeout=2)
-        try:
-            self._loop.close()
-        except Exception:
-            pass
-
 class NaohaiAdapter(BaseAdapter):
     """
     鬧海业务适配器实现
@@ -67,7 +38,7 @@ class NaohaiAdapter(BaseAdapter):
         self._selectors_raw: Dict[str, Any] = {}
         self._selectors_flat: Dict[str, str] = {}
         self._semantic_actions: Dict[str, Type[SemanticAction]] = {}
-        self._loop_thread = _AsyncLoopThread()
+        self._loop_thread = AsyncLoopThread(name="naohai-adapter-loop")
         self.event_bus: Optional[EventBus] = None
         self._event_bus_future: Optional[ThreadFuture] = None
         self.plugin_manager: Optional[PluginManager] = None
@@ -149,7 +120,10 @@ class NaohaiAdapter(BaseAdapter):
             return
         if not self.event_bus:
             raise RuntimeError("Event system not initialized")
-        metrics_db = MetricsDB(persist_path=kwargs.get('persist_path'))
+        metrics_db = MetricsDB(
+            persist_path=kwargs.get('persist_path'),
+            max_records_per_domain=kwargs.pop('max_records_per_domain', None),
+        )
         self.monitoring = MonitoringService(metrics_db=metrics_db, slo_definitions=kwargs.get('slo_definitions', {}))
         self.monitoring.attach_event_bus(self.event_bus, **kwargs)
 
@@ -180,4 +154,7 @@ class NaohaiAdapter(BaseAdapter):
         if self.plugin_manager:
             try: self._loop_thread.run(self.plugin_manager.unload_plugins())
             except: pass
+        if self.monitoring:
+            try: self.monitoring.close()
+            except: pass
         self._loop_thread.stop()
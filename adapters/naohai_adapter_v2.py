@@ -1,11 +1,10 @@
 from __future__ import annotations
 
-import asyncio
-import threading
 from concurrent.futures import Future as ThreadFuture
 from pathlib import Path
 from typing import Any, Callable, Dict, List, Optional
 
+from core.async_bridge import AsyncLoopThread
 from core.events.event_bus import EventBus
 from core.monitoring.metrics_db import MetricsDB
 from core.monitoring.service import MonitoringService
@@ -13,40 +12,11 @@ from core.plugins.plugin_manager import PluginManager
 from core.protocol.scenario_context import ScenarioContext
 
 
-class _AsyncLoopThread:
-    def __init__(self):
-        self._loop = asyncio.new_event_loop()
-        self._thread = threading.Thread(target=self._run, name="naohai-adapter-v2-loop", daemon=True)
-        self._ready = threading.Event()
-        self._thread.start()
-        self._ready.wait(timeout=2)
-
-    def _run(self) -> None:
-        asyncio.set_event_loop(self._loop)
-        self._ready.set()
-        self._loop.run_forever()
-
-    def run(self, coro) -> Any:
-        fut = asyncio.run_coroutine_threadsafe(coro, self._loop)
-        return fut.result(timeout=5)
-
-    def start(self, coro) -> ThreadFuture:
-        return asyncio.run_coroutine_threadsafe(coro, self._loop)
-
-    def stop(self) -> None:
-        self._loop.call_soon_threadsafe(self._loop.stop)
-        self._thread.join(timeout=2)
-        try:
-            self._loop.close()
-        except Exception:
-            pass
-
-
 class NaohaiAdapterV2:
     """Backward-compatible adapter used by existing unit tests."""
 
     def __init__(self):
-        self._loop_thread = _AsyncLoopThread()
+        self._loop_thread = AsyncLoopThread(name="naohai-adapter-v2-loop")
         self.event_bus: Optional[EventBus] = None
         self._event_bus_future: Optional[ThreadFuture] = None
 
@@ -69,12 +39,13 @@ class NaohaiAdapterV2:
         domains_by_event_prefix: Dict[str, str],
         event_types: List[str],
         persist_path: Optional[str] = None,
+        max_records_per_domain: Optional[int] = None,
     ) -> None:
         if self.monitoring is not None:
             return
         if not self.event_bus:
             raise RuntimeError("Event system not initialized; call init_event_system() first")
-        metrics_db = MetricsDB(persist_path=persist_path)
+        metrics_db = MetricsDB(persist_path=persist_path, max_records_per_domain=max_records_per_domain)
         self.monitoring = MonitoringService(metrics_db=metrics_db, slo_definitions=slo_definitions)
         self.monitoring.attach_event_bus(
             self.event_bus,
@@ -176,7 +147,7 @@ class NaohaiAdapterV2:
                 pass
             self.plugin_manager = None
 
-        self.monitoring = None
+        monitoring, self.monitoring = self.monitoring, None
 
         if self.event_bus:
             self.event_bus.stop()
@@ -185,4 +156,9 @@ class NaohaiAdapterV2:
                     self._event_bus_future.result(timeout=2)
                 except Exception:
                     pass
+        if monitoring:
+            try:
+                monitoring.close()
+            except Exception:
+                pass
         self._loop_thread.stop()
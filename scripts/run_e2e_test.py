@@ -34,10 +34,7 @@ from executor import WorkflowExecutor
 from browser import BrowserManager
 from reporter import DecisionReporter
 
-from e2e.golden_path_validator import (
-    evaluate_golden_path_coverage,
-    validate_golden_path_workflow,
-)
+from e2e.golden_path_validator import analyze_golden_path
 
 
 class E2ETestRunner:
@@ -67,8 +64,7 @@ class E2ETestRunner:
             return False
 
         workflow = Workflow.from_yaml(workflow_path.read_text(encoding="utf-8"))
-        validation_errors = validate_golden_path_workflow(workflow)
-        coverage = evaluate_golden_path_coverage(workflow)
+        validation_errors, coverage = analyze_golden_path(workflow)
 
         if validation_errors:
             print("❌ 黄金路径工作流结构校验失败：")
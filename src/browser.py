@@ -5,15 +5,144 @@
 
 from __future__ import annotations
 
+import hashlib
 import json
 import logging
 import os
+import re
 import time
 import asyncio
 from pathlib import Path
 from typing import Optional, Dict, Any, Tuple
 
-from playwright.async_api import async_playwright, Browser, BrowserContext, Page
+from playwright.async_api import async_playwright, Browser, BrowserContext, Locator, Page
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _json_loads(data: bytes) -> Any:
+    return orjson.loads(data) if orjson is not None else json.loads(data)
+
+
+def _json_dumps(obj: Any) -> str:
+    # orjson 默认输出 UTF-8 且不转义非 ASCII，与 json.dumps(ensure_ascii=False) 等价
+    return orjson.dumps(obj).decode("utf-8") if orjson is not None else json.dumps(obj, ensure_ascii=False)
+
+
+# 认证错误识别规则：模块加载时一次性编译，避免每个响应重复做多次子串/lower() 扫描
+_AUTH_CODE = 50008
+_AUTH_CODE_STR = "50008"
+_AUTH_TOKEN_RE = re.compile(r"令牌|token", re.IGNORECASE)
+_AUTH_EXPIRED_RE = re.compile(r"过期|expired", re.IGNORECASE)
+_AUTH_CODE_BYTES = _AUTH_CODE_STR.encode("ascii")
+_AUTH_TOKEN_BYTES_RE = re.compile(rb"token|\\u4ee4\\u724c|" + re.escape("令牌".encode("utf-8")), re.IGNORECASE)
+_AUTH_EXPIRED_BYTES_RE = re.compile(rb"expired|\\u8fc7\\u671f|" + re.escape("过期".encode("utf-8")), re.IGNORECASE)
+_AUTH_TEXT_TOKEN_BYTES = "请求令牌".encode("utf-8")
+_AUTH_TEXT_EXPIRED_BYTES = "过期".encode("utf-8")
+
+# session_state 注入脚本缓存：payload 摘要 -> 脚本文本，多个 context 共享同一登录态时复用
+_INIT_SCRIPT_CACHE: Dict[str, str] = {}
+_INIT_SCRIPT_CACHE_MAX = 32
+
+# 不参与认证检测的静态资源类型（Playwright request.resource_type）
+_STATIC_RESOURCE_TYPES = frozenset({"image", "stylesheet", "font", "media", "manifest", "texttrack"})
+
+# Playwright 共享：启动 driver 子进程代价较高，同一事件循环内的多个 BrowserManager 通过引用计数共享一个实例。
+# 同一启动参数的 Browser 进程也在存活的 BrowserManager 之间共享，每个实例只创建独立的 BrowserContext。
+# Playwright 对象与 asyncio 原语都绑定创建时的事件循环，因此共享状态按事件循环分开保存；
+# 启动过程用 Task/Future 表示，并发调用者等待同一个结果，而不是在锁内串行启动。
+class _LoopPlaywright:
+    """单个事件循环内共享的 Playwright 实例与 Browser 进程"""
+
+    __slots__ = ("starting", "refs", "browsers")
+
+    def __init__(self, loop: asyncio.AbstractEventLoop):
+        self.starting: asyncio.Task = loop.create_task(async_playwright().start())
+        self.refs = 0
+        self.browsers: Dict[Tuple[Any, ...], asyncio.Future] = {}
+
+
+_PW_STATES: Dict[asyncio.AbstractEventLoop, _LoopPlaywright] = {}
+
+
+async def _acquire_playwright():
+    loop = asyncio.get_running_loop()
+    # 已关闭循环上的实例无法再 stop（driver 随循环一起失效），只丢弃引用
+    for stale in [l for l in _PW_STATES if l.is_closed()]:
+        del _PW_STATES[stale]
+    state = _PW_STATES.get(loop)
+    if state is None:
+        state = _PW_STATES[loop] = _LoopPlaywright(loop)
+    state.refs += 1
+    try:
+        return await asyncio.shield(state.starting)
+    except BaseException:
+        if state.starting.done() and not state.starting.cancelled() and state.starting.exception() is not None:
+            # 启动失败：移除状态，下一次调用重新启动
+            if _PW_STATES.get(loop) is state:
+                del _PW_STATES[loop]
+            state.refs = 0
+            raise
+        await _release_state(loop, state)
+        raise
+
+
+async def _release_state(loop: asyncio.AbstractEventLoop, state: _LoopPlaywright) -> None:
+    state.refs -= 1
+    if state.refs > 0:
+        return
+    if _PW_STATES.get(loop) is state:
+        del _PW_STATES[loop]
+    state.browsers.clear()
+    playwright = await state.starting
+    await playwright.stop()
+
+
+async def _release_playwright(playwright) -> None:
+    loop = asyncio.get_running_loop()
+    state = _PW_STATES.get(loop)
+    if (
+        state is None
+        or not state.starting.done()
+        or state.starting.cancelled()
+        or state.starting.exception() is not None
+        or state.starting.result() is not playwright
+    ):
+        # 其它事件循环遗留的实例，直接停止
+        await playwright.stop()
+        return
+    await _release_state(loop, state)
+
+
+async def _acquire_browser(launcher, key: Tuple[Any, ...], launch_options: Dict[str, Any]) -> Browser:
+    loop = asyncio.get_running_loop()
+    state = _PW_STATES[loop]
+    fut = state.browsers.get(key)
+    if fut is not None and fut.done():
+        if fut.cancelled() or fut.exception() is not None or not fut.result().is_connected():
+            fut = None
+    if fut is not None:
+        # 同参数 Browser 正在启动或已启动：等待同一个结果
+        return await asyncio.shield(fut)
+
+    fut = loop.create_future()
+    state.browsers[key] = fut
+    try:
+        browser = await launcher.launch(**launch_options)
+    except BaseException as e:
+        if state.browsers.get(key) is fut:
+            del state.browsers[key]
+        if isinstance(e, asyncio.CancelledError):
+            fut.cancel()
+        else:
+            fut.set_exception(e)
+            fut.exception()  # 标记已读取，避免无人等待时告警
+        raise
+    fut.set_result(browser)
+    return browser
 
 
 class BrowserManager:
@@ -28,6 +157,8 @@ class BrowserManager:
         self.browser: Optional[Browser] = None
         self.context: Optional[BrowserContext] = None
         self.page: Optional[Page] = None
+        # selector -> page.locator(selector).first；绑定当前 page，page 替换/关闭时清空
+        self._locator_cache: Dict[str, Locator] = {}
 
         self.session_state_path: Optional[str] = None
         self.storage_state_path: Optional[str] = None
@@ -36,6 +167,14 @@ class BrowserManager:
         # 通过监听网络响应提前识别并快速失败，给出可操作的修复指引。
         self._auth_issue: Optional[Dict[str, Any]] = None
         self._auth_session_mtime: Optional[float] = None
+        # session_state 缓存：(path, mtime_ns, size) -> 注入用 payload，文件未变化时跳过重复读取/解析/序列化
+        self._cached_session_key: Optional[Tuple[str, int, int]] = None
+        self._cached_session_payload: Optional[Dict[str, Any]] = None
+        # 当前 context 最近一次 add_init_script 的 payload 摘要；相同则跳过重复注入
+        self._last_init_sha: Optional[str] = None
+
+        # page.goto 的默认等待策略：commit 最快返回（SPA 友好），内容型页面可配置为 domcontentloaded/load/networkidle。
+        self._default_wait_until: str = str(self.config.get("wait_until") or "commit")
 
     def get_auth_issue(self) -> Optional[Dict[str, Any]]:
         return self._auth_issue
@@ -47,7 +186,7 @@ class BrowserManager:
         try:
             self.logger.info("正在初始化浏览器...")
 
-            self.playwright = await async_playwright().start()
+            self.playwright = await _acquire_playwright()
 
             browser_type = (self.config.get("type") or "chromium").lower()
             if browser_type == "chromium":
@@ -58,6 +197,7 @@ class BrowserManager:
                 browser_launcher = self.playwright.webkit
             else:
                 self.logger.error(f"不支持的浏览器类型: {browser_type}")
+                await self.close()
                 return False
 
             def _env_bool(name: str) -> Optional[bool]:
@@ -84,62 +224,117 @@ class BrowserManager:
             if slow_mo is not None:
                 launch_options["slow_mo"] = int(slow_mo)
 
-            self.browser = await browser_launcher.launch(**launch_options)
+            browser_key = (browser_type, tuple(launch_options["args"]), launch_options["headless"], launch_options.get("slow_mo"))
+            self.browser = await _acquire_browser(browser_launcher, browser_key, launch_options)
 
-            context_options: Dict[str, Any] = {
-                "viewport": self.config.get("viewport", {"width": 1920, "height": 1080}),
-                "user_agent": self.config.get("user_agent", "AutoTestBot/1.0 (Playwright)"),
-                "ignore_https_errors": bool(self.config.get("ignore_https_errors", True)),
-                "java_script_enabled": True,
-                "accept_downloads": False,
-            }
+            await self._open_context()
+
+            self.logger.info(f"浏览器初始化成功: {browser_type}")
+            return True
+        except Exception as e:
+            self.logger.error(f"浏览器初始化失败: {e}")
+            # 释放已获取的 Playwright 引用与半初始化的 context/page
+            await self.close()
+            return False
 
-            storage_state_path = self.config.get("storage_state")
-            if isinstance(storage_state_path, str) and storage_state_path and os.path.exists(storage_state_path):
-                context_options["storage_state"] = storage_state_path
-                self.storage_state_path = storage_state_path
+    async def _open_context(self) -> None:
+        """基于当前 Browser 创建 BrowserContext/Page，并完成登录态注入与认证监听。"""
+        context_options: Dict[str, Any] = {
+            "viewport": self.config.get("viewport", {"width": 1920, "height": 1080}),
+            "user_agent": self.config.get("user_agent", "AutoTestBot/1.0 (Playwright)"),
+            "ignore_https_errors": bool(self.config.get("ignore_https_errors", True)),
+            "java_script_enabled": True,
+            "accept_downloads": False,
+        }
 
-            self.context = await self.browser.new_context(**context_options)
+        storage_state_path = self.config.get("storage_state")
+        if isinstance(storage_state_path, str) and storage_state_path and os.path.exists(storage_state_path):
+            context_options["storage_state"] = storage_state_path
+            self.storage_state_path = storage_state_path
 
-            # sessionStorage 注入（token/user_info）
-            await self._inject_session_state()
+        self.context = await self.browser.new_context(**context_options)
+        self._last_init_sha = None
 
-            self.page = await self.context.new_page()
+        # sessionStorage 注入（token/user_info）
+        await self._inject_session_state()
 
-            default_timeout = int(self.config.get("default_timeout", self.full_config.get("test", {}).get("timeout", 30000)))
-            self.page.set_default_timeout(default_timeout)
+        self.page = await self.context.new_page()
+        self._locator_cache = {}
 
-            # 监听网络响应，捕获 token 过期等认证问题（如 code=50008）。
-            self._install_auth_response_watchers()
+        default_timeout = int(self.config.get("default_timeout", self.full_config.get("test", {}).get("timeout", 30000)))
+        self.page.set_default_timeout(default_timeout)
 
-            self.logger.info(f"浏览器初始化成功: {browser_type}")
+        # 监听网络响应，捕获 token 过期等认证问题（如 code=50008）。
+        self._install_auth_response_watchers()
+
+    async def reset_context(self) -> bool:
+        """
+        关闭当前 page/context，并在同一 Browser 上重新创建（不重启浏览器进程）。
+
+        用于池化复用：cookie、存储与页面状态随旧 context 一起丢弃，登录态按配置重新注入。
+        """
+        if self.browser is None or not self.browser.is_connected():
+            return False
+        self._locator_cache = {}
+        self._auth_issue = None
+        page, self.page = self.page, None
+        context, self.context = self.context, None
+        closers = [obj.close() for obj in (page, context) if obj is not None]
+        if closers:
+            await asyncio.gather(*closers, return_exceptions=True)
+        try:
+            await self._open_context()
             return True
         except Exception as e:
-            self.logger.error(f"浏览器初始化失败: {e}")
+            self.logger.error(f"浏览器上下文重建失败: {e}")
             return False
 
+    def _load_session_payload(self, session_path: str, st: Optional[os.stat_result] = None) -> Dict[str, Any]:
+        """读取 session_state 并整理为 {token, user_info(str)}，结果按文件身份缓存。"""
+        if st is None:
+            st = os.stat(session_path)
+        key = (session_path, st.st_mtime_ns, st.st_size)
+        if key == self._cached_session_key and self._cached_session_payload is not None:
+            return self._cached_session_payload
+        with open(session_path, "rb") as f:
+            raw = _json_loads(f.read())
+        if not isinstance(raw, dict):
+            raise ValueError("session_state 必须是 JSON 对象")
+        user_info = raw.get("user_info")
+        if isinstance(user_info, dict):
+            user_info = _json_dumps(user_info)
+        payload = {"token": raw.get("token"), "user_info": user_info}
+        self._cached_session_key = key
+        self._cached_session_payload = payload
+        return payload
+
     async def _inject_session_state(self) -> bool:
         if not self.context:
             return False
 
         session_path = self.config.get("session_state")
-        if not isinstance(session_path, str) or not session_path or not os.path.exists(session_path):
+        if not isinstance(session_path, str) or not session_path:
+            return False
+        try:
+            st = os.stat(session_path)
+        except OSError:
             return False
 
         try:
-            raw = json.load(open(session_path, "r", encoding="utf-8"))
+            payload = self._load_session_payload(session_path, st)
         except Exception as e:
             self.logger.warning(f"读取 session_state 失败，跳过注入: {e}")
             return False
 
-        token = raw.get("token")
-        user_info = raw.get("user_info")
-        if isinstance(user_info, dict):
-            user_info = json.dumps(user_info, ensure_ascii=False)
+        payload_json = _json_dumps(payload)
+        sha = hashlib.blake2b(payload_json.encode("utf-8"), digest_size=8).hexdigest()
+        if sha == self._last_init_sha:
+            # 当前 context 已注入过完全相同的登录态，无需再发一次 init script
+            return True
 
-        payload = {"token": token, "user_info": user_info}
-        payload_json = json.dumps(payload, ensure_ascii=False)
-        script = f"""(() => {{
+        script = _INIT_SCRIPT_CACHE.get(sha)
+        if script is None:
+            script = f"""(() => {{
   try {{
     const s = {payload_json};
     if (s && s.token) sessionStorage.setItem('token', s.token);
@@ -148,13 +343,14 @@ class BrowserManager:
     console.warn('auto-test-bot: session_state 注入失败', e);
   }}
 }})();"""
+            if len(_INIT_SCRIPT_CACHE) >= _INIT_SCRIPT_CACHE_MAX:
+                _INIT_SCRIPT_CACHE.clear()
+            _INIT_SCRIPT_CACHE[sha] = script
         try:
             await self.context.add_init_script(script=script)
+            self._last_init_sha = sha
             self.session_state_path = session_path
-            try:
-                self._auth_session_mtime = os.path.getmtime(session_path)
-            except Exception:
-                self._auth_session_mtime = None
+            self._auth_session_mtime = st.st_mtime
             self.logger.info(f"已注入 session_state: {session_path}")
             return True
         except Exception as e:
@@ -165,9 +361,21 @@ class BrowserManager:
         if not self.page:
             return
         try:
-            self.page.on("response", lambda resp: asyncio.create_task(self._inspect_response_for_auth_issue(resp)))
+            self.page.on("response", self._on_response)
+        except Exception:
+            return
+
+    def _on_response(self, response) -> None:
+        # 同步过滤：静态资源不会携带认证错误，直接跳过，避免为每个图片/样式/字体创建任务并拉取响应头
+        if self._auth_issue is not None:
+            return
+        try:
+            resource_type = response.request.resource_type
         except Exception:
+            resource_type = ""
+        if resource_type in _STATIC_RESOURCE_TYPES:
             return
+        asyncio.create_task(self._inspect_response_for_auth_issue(response))
 
     @staticmethod
     def _extract_auth_issue_from_payload(payload: Any) -> Optional[Dict[str, Any]]:
@@ -179,16 +387,16 @@ class BrowserManager:
             return None
         code = payload.get("code")
         msg = payload.get("msg") or payload.get("message") or payload.get("error") or ""
-        try:
-            code_str = str(code) if code is not None else ""
-        except Exception:
-            code_str = ""
         msg_str = str(msg) if msg is not None else ""
 
-        if code_str == "50008":
-            return {"code": 50008, "message": msg_str or "请求令牌已过期"}
+        if (type(code) is int and code == _AUTH_CODE) or code == _AUTH_CODE_STR:
+            return {"code": _AUTH_CODE, "message": msg_str or "请求令牌已过期"}
         # 兼容部分实现：没有 code 但有文案
-        if ("令牌" in msg_str or "token" in msg_str.lower()) and ("过期" in msg_str or "expired" in msg_str.lower()):
+        if _AUTH_TOKEN_RE.search(msg_str) and _AUTH_EXPIRED_RE.search(msg_str):
+            try:
+                code_str = str(code) if code is not None else ""
+            except Exception:
+                code_str = ""
             return {"code": code_str or "unknown", "message": msg_str}
         return None
 
@@ -210,9 +418,17 @@ class BrowserManager:
             # 业务错误码（通常为 200 + JSON body）
             should_try_json = ("application/json" in content_type) or ("json" in content_type) or ("/api/" in url) or (status >= 400)
             if should_try_json:
+                try:
+                    raw = await asyncio.wait_for(response.body(), timeout=2.0)
+                except Exception:
+                    return
+                # 绝大多数响应不含认证错误：先在原始字节上做廉价预筛，命中才完整解析 JSON
+                if not raw or not self._may_contain_auth_issue(raw):
+                    return
+
                 payload = None
                 try:
-                    payload = await asyncio.wait_for(response.json(), timeout=2.0)
+                    payload = _json_loads(raw)
                 except Exception:
                     payload = None
 
@@ -224,18 +440,24 @@ class BrowserManager:
                     self.logger.error(f"检测到认证错误码: {self._auth_issue}")
                     return
 
-                # 非 JSON 情况兜底：尝试抓取少量文本
+                # 非 JSON 情况兜底：直接检查文本
                 if status >= 400:
-                    try:
-                        text = await asyncio.wait_for(response.text(), timeout=2.0)
-                        if "50008" in text or ("请求令牌" in text and "过期" in text):
-                            self._auth_issue = {"code": 50008, "message": "请求令牌已过期", "url": url, "status": status}
-                            self.logger.error(f"检测到认证错误文本: {self._auth_issue}")
-                    except Exception:
-                        return
+                    if _AUTH_CODE_BYTES in raw or (_AUTH_TEXT_TOKEN_BYTES in raw and _AUTH_TEXT_EXPIRED_BYTES in raw):
+                        self._auth_issue = {"code": 50008, "message": "请求令牌已过期", "url": url, "status": status}
+                        self.logger.error(f"检测到认证错误文本: {self._auth_issue}")
         except Exception:
             return
 
+    @staticmethod
+    def _may_contain_auth_issue(raw: bytes) -> bool:
+        """
+        字节级预筛：只有可能命中 _extract_auth_issue_from_payload 或文本兜底规则的响应才返回 True。
+        兼容后端以 \\uXXXX 转义中文的 JSON。
+        """
+        if _AUTH_CODE_BYTES in raw:
+            return True
+        return _AUTH_TOKEN_BYTES_RE.search(raw) is not None and _AUTH_EXPIRED_BYTES_RE.search(raw) is not None
+
     async def refresh_auth_from_disk_if_changed(self) -> bool:
         """
         尝试从磁盘重新加载 session_state（需要外部先更新 token），并刷新当前页面。
@@ -244,22 +466,18 @@ class BrowserManager:
         if not self.page:
             return False
         session_path = self.config.get("session_state")
-        if not isinstance(session_path, str) or not session_path or not os.path.exists(session_path):
+        if not isinstance(session_path, str) or not session_path:
             return False
         try:
-            mtime = os.path.getmtime(session_path)
+            st = os.stat(session_path)
         except Exception:
             return False
+        mtime = st.st_mtime
         if self._auth_session_mtime is not None and mtime <= self._auth_session_mtime:
             return False
 
         try:
-            raw = json.load(open(session_path, "r", encoding="utf-8"))
-            token = raw.get("token")
-            user_info = raw.get("user_info")
-            if isinstance(user_info, dict):
-                user_info = json.dumps(user_info, ensure_ascii=False)
-            payload_json = json.dumps({"token": token, "user_info": user_info}, ensure_ascii=False)
+            payload = self._load_session_payload(session_path, st)
             await self.page.evaluate(
                 """(s) => {
   try {
@@ -267,7 +485,7 @@ class BrowserManager:
     if (s && s.user_info) sessionStorage.setItem('user_info', s.user_info);
   } catch (e) {}
 }""",
-                json.loads(payload_json),
+                payload,
             )
             self._auth_session_mtime = mtime
             self.clear_auth_issue()
@@ -308,13 +526,13 @@ class BrowserManager:
         )
         raise RuntimeError(f"{message} (code={code}, url={url}). {hint}")
 
-    async def navigate_to(self, url: str, timeout: Optional[int] = None) -> bool:
+    async def navigate_to(self, url: str, timeout: Optional[int] = None, wait_until: Optional[str] = None) -> bool:
         if not self.page:
             return False
         try:
             self.logger.info(f"正在访问: {url}")
             page_load_timeout = int(timeout) if timeout is not None else int(self.full_config.get("test", {}).get("page_load_timeout", 60000))
-            response = await self.page.goto(url, wait_until="commit", timeout=page_load_timeout)
+            response = await self.page.goto(url, wait_until=wait_until or self._default_wait_until, timeout=page_load_timeout)
             if response and response.status >= 400:
                 self.logger.error(f"页面访问失败: HTTP {response.status}")
                 return False
@@ -324,13 +542,21 @@ class BrowserManager:
             self.logger.error(f"页面导航失败: {e}")
             return False
 
+    def _loc(self, selector: str) -> Locator:
+        # 使用 locator().first 避免 strict-mode 因多匹配导致失败；同一 selector 复用 Locator 对象
+        loc = self._locator_cache.get(selector)
+        if loc is None:
+            loc = self.page.locator(selector).first
+            self._locator_cache[selector] = loc
+        return loc
+
     async def wait_for_selector(self, selector: str, state: str = "visible", timeout: Optional[int] = None) -> bool:
         if not self.page:
             return False
         try:
             wait_timeout = int(timeout) if timeout is not None else int(self.full_config.get("test", {}).get("element_timeout", 10000))
             # 使用 locator().first 避免 strict-mode 因多匹配导致失败
-            await self.page.locator(selector).first.wait_for(state=state, timeout=wait_timeout)
+            await self._loc(selector).wait_for(state=state, timeout=wait_timeout)
             return True
         except Exception as e:
             self.logger.warning(f"等待选择器失败 [{selector}] state={state}: {e}")
@@ -343,9 +569,9 @@ class BrowserManager:
             # 使用 locator().first 避免 strict-mode 因多匹配导致失败
             click_timeout = int(timeout) if timeout is not None else None
             if click_timeout is None:
-                await self.page.locator(selector).first.click()
+                await self._loc(selector).click()
             else:
-                await self.page.locator(selector).first.click(timeout=click_timeout)
+                await self._loc(selector).click(timeout=click_timeout)
             return True
         except Exception as e:
             self.logger.error(f"点击元素失败 [{selector}]: {e}")
@@ -358,9 +584,9 @@ class BrowserManager:
             # 使用 locator().first 避免 strict-mode 因多匹配导致失败
             fill_timeout = int(timeout) if timeout is not None else None
             if fill_timeout is None:
-                await self.page.locator(selector).first.fill(text)
+                await self._loc(selector).fill(text)
             else:
-                await self.page.locator(selector).first.fill(text, timeout=fill_timeout)
+                await self._loc(selector).fill(text, timeout=fill_timeout)
             return True
         except Exception as e:
             self.logger.error(f"填充输入框失败 [{selector}]: {e}")
@@ -439,28 +665,49 @@ class BrowserManager:
         )
         return False, status, message
 
-    async def close(self) -> None:
-        try:
-            if self.page:
-                await self.page.close()
-                self.page = None
-        except Exception:
-            pass
-        try:
-            if self.context:
-                await self.context.close()
-                self.context = None
-        except Exception:
-            pass
+    @staticmethod
+    async def shutdown_shared() -> None:
+        """关闭当前事件循环上共享的 Browser 并停止 Playwright（测试套件 teardown 使用）。"""
+        state = _PW_STATES.pop(asyncio.get_running_loop(), None)
+        if state is None:
+            return
+        futures = list(state.browsers.values())
+        state.browsers.clear()
+        state.refs = 0
+        for fut in futures:
+            if fut.done() and not fut.cancelled() and fut.exception() is None:
+                try:
+                    await fut.result().close()
+                except Exception:
+                    pass
         try:
-            if self.browser:
-                await self.browser.close()
-                self.browser = None
+            playwright = await state.starting
+            await playwright.stop()
         except Exception:
             pass
+
+    async def __aenter__(self) -> "BrowserManager":
+        if not await self.initialize():
+            await self.close()
+            raise RuntimeError("浏览器初始化失败")
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        await self.close()
+
+    async def close(self) -> None:
+        self._locator_cache = {}
+        page, self.page = self.page, None
+        context, self.context = self.context, None
+        # page/context 关闭互不依赖，并发发出以减少与 driver 的串行往返
+        closers = [obj.close() for obj in (page, context) if obj is not None]
+        if closers:
+            await asyncio.gather(*closers, return_exceptions=True)
+        # Browser 为进程内共享实例，这里只释放引用；最后一个 BrowserManager 关闭时随 Playwright 一起停止
+        self.browser = None
         try:
             if self.playwright:
-                await self.playwright.stop()
-                self.playwright = None
+                playwright, self.playwright = self.playwright, None
+                await _release_playwright(playwright)
         except Exception:
             pass
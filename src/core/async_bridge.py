@@ -0,0 +1,169 @@
+"""同步调用 → 后台 asyncio 事件循环的桥接（各 adapter 共用）"""
+
+from __future__ import annotations
+
+import asyncio
+import queue
+import threading
+from concurrent.futures import Future as ThreadFuture
+from typing import Any, Optional
+
+
+class _ResultSlot:
+    """单次 run() 的结果槽：loop 线程写入，调用线程阻塞读取，用完后回收复用。"""
+
+    __slots__ = ("_done", "_value", "_error", "_task", "_cancelled")
+
+    def __init__(self) -> None:
+        self._done = threading.Event()
+        self._value: Any = None
+        self._error: Optional[BaseException] = None
+        # 以下两个字段只在 loop 线程读写
+        self._task: Optional[asyncio.Task] = None
+        self._cancelled = False
+
+    def set_result(self, value: Any) -> None:
+        self._value = value
+        self._done.set()
+
+    def set_exception(self, error: BaseException) -> None:
+        self._error = error
+        self._done.set()
+
+    def wait(self, timeout: Optional[float]) -> Any:
+        if not self._done.wait(timeout):
+            raise TimeoutError(f"coroutine did not finish within {timeout}s")
+        if self._error is not None:
+            raise self._error
+        return self._value
+
+    def cancel(self) -> None:
+        """在 loop 线程调用：取消已启动的任务，或标记尚未启动的任务不再启动。"""
+        self._cancelled = True
+        if self._task is not None:
+            self._task.cancel()
+
+    def on_done(self, task: asyncio.Task) -> None:
+        if task.cancelled():
+            self.set_exception(asyncio.CancelledError())
+        elif task.exception() is not None:
+            self.set_exception(task.exception())
+        else:
+            self.set_result(task.result())
+
+    def reset(self) -> None:
+        self._done.clear()
+        self._value = None
+        self._error = None
+        self._task = None
+        self._cancelled = False
+
+
+class AsyncLoopThread:
+    """
+    在守护线程中常驻一个事件循环，供同步代码提交协程。
+
+    - run()：提交协程并阻塞等待结果；常驻 worker 一次唤醒取空队列，每个协程各自成为 Task 并发执行，
+      结果由 done 回调写入可复用的结果槽（慢任务不会阻塞后续调用）
+    - run() 超时会取消对应 Task；stop() 时仍在排队的调用立即失败
+    - start()：长驻协程（如 EventBus.start_processing）直接提交，返回线程侧 Future
+    """
+
+    def __init__(self, name: str = "async-loop", run_timeout: float = 5.0):
+        self.run_timeout = run_timeout
+        self._loop = asyncio.new_event_loop()
+        self._jobs: Optional[asyncio.Queue] = None
+        self._free_slots: "queue.SimpleQueue[_ResultSlot]" = queue.SimpleQueue()
+        self._stopping = False
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._ready = threading.Event()
+        self._thread.start()
+        self._ready.wait(timeout=2)
+
+    def _run(self) -> None:
+        asyncio.set_event_loop(self._loop)
+        self._jobs = asyncio.Queue()
+        self._loop.create_task(self._drain_jobs())
+        self._ready.set()
+        self._loop.run_forever()
+
+    async def _drain_jobs(self) -> None:
+        jobs = self._jobs
+        while True:
+            batch = [await jobs.get()]
+            while not jobs.empty():
+                batch.append(jobs.get_nowait())
+            for i, job in enumerate(batch):
+                if job is None:
+                    error = RuntimeError("async loop thread stopped")
+                    for coro, slot in (j for j in batch[i + 1:] if j is not None):
+                        coro.close()
+                        slot.set_exception(error)
+                    self._fail_pending(error)
+                    self._loop.stop()
+                    return
+                coro, slot = job
+                if slot._cancelled:
+                    coro.close()
+                    continue
+                slot._task = self._loop.create_task(coro)
+                slot._task.add_done_callback(slot.on_done)
+
+    def _fail_pending(self, error: BaseException) -> None:
+        """stop() 时让队列中尚未启动的调用立即失败，而不是等到超时。"""
+        jobs = self._jobs
+        while jobs is not None and not jobs.empty():
+            job = jobs.get_nowait()
+            if job is None:
+                continue
+            coro, slot = job
+            coro.close()
+            slot.set_exception(error)
+
+    def _acquire_slot(self) -> _ResultSlot:
+        try:
+            return self._free_slots.get_nowait()
+        except queue.Empty:
+            return _ResultSlot()
+
+    def run(self, coro) -> Any:
+        if self._stopping:
+            coro.close()
+            raise RuntimeError("async loop thread stopped")
+        slot = self._acquire_slot()
+        self._loop.call_soon_threadsafe(self._jobs.put_nowait, (coro, slot))
+        try:
+            result = slot.wait(timeout=self.run_timeout)
+        except TimeoutError:
+            # 超时：取消任务释放 loop 资源；槽位之后仍可能被 done 回调写入，不能回收。
+            try:
+                self._loop.call_soon_threadsafe(slot.cancel)
+            except RuntimeError:
+                pass
+            raise
+        except BaseException:
+            slot.reset()
+            self._free_slots.put(slot)
+            raise
+        slot.reset()
+        self._free_slots.put(slot)
+        return result
+
+    def start(self, coro) -> ThreadFuture:
+        return asyncio.run_coroutine_threadsafe(coro, self._loop)
+
+    def stop(self) -> None:
+        self._stopping = True
+        if self._jobs is not None:
+            self._loop.call_soon_threadsafe(self._jobs.put_nowait, None)
+            self._thread.join(timeout=2)
+        if self._thread.is_alive():
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join(timeout=2)
+        if not self._thread.is_alive():
+            # loop 已停止：兜底处理 sentinel 之后才入队的调用
+            self._fail_pending(RuntimeError("async loop thread stopped"))
+        try:
+            self._loop.close()
+        except Exception:
+            pass
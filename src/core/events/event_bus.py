@@ -4,26 +4,77 @@ import asyncio
 from asyncio import Queue
 from datetime import datetime
 import inspect
-from typing import Any, Awaitable, Callable, Dict, List, Optional, Union
-from uuid import uuid4
+import itertools
+import os
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple, Union
 
 
 Event = Dict[str, Any]
 Subscriber = Callable[[Event], Union[None, Awaitable[None]]]
 
+# stop() 投递到队列中的哨兵，用于唤醒阻塞在 queue.get() 上的处理循环
+_SENTINEL: Any = object()
+
+# 单次唤醒最多批量取出的事件数
+_MAX_BATCH = 256
+
+
+# event_id = 进程前缀 + 自增序号：进程内唯一，比 uuid4() 便宜得多；fork 后子进程重置前缀。
+_EVENT_COUNTER = itertools.count()
+_EVENT_ID_PREFIX = ""
+
+
+def _reset_event_id_prefix() -> None:
+    global _EVENT_COUNTER, _EVENT_ID_PREFIX
+    _EVENT_COUNTER = itertools.count()
+    _EVENT_ID_PREFIX = f"{os.getpid()}-{os.urandom(4).hex()}-"
+
+
+_reset_event_id_prefix()
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_event_id_prefix)
+
+
+def _next_event_id() -> str:
+    return f"{_EVENT_ID_PREFIX}{next(_EVENT_COUNTER)}"
+
+
+# 时间戳按秒缓存 isoformat 前缀，只拼接微秒部分；格式与 datetime.now().isoformat() 一致（本地时间）
+_TS_SECOND = -1
+_TS_PREFIX = ""
+
+
+def _now_isoformat() -> str:
+    global _TS_SECOND, _TS_PREFIX
+    seconds, nanos = divmod(time.time_ns(), 1_000_000_000)
+    if seconds != _TS_SECOND:
+        _TS_PREFIX = datetime.fromtimestamp(seconds).isoformat()
+        _TS_SECOND = seconds
+    micros = nanos // 1000
+    return f"{_TS_PREFIX}.{micros:06d}" if micros else _TS_PREFIX
+
 
 class EventBus:
-    """事件总线：异步 publish + 订阅回调分发。"""
+    """
+    事件总线：异步 publish + 订阅回调分发。
+
+    处理循环一次唤醒批量取出事件，按 event_type 分桶后合并为一次 gather 分发：
+    - 同一 event_type 内按发布顺序调用订阅者，不同 event_type 之间不保证发布顺序
+    - 同步回调在分桶遍历时依次直接执行（按桶顺序），异步回调在 gather 中并发执行
+    """
 
     def __init__(self, *, queue_maxsize: int = 0):
-        self._subscribers: Dict[str, List[Subscriber]] = {}
+        # event_type -> ((callback, is_coroutine_function), ...)；订阅时一次性判定并整体重建，
+        # 分发时直接遍历不可变快照，无需拷贝和反射。
+        self._subscribers: Dict[str, Tuple[Tuple[Subscriber, bool], ...]] = {}
         self._queue: Queue[Event] = Queue(maxsize=queue_maxsize)
         self._running = False
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
 
     def subscribe(self, event_type: str, callback: Subscriber) -> None:
-        if event_type not in self._subscribers:
-            self._subscribers[event_type] = []
-        self._subscribers[event_type].append(callback)
+        is_coro = inspect.iscoroutinefunction(callback)
+        self._subscribers[event_type] = self._subscribers.get(event_type, ()) + ((callback, is_coro),)
 
     async def publish(
         self,
@@ -35,8 +86,8 @@ class EventBus:
     ) -> None:
         event: Event = {
             "event_type": event_type,
-            "event_id": str(uuid4()),
-            "timestamp": datetime.now().isoformat(),
+            "event_id": _next_event_id(),
+            "timestamp": _now_isoformat(),
             "source": source,
             "correlation_id": correlation_id,
             "data": data,
@@ -45,38 +96,76 @@ class EventBus:
 
     async def start_processing(self) -> None:
         self._running = True
+        self._loop = asyncio.get_running_loop()
+        queue = self._queue
         while self._running:
+            batch = [await queue.get()]
+            # 取到哨兵即停止取批：哨兵之后入队的事件留在队列中，不会被本次 stop 前分发
+            while batch[-1] is not _SENTINEL and len(batch) < _MAX_BATCH:
+                try:
+                    batch.append(queue.get_nowait())
+                except asyncio.QueueEmpty:
+                    break
+
+            stop_requested = batch[-1] is _SENTINEL
+            events: List[Event] = batch[:-1] if stop_requested else batch
             try:
-                event = await asyncio.wait_for(self._queue.get(), timeout=0.1)
-            except asyncio.TimeoutError:
-                continue
-            try:
-                await self._dispatch(event)
+                if events:
+                    await self._dispatch_batch(events)
             finally:
-                self._queue.task_done()
+                for _ in batch:
+                    queue.task_done()
+            if stop_requested:
+                break
 
     def stop(self) -> None:
         self._running = False
-
-    async def _dispatch(self, event: Event) -> None:
-        event_type = str(event.get("event_type") or "")
-        subscribers = list(self._subscribers.get(event_type, []))
-        if not subscribers:
+        loop = self._loop
+        if loop is None or loop.is_closed():
             return
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is loop:
+            self._put_sentinel()
+        else:
+            # 可能从其他线程调用（例如同步适配器 close），需切回事件循环线程投递
+            try:
+                loop.call_soon_threadsafe(self._put_sentinel)
+            except RuntimeError:
+                pass
+
+    def _put_sentinel(self) -> None:
+        try:
+            self._queue.put_nowait(_SENTINEL)
+        except asyncio.QueueFull:
+            # 队列已满说明处理循环正忙，它会在处理完当前事件后检查 _running 退出
+            pass
+
+    async def _dispatch_batch(self, events: List[Event]) -> None:
+        # 按 event_type 分桶，每类只查一次订阅者；整批回调合并为一次 gather 并发执行
+        by_type: Dict[str, List[Event]] = {}
+        for event in events:
+            by_type.setdefault(str(event.get("event_type") or ""), []).append(event)
 
         tasks: List[Awaitable[None]] = []
-        for callback in subscribers:
-            try:
-                if inspect.iscoroutinefunction(callback):
-                    tasks.append(callback(event))  # type: ignore[arg-type]
-                else:
-                    result = callback(event)
-                    if asyncio.iscoroutine(result):
-                        tasks.append(result)  # type: ignore[arg-type]
-            except Exception:
-                # 订阅者异常不影响其他订阅者
+        for event_type, bucket in by_type.items():
+            subscribers = self._subscribers.get(event_type)
+            if not subscribers:
                 continue
+            for event in bucket:
+                for callback, is_coro in subscribers:
+                    try:
+                        if is_coro:
+                            tasks.append(callback(event))  # type: ignore[arg-type]
+                        else:
+                            result = callback(event)
+                            if asyncio.iscoroutine(result):
+                                tasks.append(result)  # type: ignore[arg-type]
+                    except Exception:
+                        # 订阅者异常不影响其他订阅者
+                        continue
 
         if tasks:
             await asyncio.gather(*tasks, return_exceptions=True)
-
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import asyncio
 from dataclasses import dataclass, field
 import time
 from typing import Any, Dict, List, Optional
@@ -25,31 +26,57 @@ class ProcessingStage:
 class ProcessingPipeline:
     def __init__(self, stages: List[ProcessingStage]):
         self._stages = stages
+        self._stage_names = [stage.get_stage_name() for stage in stages]
 
     async def process(self, input_data: Any, *, config: Dict[str, Any]) -> PipelineResult:
         context: Dict[str, Any] = {"config": config, "metrics": {"stages": []}}
         data = input_data
-        start = time.monotonic()
+        # 循环内只记录整数纳秒耗时，结束时再物化为 {"stage", "elapsed_seconds"} 列表
+        stage_elapsed_ns: List[Optional[int]] = [None] * len(self._stages)
+        start = time.perf_counter_ns()
 
         try:
-            for stage in self._stages:
-                stage_start = time.monotonic()
+            for i, stage in enumerate(self._stages):
+                stage_start = time.perf_counter_ns()
                 data = await stage.process(data, context)
-                context["metrics"]["stages"].append(
-                    {"stage": stage.get_stage_name(), "elapsed_seconds": time.monotonic() - stage_start}
-                )
+                stage_elapsed_ns[i] = time.perf_counter_ns() - stage_start
             return PipelineResult(
                 success=bool(context.get("validation", {}).get("is_valid", True)),
                 files=list(context.get("files", []) or []),
                 validation=dict(context.get("validation", {}) or {}),
-                metrics={"elapsed_seconds": time.monotonic() - start, **context.get("metrics", {})},
+                metrics=self._build_metrics(context, start, stage_elapsed_ns),
             )
         except Exception as exc:
             return PipelineResult(
                 success=False,
                 files=list(context.get("files", []) or []),
                 validation=dict(context.get("validation", {}) or {}),
-                metrics={"elapsed_seconds": time.monotonic() - start, **context.get("metrics", {})},
+                metrics=self._build_metrics(context, start, stage_elapsed_ns),
                 error=str(exc),
             )
 
+    def _build_metrics(self, context: Dict[str, Any], start_ns: int, stage_elapsed_ns: List[Optional[int]]) -> Dict[str, Any]:
+        metrics = context.get("metrics", {}) or {}
+        metrics["stages"] = [
+            {"stage": name, "elapsed_seconds": elapsed / 1e9}
+            for name, elapsed in zip(self._stage_names, stage_elapsed_ns)
+            if elapsed is not None
+        ]
+        return {"elapsed_seconds": (time.perf_counter_ns() - start_ns) / 1e9, **metrics}
+
+    async def process_batch(
+        self,
+        items: List[Any],
+        *,
+        config: Dict[str, Any],
+        concurrency: int = 8,
+    ) -> List[PipelineResult]:
+        """并发处理多个输入（每个输入独立 context），结果顺序与 items 一致。"""
+        sem = asyncio.Semaphore(max(1, int(concurrency)))
+
+        async def _one(item: Any) -> PipelineResult:
+            async with sem:
+                return await self.process(item, config=config)
+
+        return list(await asyncio.gather(*(_one(item) for item in items)))
+
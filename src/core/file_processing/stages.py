@@ -1,14 +1,128 @@
 from __future__ import annotations
 
+import asyncio
+import functools
 import hashlib
+import mmap
 import os
 from pathlib import Path
 import shutil
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional, Tuple
 
 from .pipeline import ProcessingStage
 
 
+_HASH_CHUNK_SIZE = 1 << 20
+
+
+def _sha256_file(path: Path) -> str:
+    """流式计算文件 SHA-256，避免把整个文件读入内存。"""
+    with open(path, "rb", buffering=0) as f:
+        if hasattr(hashlib, "file_digest"):
+            return hashlib.file_digest(f, "sha256").hexdigest()
+        h = hashlib.sha256()
+        for chunk in iter(lambda: f.read(_HASH_CHUNK_SIZE), b""):
+            h.update(chunk)
+        return h.hexdigest()
+
+
+def _sha256_mmap(path: Path) -> str:
+    """计算文件 SHA-256：优先 mmap（顺序预读），失败时回退流式读取。"""
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            # 0 字节文件无法 mmap
+            return hashlib.sha256().hexdigest()
+        try:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            return _sha256_file(path)
+        with mm:
+            if hasattr(mm, "madvise") and hasattr(mmap, "MADV_SEQUENTIAL"):
+                try:
+                    mm.madvise(mmap.MADV_SEQUENTIAL)
+                except OSError:
+                    pass
+            return hashlib.sha256(mm).hexdigest()
+
+
+def _write_bytes(path: Path, data: Any) -> None:
+    """直接在 fd 上写入 bytes/bytearray：不做 bytes() 防御性拷贝，大块数据先 fallocate 减少碎片。"""
+    view = memoryview(data)
+    size = view.nbytes
+    fd = os.open(str(path), os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, "O_BINARY", 0), 0o644)
+    try:
+        if size >= _HASH_CHUNK_SIZE and hasattr(os, "posix_fallocate"):
+            try:
+                os.posix_fallocate(fd, 0, size)
+            except OSError:
+                pass
+        offset = 0
+        while offset < size:
+            offset += os.write(fd, view[offset:])
+    finally:
+        os.close(fd)
+
+
+def _copy_file_range(src_fd: int, dst_fd: int, size: int) -> None:
+    offset = 0
+    while offset < size:
+        copied = os.copy_file_range(src_fd, dst_fd, size - offset, offset, offset)
+        if copied == 0:
+            break
+        offset += copied
+
+
+def _sendfile(src_fd: int, dst_fd: int, size: int) -> None:
+    offset = 0
+    while offset < size:
+        sent = os.sendfile(dst_fd, src_fd, offset, size - offset)
+        if sent == 0:
+            break
+        offset += sent
+
+
+def _fast_copy(src: Path, dst: Path) -> None:
+    """内核态拷贝：优先 copy_file_range（支持 reflink 的文件系统上零拷贝），其次 sendfile，最后用户态大块拷贝。"""
+    with open(src, "rb") as s, open(dst, "wb") as d:
+        size = os.fstat(s.fileno()).st_size
+        for copier in (_copy_file_range, _sendfile):
+            try:
+                copier(s.fileno(), d.fileno(), size)
+                return
+            except (AttributeError, OSError):
+                # 平台/文件系统不支持：清空目标后换下一种方式
+                d.seek(0)
+                d.truncate()
+        shutil.copyfileobj(s, d, _HASH_CHUNK_SIZE)
+
+
+@functools.lru_cache(maxsize=1024)
+def _sha256_for(path: str, mtime_ns: int, size: int) -> str:
+    """按 (path, mtime_ns, size) 缓存摘要：文件未变化时重试/多次校验只需一次 stat。"""
+    return _sha256_mmap(Path(path))
+
+
+# 同一文件并发未命中时只计算一次，其余等待者直接命中缓存
+_HASH_LOCKS: Dict[Tuple[str, int, int], asyncio.Lock] = {}
+
+
+async def _cached_sha256(path: Path, st: os.stat_result) -> str:
+    key = (str(path.resolve()), st.st_mtime_ns, st.st_size)
+    lock = _HASH_LOCKS.setdefault(key, asyncio.Lock())
+    try:
+        async with lock:
+            # 哈希在线程池中计算（hashlib 在 update 期间释放 GIL），批量处理时才能真正并行
+            return await asyncio.get_running_loop().run_in_executor(None, _sha256_for, *key)
+    finally:
+        if not lock.locked():
+            _HASH_LOCKS.pop(key, None)
+
+
+def clear_hash_cache() -> None:
+    _sha256_for.cache_clear()
+    _HASH_LOCKS.clear()
+
+
 class DownloadStage(ProcessingStage):
     def get_stage_name(self) -> str:
         return "download"
@@ -26,27 +140,34 @@ class DownloadStage(ProcessingStage):
         content_bytes = file_info.get("content_bytes")
         source_path = file_info.get("source_path")
 
+        # 每个分支只做一次 stat（或直接由已知长度得到 size）
         if local_path:
             path = Path(str(local_path))
-            if not path.exists():
-                raise FileNotFoundError(f"local_path 不存在: {path}")
+            try:
+                size = os.stat(path).st_size
+            except FileNotFoundError:
+                raise FileNotFoundError(f"local_path 不存在: {path}") from None
             resolved = str(path)
         else:
             path = base_temp_dir / str(filename)
             if content_bytes is not None:
                 if not isinstance(content_bytes, (bytes, bytearray)):
                     raise ValueError("content_bytes 必须是 bytes")
-                path.write_bytes(bytes(content_bytes))
+                _write_bytes(path, content_bytes)
+                size = len(content_bytes)
             elif source_path is not None:
                 src = Path(str(source_path))
-                if not src.exists():
-                    raise FileNotFoundError(f"source_path 不存在: {src}")
-                shutil.copyfile(str(src), str(path))
+                try:
+                    _fast_copy(src, path)
+                except FileNotFoundError:
+                    if src.exists():
+                        raise
+                    raise FileNotFoundError(f"source_path 不存在: {src}") from None
+                size = os.stat(path).st_size
             else:
                 raise ValueError("file_info 需要提供 local_path/content_bytes/source_path 之一")
             resolved = str(path)
 
-        size = os.path.getsize(resolved)
         context.setdefault("files", []).append({"local_path": resolved, "size": size, "filename": str(filename)})
         return {"local_path": resolved, "size": size, "filename": str(filename)}
 
@@ -68,28 +189,33 @@ class ValidationStage(ProcessingStage):
         results: List[Dict[str, Any]] = []
 
         path = Path(str(local_path))
-        if not path.exists():
+        try:
+            st = path.stat()
+        except OSError:
             results.append({"type": "file_exists", "status": "failed", "message": f"File not found: {path}"})
             context["validation"] = {"validation_results": results, "is_valid": False}
             return file_meta
 
+        actual_size = st.st_size
+        actual_hash: Optional[str] = None
+        if "sha256" in rules:
+            actual_hash = await _cached_sha256(path, st)
+
         if "size_equals" in rules:
             expected = int(rules["size_equals"])
-            actual = path.stat().st_size
-            if actual != expected:
+            if actual_size != expected:
                 results.append(
                     {
                         "type": "size_equals",
                         "status": "failed",
-                        "message": f"Size mismatch: expected={expected}, actual={actual}",
+                        "message": f"Size mismatch: expected={expected}, actual={actual_size}",
                     }
                 )
             else:
                 results.append({"type": "size_equals", "status": "passed", "message": "ok"})
 
-        if "sha256" in rules:
+        if actual_hash is not None:
             expected_hash = str(rules["sha256"])
-            actual_hash = hashlib.sha256(path.read_bytes()).hexdigest()
             if actual_hash != expected_hash:
                 results.append(
                     {"type": "sha256", "status": "failed", "message": "Checksum mismatch", "actual": actual_hash}
@@ -115,17 +241,19 @@ class CleanupStage(ProcessingStage):
 
         path = Path(str(local_path))
         if keep_temp:
-            exists = path.exists()
-            self._mark_exists(context, str(path), exists)
+            self._mark_exists(context, str(path), path.exists())
             return file_meta
 
-        if path.exists():
-            try:
-                path.unlink()
-            except Exception:
-                pass
+        # 直接 unlink，由结果推断是否仍存在，省去前后两次 exists()
+        try:
+            path.unlink()
+            exists = False
+        except FileNotFoundError:
+            exists = False
+        except Exception:
+            exists = path.exists()
 
-        self._mark_exists(context, str(path), path.exists())
+        self._mark_exists(context, str(path), exists)
         return file_meta
 
     def _mark_exists(self, context: Dict[str, Any], local_path: str, exists: bool) -> None:
@@ -1,12 +1,14 @@
 from __future__ import annotations
 
-from typing import Any, Dict, List
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Tuple
 
 from core.monitoring.metrics_db import MetricsDB
 
 
 def _load_db(path: str) -> MetricsDB:
-    return MetricsDB(persist_path=path)
+    # 离线对比需要完整历史：不截断，否则大文件的比率只反映最近记录
+    return MetricsDB(persist_path=path, max_records_per_domain=None)
 
 
 def compare_event_ratio_slo(
@@ -17,13 +19,18 @@ def compare_event_ratio_slo(
     numerator_event: str,
     denominator_events: List[str],
 ) -> Dict[str, Any]:
-    baseline_db = _load_db(baseline_path)
-    current_db = _load_db(current_path)
-
-    b_num = baseline_db.count_event_type(domain, numerator_event)
-    b_den = sum(baseline_db.count_event_type(domain, e) for e in denominator_events)
-    c_num = current_db.count_event_type(domain, numerator_event)
-    c_den = sum(current_db.count_event_type(domain, e) for e in denominator_events)
+    event_types = [numerator_event, *denominator_events]
+
+    def _counts(path: str) -> Tuple[int, int]:
+        counts = _load_db(path).count_event_types(domain, event_types)
+        return counts.get(numerator_event, 0), sum(counts.get(e, 0) for e in denominator_events)
+
+    # 两个库相互独立：并行回放 JSONL
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        baseline_future = pool.submit(_counts, baseline_path)
+        current_future = pool.submit(_counts, current_path)
+        b_num, b_den = baseline_future.result()
+        c_num, c_den = current_future.result()
 
     b_val = float(b_num) / float(b_den) if b_den > 0 else 1.0
     c_val = float(c_num) / float(c_den) if c_den > 0 else 1.0
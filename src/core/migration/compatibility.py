@@ -1,12 +1,13 @@
 from __future__ import annotations
 
+import importlib.util
 from typing import List
 
 
 def validate_v2_components() -> List[str]:
     """
     Phase4 兼容性矩阵的最小自动化校验：
-    - 核心模块可 import（协议/事件/插件/监控/三大插件）
+    - 核心模块可解析（协议/事件/插件/监控/三大插件）；仅用 find_spec 定位，不执行模块代码
     返回问题列表；为空表示通过。
     """
     checks = [
@@ -25,8 +26,12 @@ def validate_v2_components() -> List[str]:
     problems: List[str] = []
     for mod in checks:
         try:
-            __import__(mod)
+            spec = importlib.util.find_spec(mod)
         except Exception as exc:
+            # 父包导入失败或名称不合法
             problems.append(f"{mod}: {exc}")
+            continue
+        if spec is None:
+            problems.append(f"{mod}: not found")
     return problems
 
@@ -1,34 +1,93 @@
 from __future__ import annotations
 
-from typing import Any, Dict, List
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Hashable, List, Optional, Tuple
 
 
-def diff_dicts(a: Any, b: Any, *, _path: str = "") -> List[Dict[str, Any]]:
+def diff_dicts(
+    a: Any,
+    b: Any,
+    *,
+    list_key: Optional[Callable[[Any], Optional[Hashable]]] = None,
+) -> List[Dict[str, Any]]:
     """
-    递归对比两个结构（dict/list/标量），输出最小差异列表。
+    对比两个结构（dict/list/标量），输出最小差异列表。
+
+    使用显式栈迭代遍历，嵌套深度不受 Python 递归上限限制。
+    列表按下标逐项对比（路径形如 ``a.b[0]``），多出/缺少的元素记为 added/removed；
+    传入 list_key 时，若两侧元素都能取到 key（不为 None），则按 key 对齐后再对比。
     """
     diffs: List[Dict[str, Any]] = []
 
     def join(path: str, key: str) -> str:
         return f"{path}.{key}" if path else key
 
-    if isinstance(a, dict) and isinstance(b, dict):
-        a_keys = set(a.keys())
-        b_keys = set(b.keys())
-        for k in sorted(a_keys - b_keys):
-            diffs.append({"type": "removed", "path": join(_path, str(k)), "before": a.get(k)})
-        for k in sorted(b_keys - a_keys):
-            diffs.append({"type": "added", "path": join(_path, str(k)), "after": b.get(k)})
-        for k in sorted(a_keys & b_keys):
-            diffs.extend(diff_dicts(a.get(k), b.get(k), _path=join(_path, str(k))))
-        return diffs
-
-    if isinstance(a, list) and isinstance(b, list):
-        if a != b:
-            diffs.append({"type": "changed", "path": _path, "before": a, "after": b})
-        return diffs
-
-    if a != b:
-        diffs.append({"type": "changed", "path": _path, "before": a, "after": b})
+    stack: Deque[Tuple[Any, Any, str]] = deque([(a, b, "")])
+    while stack:
+        left, right, path = stack.pop()
+
+        if isinstance(left, dict) and isinstance(right, dict):
+            a_keys = left.keys()
+            b_keys = right.keys()
+            for k in sorted(a_keys - b_keys):
+                diffs.append({"type": "removed", "path": join(path, str(k)), "before": left.get(k)})
+            for k in sorted(b_keys - a_keys):
+                diffs.append({"type": "added", "path": join(path, str(k)), "after": right.get(k)})
+            # 逆序压栈，出栈顺序与按 key 排序的深度优先遍历一致
+            for k in reversed(sorted(a_keys & b_keys)):
+                stack.append((left[k], right[k], join(path, str(k))))
+            continue
+
+        if isinstance(left, list) and isinstance(right, list):
+            if left == right:
+                continue
+            pairs = _align_by_key(left, right, path, list_key, diffs) if list_key else None
+            if pairs is None:
+                shared = min(len(left), len(right))
+                for i in range(shared, len(left)):
+                    diffs.append({"type": "removed", "path": f"{path}[{i}]", "before": left[i]})
+                for i in range(shared, len(right)):
+                    diffs.append({"type": "added", "path": f"{path}[{i}]", "after": right[i]})
+                pairs = [(left[i], right[i], f"{path}[{i}]") for i in range(shared)]
+            stack.extend(reversed(pairs))
+            continue
+
+        if left != right:
+            diffs.append({"type": "changed", "path": path, "before": left, "after": right})
+
     return diffs
 
+
+def _align_by_key(
+    left: List[Any],
+    right: List[Any],
+    path: str,
+    list_key: Callable[[Any], Optional[Hashable]],
+    diffs: List[Dict[str, Any]],
+) -> Optional[List[Tuple[Any, Any, str]]]:
+    """按 list_key 对齐两侧元素；任一元素取不到 key 或 key 重复时返回 None（回退为按下标对比）。"""
+
+    def index(items: List[Any]) -> Optional[Dict[Hashable, Any]]:
+        keyed: Dict[Hashable, Any] = {}
+        for item in items:
+            try:
+                key = list_key(item)
+            except Exception:
+                return None
+            if key is None or key in keyed:
+                return None
+            keyed[key] = item
+        return keyed
+
+    left_by_key = index(left)
+    right_by_key = index(right) if left_by_key is not None else None
+    if left_by_key is None or right_by_key is None:
+        return None
+
+    for key, item in left_by_key.items():
+        if key not in right_by_key:
+            diffs.append({"type": "removed", "path": f"{path}[{key}]", "before": item})
+    for key, item in right_by_key.items():
+        if key not in left_by_key:
+            diffs.append({"type": "added", "path": f"{path}[{key}]", "after": item})
+    return [(item, right_by_key[key], f"{path}[{key}]") for key, item in left_by_key.items() if key in right_by_key]
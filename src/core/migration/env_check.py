@@ -1,23 +1,38 @@
 from __future__ import annotations
 
+import copy
+from functools import lru_cache
+import importlib.metadata
+import importlib.util
 import sys
 from typing import Any, Dict, Tuple
 
 
 def check_environment(*, min_python: Tuple[int, int] = (3, 8)) -> Dict[str, Any]:
+    # 结果在进程生命周期内不变，按 min_python 缓存；返回深拷贝，调用方修改不会污染缓存
+    return copy.deepcopy(_check_environment(tuple(min_python)))
+
+
+@lru_cache(maxsize=8)
+def _check_environment(min_python: Tuple[int, int]) -> Dict[str, Any]:
     major, minor = min_python
     py_ok = (sys.version_info.major, sys.version_info.minor) >= (major, minor)
     report: Dict[str, Any] = {
         "python": {"ok": py_ok, "version": f"{sys.version_info.major}.{sys.version_info.minor}.{sys.version_info.micro}"},
     }
 
-    # Optional: Playwright version if installed
+    # Optional: Playwright version if installed（只定位包并读取元数据，不执行其初始化代码）
     try:
-        import playwright  # type: ignore
-
-        report["playwright"] = {"ok": True, "version": getattr(playwright, "__version__", "unknown")}
+        installed = importlib.util.find_spec("playwright") is not None
     except Exception:
+        installed = False
+    if installed:
+        try:
+            version = importlib.metadata.version("playwright")
+        except Exception:
+            version = "unknown"
+        report["playwright"] = {"ok": True, "version": version}
+    else:
         report["playwright"] = {"ok": False, "version": "not_installed"}
 
     return report
-
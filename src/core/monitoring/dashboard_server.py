@@ -1,11 +1,12 @@
 from __future__ import annotations
 
-import json
+from concurrent.futures import ThreadPoolExecutor
 from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Iterable, Optional
 from urllib.parse import parse_qs, urlparse
 import threading
 
+from . import _json
 from .service import MonitoringService
 
 
@@ -58,14 +59,10 @@ _INDEX_HTML = """<!doctype html>
       }
       async function refreshAll() {
         const domain = document.getElementById('domain').value || 'task';
-        const [slo, alerts, metrics] = await Promise.all([
-          getJson('/api/slo'),
-          getJson('/api/alerts'),
-          getJson('/api/metrics?domain=' + encodeURIComponent(domain)),
-        ]);
-        document.getElementById('slo').textContent = JSON.stringify(slo, null, 2);
-        document.getElementById('alerts').textContent = JSON.stringify(alerts, null, 2);
-        document.getElementById('metrics').textContent = JSON.stringify(metrics, null, 2);
+        const d = await getJson('/api/dashboard?domain=' + encodeURIComponent(domain));
+        document.getElementById('slo').textContent = JSON.stringify(d.slo, null, 2);
+        document.getElementById('alerts').textContent = JSON.stringify(d.alerts, null, 2);
+        document.getElementById('metrics').textContent = JSON.stringify(d.metrics, null, 2);
       }
       refreshAll();
       setInterval(refreshAll, 2000);
@@ -74,6 +71,61 @@ _INDEX_HTML = """<!doctype html>
 </html>
 """
 
+# 静态页面在模块加载时编码一次，请求路径上不再重复 encode/len
+_INDEX_HTML_BYTES = _INDEX_HTML.encode("utf-8")
+_INDEX_HTML_LEN = str(len(_INDEX_HTML_BYTES))
+
+# 流式输出 JSON 数组时，累积到该大小再写一次 socket
+_STREAM_FLUSH_BYTES = 64 * 1024
+
+
+def _slo_payload(slo_status: Any) -> Dict[str, Any]:
+    return {
+        "all_compliant": slo_status.all_compliant,
+        "details": slo_status.details,
+        "violations": slo_status.violations,
+    }
+
+
+def _dashboard_payload(service: MonitoringService, domain: str) -> Dict[str, Any]:
+    """一次请求返回 slo/alerts/metrics；各部分独立容错，失败时返回 {"error": ...}。"""
+    payload: Dict[str, Any] = {}
+    try:
+        snapshot = service.evaluate_now()
+        payload["slo"] = _slo_payload(snapshot["slo_status"])
+        payload["alerts"] = snapshot["alerts"]
+    except Exception as exc:
+        payload["slo"] = {"error": str(exc)}
+        payload["alerts"] = {"error": str(exc)}
+    try:
+        payload["metrics"] = service.metrics_db.query(domain, copy=False)
+    except Exception as exc:
+        payload["metrics"] = {"error": str(exc)}
+    return payload
+
+
+class _PooledHTTPServer(ThreadingHTTPServer):
+    """用有界线程池处理连接，避免 ThreadingHTTPServer 每个请求新建线程（页面每 2s 轮询一次）。"""
+
+    def __init__(self, server_address: Any, handler_cls: Any, *, max_workers: int = 16):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="monitoring-dashboard-worker")
+        try:
+            super().__init__(server_address, handler_cls)
+        except BaseException:
+            self._executor.shutdown(wait=False)
+            raise
+
+    def process_request(self, request: Any, client_address: Any) -> None:
+        try:
+            self._executor.submit(self.process_request_thread, request, client_address)
+        except RuntimeError:
+            # 线程池已关闭（stop 过程中）
+            self.shutdown_request(request)
+
+    def server_close(self) -> None:
+        super().server_close()
+        self._executor.shutdown(wait=True)
+
 
 class MonitoringDashboardServer:
     """
@@ -82,18 +134,27 @@ class MonitoringDashboardServer:
     - GET /api/slo: 当前 SLO 状态
     - GET /api/alerts: 当前告警列表
     - GET /api/metrics?domain=task: 指定 domain 的记录
+    - GET /api/dashboard?domain=task: 上述三项的合并快照（只评估一次 SLO）
     """
 
-    def __init__(self, *, service: MonitoringService, host: str = "127.0.0.1", port: int = 8080):
+    def __init__(
+        self,
+        *,
+        service: MonitoringService,
+        host: str = "127.0.0.1",
+        port: int = 8080,
+        max_workers: int = 16,
+    ):
         self._service = service
         self.host = host
         self.port = port
-        self._httpd: Optional[ThreadingHTTPServer] = None
+        self._max_workers = max_workers
+        self._httpd: Optional[_PooledHTTPServer] = None
         self._thread: Optional[threading.Thread] = None
 
     def start(self) -> None:
         handler_cls = self._make_handler()
-        httpd = ThreadingHTTPServer((self.host, self.port), handler_cls)
+        httpd = _PooledHTTPServer((self.host, self.port), handler_cls, max_workers=self._max_workers)
         self._httpd = httpd
         # update port when binding to 0
         self.port = int(httpd.server_address[1])
@@ -125,18 +186,12 @@ class MonitoringDashboardServer:
                 qs = parse_qs(parsed.query or "")
 
                 if path == "/":
-                    self._send_html(_INDEX_HTML)
+                    self._send_static(_INDEX_HTML_BYTES, _INDEX_HTML_LEN, "text/html; charset=utf-8")
                     return
 
                 if path == "/api/slo":
                     snapshot = service.evaluate_now()
-                    slo_status = snapshot["slo_status"]
-                    payload = {
-                        "all_compliant": slo_status.all_compliant,
-                        "details": slo_status.details,
-                        "violations": slo_status.violations,
-                    }
-                    self._send_json(payload)
+                    self._send_json(_slo_payload(snapshot["slo_status"]))
                     return
 
                 if path == "/api/alerts":
@@ -146,7 +201,12 @@ class MonitoringDashboardServer:
 
                 if path == "/api/metrics":
                     domain = (qs.get("domain") or ["events"])[0]
-                    self._send_json(service.metrics_db.query(domain))
+                    self._send_json_array(service.metrics_db.iter_domain(domain))
+                    return
+
+                if path == "/api/dashboard":
+                    domain = (qs.get("domain") or ["events"])[0]
+                    self._send_json(_dashboard_payload(service, domain))
                     return
 
                 self.send_response(404)
@@ -157,20 +217,41 @@ class MonitoringDashboardServer:
                 return
 
             def _send_json(self, payload: Any) -> None:
-                raw = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+                raw = _json.dumps(payload)
                 self.send_response(200)
                 self.send_header("Content-Type", "application/json; charset=utf-8")
                 self.send_header("Content-Length", str(len(raw)))
                 self.end_headers()
                 self.wfile.write(raw)
 
-            def _send_html(self, html: str) -> None:
-                raw = html.encode("utf-8")
+            def _send_json_array(self, items: Iterable[Any]) -> None:
+                # 逐条编码并分段写出，内存占用与记录总数无关；HTTP/1.0 下不带 Content-Length，
+                # 以关闭连接标记响应结束（BaseHTTPRequestHandler 默认即为 HTTP/1.0）
                 self.send_response(200)
-                self.send_header("Content-Type", "text/html; charset=utf-8")
-                self.send_header("Content-Length", str(len(raw)))
+                self.send_header("Content-Type", "application/json; charset=utf-8")
+                self.send_header("Connection", "close")
                 self.end_headers()
-                self.wfile.write(raw)
+                self.close_connection = True
+
+                buf = bytearray(b"[")
+                first = True
+                for item in items:
+                    if not first:
+                        buf += b","
+                    buf += _json.dumps(item)
+                    first = False
+                    if len(buf) >= _STREAM_FLUSH_BYTES:
+                        self.wfile.write(buf)
+                        buf.clear()
+                buf += b"]"
+                self.wfile.write(buf)
+
+            def _send_static(self, body: bytes, content_length: str, content_type: str) -> None:
+                self.send_response(200)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", content_length)
+                self.end_headers()
+                self.wfile.write(body)
 
         return Handler
 
@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 from core.events.event_bus import EventBus
 
@@ -10,27 +10,38 @@ from .metrics_db import MetricsDB
 class EventBusMetricsIngestor:
     """
     把 EventBus 事件写入 MetricsDB（Phase 3 MVP）：
-    - 通过 domains_by_event_prefix 把 event_type 前缀映射到 domain
+    - 通过 domains_by_event_prefix 把 event_type 前缀映射到 domain（最长前缀优先）
     """
 
     def __init__(self, *, metrics_db: MetricsDB, domains_by_event_prefix: Dict[str, str]):
         self._db = metrics_db
         self._domains_by_prefix = dict(domains_by_event_prefix)
+        # 映射在初始化后固定：预先按前缀长度降序排列，首个命中即最长前缀
+        self._prefixes_sorted: List[Tuple[str, str]] = sorted(
+            self._domains_by_prefix.items(), key=lambda kv: -len(kv[0])
+        )
+        self._resolved: Dict[str, str] = {}
 
     def attach(self, event_bus: EventBus, *, event_types: List[str]) -> None:
         for et in event_types:
             event_bus.subscribe(et, self._make_handler(et))
 
     def _make_handler(self, event_type: str):
+        # 每个 handler 绑定固定的 event_type，domain 只需解析一次
+        domain = self._resolve_domain(event_type)
+
         async def handler(evt: Dict[str, Any]) -> None:
-            domain = self._resolve_domain(event_type)
             self._db.record(domain, {"event_type": event_type, "event": evt})
 
         return handler
 
     def _resolve_domain(self, event_type: str) -> str:
-        for prefix, domain in self._domains_by_prefix.items():
-            if event_type.startswith(prefix):
-                return domain
-        return "events"
+        domain = self._resolved.get(event_type)
+        if domain is not None:
+            return domain
+        domain = self._domains_by_prefix.get(event_type)
+        if domain is None:
+            domain = next((d for prefix, d in self._prefixes_sorted if event_type.startswith(prefix)), "events")
+        self._resolved[event_type] = domain
+        return domain
 
@@ -1,11 +1,29 @@
 from __future__ import annotations
 
-import json
+import atexit
+from collections import Counter, deque
 from dataclasses import dataclass
 from datetime import datetime
 from pathlib import Path
-from threading import Lock
-from typing import Any, Dict, List, Optional
+from threading import Lock, Timer
+import time
+from typing import IO, Any, Deque, Dict, Iterator, List, Optional
+import weakref
+
+from . import _json
+
+
+# 持有打开写句柄的实例；进程退出时统一 flush/close，避免缓冲中的记录丢失
+_OPEN_DBS: "weakref.WeakSet[MetricsDB]" = weakref.WeakSet()
+
+
+@atexit.register
+def _close_open_dbs() -> None:
+    for db in list(_OPEN_DBS):
+        try:
+            db.close()
+        except Exception:
+            pass
 
 
 @dataclass
@@ -13,6 +31,8 @@ class MetricRecord:
     domain: str
     timestamp: str
     data: Dict[str, Any]
+    # 写入时从 data["event_type"] 提取，计数/过滤直接读属性；不参与 JSONL 持久化
+    event_type: str = ""
 
 
 class MetricsDB:
@@ -20,12 +40,38 @@ class MetricsDB:
     最小 MetricsDB（Phase 3 MVP）：
     - 内存存储
     - 可选 JSONL 持久化（追加写；启动时回放）
+
+    持久化使用常驻的缓冲写句柄：每 flush_every 条或 flush_interval 秒 flush 一次
+    （写入停顿时由后台定时器兜底落盘），close()/flush() 或进程退出时落盘剩余数据。
+
+    max_records_per_domain 默认 None（不限，内存中保留完整历史）。常驻服务可设置上限：
+    每个 domain 超出时淘汰最旧的记录并同步扣减计数（计数随之变为最近 N 条的滑动窗口）；JSONL 文件不受影响。
     """
 
-    def __init__(self, persist_path: Optional[str] = None):
+    def __init__(
+        self,
+        persist_path: Optional[str] = None,
+        *,
+        flush_every: int = 64,
+        flush_interval: float = 1.0,
+        max_records_per_domain: Optional[int] = None,
+    ):
         self._lock = Lock()
-        self._records_by_domain: Dict[str, List[MetricRecord]] = {}
+        self._max_records = max(1, int(max_records_per_domain)) if max_records_per_domain is not None else None
+        self._records_by_domain: Dict[str, Deque[MetricRecord]] = {}
+        self._evicted = 0
+        # domain -> event_type -> count，随写入增量维护，计数查询无需扫描记录
+        self._counts: Dict[str, Dict[str, int]] = {}
+        # 每写入一条记录自增，供上层缓存判断数据是否变化
+        self._version = 0
         self._persist_path = Path(persist_path) if persist_path else None
+        self._fp: Optional[IO[bytes]] = None
+        self._pending = 0
+        self._flush_every = max(1, int(flush_every))
+        self._flush_interval = float(flush_interval)
+        self._last_flush = time.monotonic()
+        # 有未落盘记录时挂起的定时 flush；写入停顿后剩余记录最迟 flush_interval 秒可见
+        self._flush_timer: Optional[Timer] = None
 
         if self._persist_path:
             self._persist_path.parent.mkdir(parents=True, exist_ok=True)
@@ -39,50 +85,147 @@ class MetricsDB:
             raise ValueError("data 必须是对象(dict)")
 
         ts = timestamp or datetime.now().isoformat()
-        rec = MetricRecord(domain=domain, timestamp=ts, data=dict(data))
+        rec = MetricRecord(domain=domain, timestamp=ts, data=dict(data), event_type=str(data.get("event_type") or ""))
 
         with self._lock:
-            self._records_by_domain.setdefault(domain, []).append(rec)
+            self._add_record(rec)
             if self._persist_path:
-                self._append_jsonl(self._persist_path, rec)
+                self._append_jsonl(rec)
+
+    @property
+    def version(self) -> int:
+        return self._version
+
+    @property
+    def evicted(self) -> int:
+        """因超出 max_records_per_domain 被淘汰的记录总数。"""
+        return self._evicted
 
-    def query(self, domain: str) -> List[Dict[str, Any]]:
+    def query(self, domain: str, *, copy: bool = True) -> List[Dict[str, Any]]:
+        """
+        返回指定 domain 的全部记录。
+
+        copy=False 时 data 直接引用内部存储、不再逐条拷贝，调用方只能读取（如立即序列化）。
+        """
+        return list(self.iter_domain(domain, copy=copy))
+
+    def iter_domain(self, domain: str, *, copy: bool = False) -> Iterator[Dict[str, Any]]:
+        """按写入顺序逐条产出记录（加锁时只快照引用列表）；默认不拷贝 data，只读使用。"""
         with self._lock:
-            records = list(self._records_by_domain.get(domain, []))
-        return [{"domain": r.domain, "timestamp": r.timestamp, "data": dict(r.data)} for r in records]
+            records = list(self._records_by_domain.get(domain, ()))
+        for r in records:
+            yield {"domain": r.domain, "timestamp": r.timestamp, "data": dict(r.data) if copy else r.data}
 
     def count_event_type(self, domain: str, event_type: str) -> int:
         if not isinstance(event_type, str) or not event_type.strip():
             return 0
         with self._lock:
-            records = self._records_by_domain.get(domain, [])
-            return sum(1 for r in records if str(r.data.get("event_type") or "") == event_type)
+            return self._counts.get(domain, {}).get(event_type, 0)
 
-    def _append_jsonl(self, path: Path, rec: MetricRecord) -> None:
+    def event_type_counts(self, domain: str) -> Counter:
+        """返回指定 domain 下各 event_type 的计数（副本）。"""
+        with self._lock:
+            return Counter(self._counts.get(domain, {}))
+
+    def count_event_types(self, domain: str, event_types: List[str]) -> Dict[str, int]:
+        """一次加锁查询多个 event_type 的数量；未出现的类型计为 0。"""
+        with self._lock:
+            domain_counts = self._counts.get(domain, {})
+            return {et: domain_counts.get(et, 0) for et in event_types if isinstance(et, str) and et.strip()}
+
+    def _add_record(self, rec: MetricRecord) -> None:
+        # 调用方需持有锁（回放阶段除外）
+        records = self._records_by_domain.get(rec.domain)
+        if records is None:
+            records = self._records_by_domain[rec.domain] = deque(maxlen=self._max_records)
+        domain_counts = self._counts.setdefault(rec.domain, {})
+        if records.maxlen is not None and len(records) == records.maxlen:
+            old_et = records[0].event_type
+            remaining = domain_counts.get(old_et, 0) - 1
+            if remaining > 0:
+                domain_counts[old_et] = remaining
+            else:
+                domain_counts.pop(old_et, None)
+            self._evicted += 1
+        records.append(rec)
+        et = rec.event_type
+        domain_counts[et] = domain_counts.get(et, 0) + 1
+        self._version += 1
+
+    def flush(self) -> None:
+        with self._lock:
+            self._flush_locked()
+
+    def close(self) -> None:
+        with self._lock:
+            if self._fp is None:
+                return
+            if self._flush_timer is not None:
+                self._flush_timer.cancel()
+                self._flush_timer = None
+            try:
+                self._flush_locked()
+            finally:
+                self._fp.close()
+                self._fp = None
+                _OPEN_DBS.discard(self)
+
+    def _flush_locked(self) -> None:
+        if self._fp is not None and self._pending:
+            self._fp.flush()
+        self._pending = 0
+        self._last_flush = time.monotonic()
+
+    def _append_jsonl(self, rec: MetricRecord) -> None:
+        # 调用方需持有锁
+        if self._fp is None:
+            self._fp = self._persist_path.open("ab", buffering=1 << 16)
+            _OPEN_DBS.add(self)
         payload = {"domain": rec.domain, "timestamp": rec.timestamp, "data": rec.data}
-        with path.open("a", encoding="utf-8") as f:
-            f.write(json.dumps(payload, ensure_ascii=False) + "\n")
+        self._fp.write(_json.dumps(payload) + b"\n")
+        self._pending += 1
+        if self._pending >= self._flush_every or time.monotonic() - self._last_flush >= self._flush_interval:
+            self._flush_locked()
+        elif self._flush_timer is None:
+            timer = Timer(self._flush_interval, self._flush_on_timer)
+            timer.daemon = True
+            self._flush_timer = timer
+            timer.start()
+
+    def _flush_on_timer(self) -> None:
+        with self._lock:
+            self._flush_timer = None
+            if self._fp is not None:
+                self._flush_locked()
 
     def _load_from_jsonl(self, path: Path) -> None:
+        # 逐行流式回放：内存占用与文件大小无关；无法解析（含非法 UTF-8）的行直接跳过
         try:
-            text = path.read_text(encoding="utf-8")
+            f = path.open("rb")
         except Exception:
             return
-        for line in text.splitlines():
-            line = line.strip()
-            if not line:
-                continue
-            try:
-                payload = json.loads(line)
-            except Exception:
-                continue
-            if not isinstance(payload, dict):
-                continue
-            domain = payload.get("domain")
-            timestamp = payload.get("timestamp")
-            data = payload.get("data")
-            if not isinstance(domain, str) or not isinstance(timestamp, str) or not isinstance(data, dict):
-                continue
-            rec = MetricRecord(domain=domain, timestamp=timestamp, data=data)
-            self._records_by_domain.setdefault(domain, []).append(rec)
+        with f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    payload = _json.loads(line)
+                except Exception:
+                    continue
+                if not isinstance(payload, dict):
+                    continue
+                domain = payload.get("domain")
+                timestamp = payload.get("timestamp")
+                data = payload.get("data")
+                if not isinstance(domain, str) or not isinstance(timestamp, str) or not isinstance(data, dict):
+                    continue
+                self._add_record(
+                    MetricRecord(
+                        domain=domain,
+                        timestamp=timestamp,
+                        data=data,
+                        event_type=str(data.get("event_type") or ""),
+                    )
+                )
 
@@ -1,46 +1,106 @@
 from __future__ import annotations
 
-import json
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+import threading
+from typing import IO, Any, Dict, List, Optional
+
+from . import _json
 
 
 class AlertNotifier:
     def send(self, alerts: List[Dict[str, Any]]) -> None:
         raise NotImplementedError
 
+    def close(self) -> None:
+        """释放持有的资源（连接、文件句柄等）；默认无操作。"""
+        return None
+
 
 class FileAlertNotifier(AlertNotifier):
     """
     最小落盘告警：JSONL 追加写，用于 CI/本地留痕与后续集成。
+
+    首次发送时打开常驻的二进制追加句柄；每批告警拼成一个 blob 一次写入并 flush。
     """
 
     def __init__(self, *, path: str):
         self._path = Path(path)
         self._path.parent.mkdir(parents=True, exist_ok=True)
+        self._fp: Optional[IO[bytes]] = None
+        self._lock = threading.Lock()
 
     def send(self, alerts: List[Dict[str, Any]]) -> None:
         if not alerts:
             return
-        with self._path.open("a", encoding="utf-8") as f:
-            for alert in alerts:
-                f.write(json.dumps(alert, ensure_ascii=False) + "\n")
+        blob = b"".join(_json.dumps(alert) + b"\n" for alert in alerts)
+        with self._lock:
+            if self._fp is None:
+                self._fp = self._path.open("ab")
+            self._fp.write(blob)
+            self._fp.flush()
+
+    def close(self) -> None:
+        with self._lock:
+            fp, self._fp = self._fp, None
+        if fp is not None:
+            fp.close()
 
 
 class WebhookAlertNotifier(AlertNotifier):
     """
     Webhook 告警：在运行环境启用；单测不触网。
+
+    首次发送时创建常驻 requests.Session，复用连接池（避免每次告警重新 TCP/TLS 握手）；
+    连接失败与 502/503/504 会按退避重试（Retry 默认不重试 POST，这里显式放开；
+    网关已转发但返回 5xx 时，接收端可能收到重复告警）。
     """
 
-    def __init__(self, *, url: str, timeout_seconds: float = 3.0, headers: Optional[Dict[str, str]] = None):
+    def __init__(
+        self,
+        *,
+        url: str,
+        timeout_seconds: float = 3.0,
+        headers: Optional[Dict[str, str]] = None,
+        max_retries: int = 2,
+    ):
         self._url = url
         self._timeout = timeout_seconds
         self._headers = headers or {"Content-Type": "application/json"}
+        self._max_retries = max_retries
+        self._session: Any = None
+        self._session_lock = threading.Lock()
+
+    def _get_session(self) -> Any:
+        with self._session_lock:
+            if self._session is None:
+                import requests
+                from requests.adapters import HTTPAdapter
+                from urllib3.util.retry import Retry
+
+                session = requests.Session()
+                session.headers.update(self._headers)
+                retry = Retry(
+                    total=self._max_retries,
+                    backoff_factor=0.2,
+                    status_forcelist=(502, 503, 504),
+                    allowed_methods=frozenset({"POST"}),
+                    # 重试耗尽时返回最后一次响应，与未重试时的行为一致
+                    raise_on_status=False,
+                )
+                adapter = HTTPAdapter(pool_connections=4, pool_maxsize=8, max_retries=retry)
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                self._session = session
+            return self._session
 
     def send(self, alerts: List[Dict[str, Any]]) -> None:
         if not alerts:
             return
-        import requests
+        self._get_session().post(self._url, json={"alerts": alerts}, timeout=self._timeout)
 
-        requests.post(self._url, json={"alerts": alerts}, timeout=self._timeout, headers=self._headers)
+    def close(self) -> None:
+        with self._session_lock:
+            session, self._session = self._session, None
+        if session is not None:
+            session.close()
 
@@ -1,7 +1,9 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Any, Dict, List, Optional
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
 
 from core.events.event_bus import EventBus
 
@@ -33,6 +35,7 @@ class MonitoringService:
         slo_definitions: Dict[str, Dict[str, Any]],
         alert_manager: Optional[AlertManager] = None,
         notifier: Optional[AlertNotifier] = None,
+        evaluate_cache_ttl: float = 0.5,
     ):
         self.metrics_db = metrics_db
         self._evaluator = SLOEvaluator(definitions=slo_definitions)
@@ -40,6 +43,11 @@ class MonitoringService:
         self._notifier = notifier
         self._ingestor: Optional[EventBusMetricsIngestor] = None
 
+        # evaluate_now 短 TTL 缓存：吸收 dashboard 并发轮询；MetricsDB 有新写入时立即失效
+        self._cache_ttl = float(evaluate_cache_ttl)
+        self._cache_lock = threading.Lock()
+        self._cache: Optional[Tuple[float, int, Dict[str, Any]]] = None
+
     def attach_event_bus(
         self,
         event_bus: EventBus,
@@ -53,7 +61,43 @@ class MonitoringService:
         )
         self._ingestor.attach(event_bus, event_types=event_types)
 
+    def flush(self) -> None:
+        self.metrics_db.flush()
+
+    def close(self) -> None:
+        """关闭时落盘 MetricsDB 中尚未 flush 的记录，并释放告警通道持有的连接/句柄。"""
+        try:
+            self.metrics_db.close()
+        finally:
+            if self._notifier:
+                self._notifier.close()
+
     def evaluate_now(self) -> Dict[str, Any]:
+        if self._cache_ttl <= 0:
+            return self._evaluate()
+        cached = self._lookup_cache()
+        if cached is not None:
+            return cached
+        with self._cache_lock:
+            cached = self._lookup_cache()
+            if cached is not None:
+                return cached
+            version = self.metrics_db.version
+            snapshot = self._evaluate()
+            self._cache = (time.monotonic(), version, snapshot)
+        return dict(snapshot)
+
+    def _lookup_cache(self) -> Optional[Dict[str, Any]]:
+        cache = self._cache
+        if cache is None:
+            return None
+        ts, version, snapshot = cache
+        if version != self.metrics_db.version or time.monotonic() - ts >= self._cache_ttl:
+            return None
+        # 浅拷贝：调用方替换键不会影响缓存（slo_status/alerts 仍应视为只读）
+        return dict(snapshot)
+
+    def _evaluate(self) -> Dict[str, Any]:
         slo_status = self._evaluator.evaluate(self.metrics_db)
         alerts = self._alerts.generate_alerts(slo_status)
         return {"slo_status": slo_status, "alerts": alerts}
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+from collections import Counter
 from dataclasses import dataclass, field
 from typing import Any, Dict, List, Optional
 
@@ -25,6 +26,8 @@ class SLOEvaluator:
     def evaluate(self, metrics_db: MetricsDB) -> SLOStatus:
         details: Dict[str, Dict[str, Any]] = {}
         violations: Dict[str, str] = {}
+        # 每个 domain 在本次评估中只扫描一次记录
+        counts_by_domain: Dict[str, Counter] = {}
 
         for name, spec in self._definitions.items():
             slo_type = spec.get("type")
@@ -41,8 +44,11 @@ class SLOEvaluator:
                 violations[name] = "invalid slo spec"
                 continue
 
-            numerator = metrics_db.count_event_type(domain, numerator_event)
-            denominator = sum(metrics_db.count_event_type(domain, str(e)) for e in denom_events)
+            counts = counts_by_domain.get(domain)
+            if counts is None:
+                counts = counts_by_domain[domain] = metrics_db.event_type_counts(domain)
+            numerator = counts.get(numerator_event, 0)
+            denominator = sum(counts.get(str(e), 0) for e in denom_events if str(e).strip())
             value = float(numerator) / float(denominator) if denominator > 0 else 1.0
 
             details[name] = {
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import asyncio
+from concurrent.futures import ThreadPoolExecutor
 import importlib.util
 import inspect
 from pathlib import Path
@@ -17,6 +18,10 @@ class PluginLoadError(RuntimeError):
     pass
 
 
+# 并行加载插件模块的最大线程数
+_MAX_LOAD_WORKERS = 8
+
+
 class PluginManager:
     """插件管理器：负责加载、执行、卸载插件。"""
 
@@ -44,9 +49,9 @@ class PluginManager:
             enabled_set = {str(m).strip() for m in enabled_modules if isinstance(m, str) and str(m).strip()}
 
         modules = self._discover_modules(self.plugin_dir, enabled_set)
+        loaded = await self._load_modules(modules)
         discovered: List[AIGCPlugin] = []
-        for mod_path in modules:
-            module = self._load_module_from_path(mod_path)
+        for mod_path, module in zip(modules, loaded):
             discovered.extend(self._instantiate_plugins_from_module(module, mod_path.stem, plugin_configs, services))
 
         by_name: Dict[str, AIGCPlugin] = {}
@@ -58,13 +63,32 @@ class PluginManager:
             by_name[plugin.name] = plugin
 
         self._validate_dependencies(by_name)
-        order = self._toposort(by_name)
+        levels = self._toposort_levels(by_name)
 
         self._plugins = by_name
-        self._load_order = order
-
-        for name in order:
-            await self._plugins[name].setup()
+        self._load_order = [name for level in levels for name in level]
+
+        # 同层插件互不依赖，并发 setup；层与层之间保持依赖顺序
+        for level in levels:
+            results = await asyncio.gather(*(by_name[name].setup() for name in level), return_exceptions=True)
+            for result in results:
+                if isinstance(result, BaseException):
+                    raise result
+
+    async def _load_modules(self, modules: List[Path]) -> List[ModuleType]:
+        """在线程池中并行加载插件模块；按模块顺序返回，失败时抛出顺序上第一个错误。"""
+        if len(modules) <= 1:
+            return [self._load_module_from_path(path) for path in modules]
+        loop = asyncio.get_running_loop()
+        with ThreadPoolExecutor(max_workers=min(_MAX_LOAD_WORKERS, len(modules))) as executor:
+            results = await asyncio.gather(
+                *(loop.run_in_executor(executor, self._load_module_from_path, path) for path in modules),
+                return_exceptions=True,
+            )
+        for result in results:
+            if isinstance(result, BaseException):
+                raise result
+        return list(results)  # type: ignore[arg-type]
 
     async def unload_plugins(self) -> None:
         for name in reversed(self._load_order):
@@ -164,20 +188,30 @@ class PluginManager:
             if missing:
                 raise PluginLoadError(f"插件 {name} 依赖缺失: {missing}")
 
-    def _toposort(self, plugins: Dict[str, AIGCPlugin]) -> List[str]:
-        remaining: Dict[str, List[str]] = {
-            name: list(getattr(plugin, "dependencies", []) or []) for name, plugin in plugins.items()
-        }
-        order: List[str] = []
-        while remaining:
-            ready = sorted([name for name, deps in remaining.items() if not deps])
-            if not ready:
-                cycle = ", ".join(sorted(remaining.keys()))
-                raise PluginLoadError(f"插件依赖存在环: {cycle}")
+    def _toposort_levels(self, plugins: Dict[str, AIGCPlugin]) -> List[List[str]]:
+        """Kahn 算法按层拓扑排序：同层插件互不依赖，层内按名称排序保证顺序稳定。"""
+        indegree: Dict[str, int] = {name: 0 for name in plugins}
+        dependents: Dict[str, List[str]] = {name: [] for name in plugins}
+        for name, plugin in plugins.items():
+            for dep in list(getattr(plugin, "dependencies", []) or []):
+                indegree[name] += 1
+                dependents[dep].append(name)
+
+        levels: List[List[str]] = []
+        ready = sorted(name for name, degree in indegree.items() if degree == 0)
+        visited = 0
+        while ready:
+            levels.append(ready)
+            visited += len(ready)
+            next_ready: List[str] = []
             for name in ready:
-                order.append(name)
-                remaining.pop(name, None)
-                for deps in remaining.values():
-                    if name in deps:
-                        deps.remove(name)
-        return order
+                for dependent in dependents[name]:
+                    indegree[dependent] -= 1
+                    if indegree[dependent] == 0:
+                        next_ready.append(dependent)
+            ready = sorted(next_ready)
+
+        if visited < len(plugins):
+            cycle = ", ".join(sorted(name for name, degree in indegree.items() if degree > 0))
+            raise PluginLoadError(f"插件依赖存在环: {cycle}")
+        return levels
@@ -2,31 +2,73 @@ from __future__ import annotations
 
 from dataclasses import dataclass, field
 from datetime import datetime
+from functools import lru_cache
 import json
+import sys
 from typing import Any, Dict, Optional
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+# datetime/dataclass 不交给 orjson 原生序列化，保持与 json.dumps 相同的 TypeError 行为
+_ORJSON_TO_JSON_OPTIONS = (
+    orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS
+    if orjson is not None
+    else 0
+)
+
 
 class ScenarioContextValidationError(ValueError):
     pass
 
 
+# from_dict 需要校验的字段表
+_REQUIRED_STR_FIELDS = ("test_id", "business_flow", "test_name")
+_DICT_FIELDS = ("test_data", "environment", "execution_options", "expected_results")
+
+
+@lru_cache(maxsize=1024)
+def _parse_iso(value: str) -> datetime:
+    # 批量导入的上下文常带相同的时间戳；datetime 不可变，可安全共享（解析失败不会被缓存）
+    return datetime.fromisoformat(value)
+
+
+@lru_cache(maxsize=1024)
+def _format_iso_cached(value: datetime, tzinfo: Any, fold: int) -> str:
+    return value.isoformat()
+
+
+def _format_iso(value: datetime) -> str:
+    # 同一批上下文的时间戳多为同一对象；相等的 aware datetime 可能处于不同时区，tzinfo/fold 一并作为缓存键
+    return _format_iso_cached(value, value.tzinfo, value.fold)
+
+
 def _require_str(data: Dict[str, Any], key: str) -> str:
     value = data.get(key)
-    if not isinstance(value, str) or not value.strip():
-        raise ScenarioContextValidationError(f"字段 {key} 必须是非空字符串")
-    return value
+    # 精确类型快路径：常见输入是普通 str/dict，跳过 isinstance 的子类检查
+    if value.__class__ is str or isinstance(value, str):
+        if value.strip():
+            return value
+    raise ScenarioContextValidationError(f"字段 {key} 必须是非空字符串")
 
 
 def _require_dict(data: Dict[str, Any], key: str) -> Dict[str, Any]:
-    value = data.get(key, {})
+    value = data.get(key)
     if value is None:
         return {}
-    if not isinstance(value, dict):
-        raise ScenarioContextValidationError(f"字段 {key} 必须是对象(dict)")
-    return value
+    if value.__class__ is dict or isinstance(value, dict):
+        return value
+    raise ScenarioContextValidationError(f"字段 {key} 必须是对象(dict)")
+
+
+# Python 3.10+ 使用 __slots__：实例无 __dict__，内存更小、属性访问更快；旧版本保持普通 dataclass
+_DATACLASS_OPTIONS: Dict[str, Any] = {"slots": True} if sys.version_info >= (3, 10) else {}
 
 
-@dataclass
+@dataclass(**_DATACLASS_OPTIONS)
 class ScenarioContext:
     """跨层数据传输的标准协议（v2）"""
 
@@ -58,12 +100,26 @@ class ScenarioContext:
             "environment": self.environment,
             "execution_options": self.execution_options,
             "expected_results": self.expected_results,
-            "created_at": self.created_at.isoformat(),
-            "updated_at": self.updated_at.isoformat() if self.updated_at else None,
+            "created_at": _format_iso(self.created_at),
+            "updated_at": _format_iso(self.updated_at) if self.updated_at else None,
         }
 
     def to_json(self) -> str:
-        return json.dumps(self.to_dict(), ensure_ascii=False, indent=2)
+        """
+        序列化为 2 空格缩进、保留非 ASCII 的 JSON 文本。
+
+        安装 orjson 时由其编码：解析结果与标准库一致，但文本不保证逐字节相同
+        （浮点指数写法 1e16 / 1e+16 不同，NaN/Infinity 写为 null，UUID 会被序列化）。
+        datetime/dataclass 仍按标准库行为抛 TypeError；超出 64 位的整数回退标准库编码。
+        不要对该文本做逐字节比较或哈希。
+        """
+        data = self.to_dict()
+        if orjson is not None:
+            try:
+                return orjson.dumps(data, option=_ORJSON_TO_JSON_OPTIONS).decode("utf-8")
+            except orjson.JSONEncodeError:
+                pass
+        return json.dumps(data, ensure_ascii=False, indent=2)
 
     def update(self, **kwargs: Any) -> None:
         for key, value in kwargs.items():
@@ -74,8 +130,8 @@ class ScenarioContext:
     @classmethod
     def from_json(cls, json_str: str) -> ScenarioContext:
         try:
-            payload = json.loads(json_str)
-        except json.JSONDecodeError as exc:
+            payload = orjson.loads(json_str) if orjson is not None else json.loads(json_str)
+        except json.JSONDecodeError as exc:  # orjson.JSONDecodeError 是其子类
             raise ScenarioContextValidationError("ScenarioContext JSON 解析失败") from exc
         if not isinstance(payload, dict):
             raise ScenarioContextValidationError("ScenarioContext JSON 顶层必须是对象(dict)")
@@ -88,32 +144,20 @@ class ScenarioContext:
         if version.startswith("1."):
             normalized = cls._upgrade_v1_to_v2(payload)
 
-        test_id = _require_str(normalized, "test_id")
-        business_flow = _require_str(normalized, "business_flow")
-        test_name = _require_str(normalized, "test_name")
-
-        test_data = _require_dict(normalized, "test_data")
-        environment = _require_dict(normalized, "environment")
-        execution_options = _require_dict(normalized, "execution_options")
-        expected_results = _require_dict(normalized, "expected_results")
+        kwargs: Dict[str, Any] = {key: _require_str(normalized, key) for key in _REQUIRED_STR_FIELDS}
+        for key in _DICT_FIELDS:
+            kwargs[key] = _require_dict(normalized, key)
 
         created_at = cls._parse_dt(normalized.get("created_at")) or datetime.now()
         updated_at = cls._parse_dt(normalized.get("updated_at"))
 
-        ctx = cls(
-            test_id=test_id,
-            business_flow=business_flow,
-            test_name=test_name,
-            test_data=test_data,
-            environment=environment,
-            execution_options=execution_options,
-            expected_results=expected_results,
+        return cls(
+            **kwargs,
             created_at=created_at,
             updated_at=updated_at,
             version=str(normalized.get("version") or "2.0"),
             schema_version=str(normalized.get("schema_version") or "2.0"),
         )
-        return ctx
 
     @staticmethod
     def _parse_dt(value: Any) -> Optional[datetime]:
@@ -123,7 +167,7 @@ class ScenarioContext:
             return value
         if isinstance(value, str) and value.strip():
             try:
-                return datetime.fromisoformat(value)
+                return _parse_iso(value)
             except ValueError as exc:
                 raise ScenarioContextValidationError("时间字段必须是 ISO8601 格式") from exc
         raise ScenarioContextValidationError("时间字段必须是字符串或 datetime")
@@ -17,38 +17,194 @@ import yaml
 import argparse
 import logging
 import subprocess
+import time
 from pathlib import Path
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Tuple
 from datetime import datetime
+from types import MappingProxyType
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 # Add project root to path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+# 优先使用 libyaml 的 C 实现（语义与 SafeLoader 相同），不可用时回退纯 Python 版本
+_YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+# Registry 解析缓存：abs_path -> (mtime_ns, size, registry)；文件变化后自动重新解析。
+# 缓存的 registry 在多个引擎间共享，只读使用。
+_REGISTRY_CACHE: Dict[str, Tuple[int, int, Any]] = {}
+
+# 查找缺省值：只读共享的空映射/空序列，避免 .get(key, {}) 每次分配新对象
+_EMPTY: Any = MappingProxyType({})
+_EMPTY_SEQ: Tuple = ()
+
+# workflow 子进程命令前缀与 leaf 复现命令前缀
+_WORKFLOW_CMD_PREFIX = (sys.executable, "src/main_workflow.py", "--workflow")
+_LEAF_REPRO_PREFIX = "python3 src/main_workflow.py --workflow "
+
+# 报告中保留的 stdout/stderr 尾部字符数；读取时按 UTF-8 最长 4 字节/字符保留字节尾部
+_OUTPUT_TAIL_CHARS = 1000
+_OUTPUT_TAIL_BYTES = _OUTPUT_TAIL_CHARS * 4
+
+
+async def _read_tail(stream: Optional[asyncio.StreamReader], limit: int = _OUTPUT_TAIL_BYTES) -> bytes:
+    """持续读取管道直到 EOF，只保留最后 limit 字节，避免缓存完整输出"""
+    if stream is None:
+        return b""
+    tail = bytearray()
+    while True:
+        chunk = await stream.read(65536)
+        if not chunk:
+            return bytes(tail)
+        tail += chunk
+        if len(tail) > limit:
+            del tail[:-limit]
+
+
+def _read_spec_from_yaml_events(registry_path: str, spec_id: str) -> Optional[Dict]:
+    """
+    基于 YAML 事件流只构造 spec_registry.<spec_id> 子树：其余 spec 只扫描不构造对象，
+    找到目标后立即停止。未找到返回 None；结构不符合预期（非标量 key、别名等）时抛异常，由调用方回退。
+    """
+    with open(registry_path, "r", encoding="utf-8") as f:
+        events = iter(yaml.parse(f, Loader=_YAML_LOADER))
+
+        def skip_node(first: yaml.Event) -> None:
+            collect_node(first, keep=False)
+
+        def collect_node(first: yaml.Event, keep: bool = True) -> List[yaml.Event]:
+            collected = [first] if keep else []
+            if isinstance(first, (yaml.MappingStartEvent, yaml.SequenceStartEvent)):
+                depth = 1
+                while depth:
+                    event = next(events)
+                    if isinstance(event, (yaml.MappingStartEvent, yaml.SequenceStartEvent)):
+                        depth += 1
+                    elif isinstance(event, (yaml.MappingEndEvent, yaml.SequenceEndEvent)):
+                        depth -= 1
+                    if keep:
+                        collected.append(event)
+            return collected
+
+        def find_value(key: str) -> Optional[yaml.Event]:
+            # 调用前已消费 MappingStartEvent；返回 key 对应值节点的首个事件
+            while True:
+                event = next(events)
+                if isinstance(event, yaml.MappingEndEvent):
+                    return None
+                if not isinstance(event, yaml.ScalarEvent):
+                    raise ValueError("registry contains non-scalar mapping keys")
+                value = next(events)
+                if event.value == key:
+                    return value
+                skip_node(value)
+
+        for event in events:
+            if isinstance(event, yaml.MappingStartEvent):
+                break
+        else:
+            return None
+
+        registry_node = find_value("spec_registry")
+        if registry_node is None:
+            return None
+        if not isinstance(registry_node, yaml.MappingStartEvent):
+            raise ValueError("spec_registry is not a mapping")
+        spec_node = find_value(spec_id)
+        if spec_node is None:
+            return None
+        spec_events = collect_node(spec_node)
+
+    document = yaml.emit(
+        [
+            yaml.StreamStartEvent(),
+            yaml.DocumentStartEvent(),
+            *spec_events,
+            yaml.DocumentEndEvent(),
+            yaml.StreamEndEvent(),
+        ]
+    )
+    return yaml.load(document, Loader=_YAML_LOADER)
+
 
 class SpecExecutionEngine:
     """Spec树执行引擎 - 专注于解决Spec到Workflow的执行割裂"""
 
-    def __init__(self):
+    def __init__(self, max_parallel: Optional[int] = None, isolate: bool = True):
         self.logger = logging.getLogger(__name__)
         self.registry = None
+        # 默认每个 leaf 启动独立子进程；isolate=False 时在当前进程内执行，省去解释器启动与重复 import，
+        # 但各 workflow 共享进程内全局状态，只能串行执行
+        self.isolate = isolate
+        self._in_process_runner: Any = None
+        # 同时执行的 workflow 上限（默认读取 SPEC_MAX_PARALLEL，未设置时为 4；进程内执行固定为 1）
+        if max_parallel is None:
+            max_parallel = int(os.getenv("SPEC_MAX_PARALLEL", "4"))
+        self.max_parallel = max(1, max_parallel) if isolate else 1
+
+        # 当前 spec_config 的 leaf_tests/modes 索引与 workflow 存在性缓存（每次 execute_spec 重建）
+        self._indexed_spec: Optional[Dict] = None
+        self._leaf_index: Dict[str, Dict] = {}
+        self._mode_index: Dict[str, Dict] = {}
+        self._workflow_exists: Dict[str, bool] = {}
+
+    def _index_spec(self, spec_config: Dict, *, refresh: bool = False) -> None:
+        if refresh or self._indexed_spec is not spec_config:
+            self._leaf_index = spec_config.get("leaf_tests") or {}
+            self._mode_index = spec_config.get("modes") or {}
+            self._workflow_exists = {}
+            self._indexed_spec = spec_config
 
     def load_registry(self, registry_path: str) -> Dict:
-        """加载Spec Registry"""
+        """加载Spec Registry（按路径 + mtime + size 缓存解析结果）"""
         try:
-            with open(registry_path, "r", encoding="utf-8") as f:
-                self.registry = yaml.safe_load(f)
+            abs_path = os.path.abspath(registry_path)
+            st = os.stat(abs_path)
+            cached = _REGISTRY_CACHE.get(abs_path)
+            if cached is not None and cached[0] == st.st_mtime_ns and cached[1] == st.st_size:
+                self.registry = cached[2]
+                self.logger.debug(f"Using cached spec registry for {registry_path}")
+                return self.registry
+
+            with open(abs_path, "r", encoding="utf-8") as f:
+                self.registry = yaml.load(f, Loader=_YAML_LOADER)
+            _REGISTRY_CACHE[abs_path] = (st.st_mtime_ns, st.st_size, self.registry)
             self.logger.info(f"Loaded spec registry from {registry_path}")
             return self.registry
         except Exception as e:
             self.logger.error(f"Failed to load registry: {e}")
             raise
 
+    def resolve_spec_lazy(self, spec_id: str, registry_path: str) -> Dict:
+        """
+        只解析目标 spec（适用于单个 spec 的 CLI 执行）。
+
+        registry 未加载时，self.registry 仅包含该 spec；流式解析失败时回退为完整加载。
+        """
+        if self.registry:
+            return self.resolve_spec(spec_id)
+        try:
+            spec_config = _read_spec_from_yaml_events(registry_path, spec_id)
+        except Exception as e:
+            self.logger.debug(f"Lazy spec parse failed, falling back to full load: {e}")
+            spec_config = None
+        if not spec_config:
+            self.load_registry(registry_path)
+            return self.resolve_spec(spec_id)
+        self.registry = {"spec_registry": {spec_id: spec_config}}
+        self.logger.info(f"Loaded spec {spec_id} from {registry_path}")
+        return spec_config
+
     def resolve_spec(self, spec_id: str) -> Dict:
         """解析Spec配置"""
         if not self.registry:
             raise ValueError("Registry not loaded")
 
-        spec_config = self.registry.get("spec_registry", {}).get(spec_id)
+        spec_config = (self.registry.get("spec_registry") or _EMPTY).get(spec_id)
         if not spec_config:
             raise ValueError(f"Spec not found: {spec_id}")
 
@@ -56,28 +212,33 @@ class SpecExecutionEngine:
 
     def get_execution_plan(self, spec_config: Dict, mode: str) -> List[str]:
         """根据mode获取执行计划的节点列表"""
-        modes = spec_config.get("modes", {})
-        mode_config = modes.get(mode)
+        self._index_spec(spec_config)
+        mode_config = self._mode_index.get(mode)
 
         if not mode_config:
             raise ValueError(f"Mode not found: {mode}")
 
-        return mode_config.get("include", [])
+        return mode_config.get("include") or []
 
     def resolve_leaf_to_workflow(self, leaf_id: str, spec_config: Dict) -> str:
         """将leaf节点解析为workflow路径"""
-        leaf_tests = spec_config.get("leaf_tests", {})
-        leaf_config = leaf_tests.get(leaf_id)
+        self._index_spec(spec_config)
+        leaf_config = self._leaf_index.get(leaf_id)
 
         if not leaf_config:
             raise ValueError(f"Leaf test not found: {leaf_id}")
 
-        executor = leaf_config.get("executor", {})
+        executor = leaf_config.get("executor") or _EMPTY
         if executor.get("kind") != "workflow":
             raise ValueError(f"Leaf {leaf_id} is not a workflow executor")
 
         workflow_path = executor.get("ref")
-        if not workflow_path or not os.path.exists(workflow_path):
+        if not workflow_path:
+            raise FileNotFoundError(f"Workflow not found: {workflow_path}")
+        exists = self._workflow_exists.get(workflow_path)
+        if exists is None:
+            exists = self._workflow_exists[workflow_path] = os.path.exists(workflow_path)
+        if not exists:
             raise FileNotFoundError(f"Workflow not found: {workflow_path}")
 
         return workflow_path
@@ -86,29 +247,27 @@ class SpecExecutionEngine:
         self, node_path: str, root: Dict, spec_config: Dict
     ) -> List[str]:
         """将节点路径解析为leaf ID列表"""
-        path_parts = node_path.split(".")
         current = root
 
-        # 导航到目标节点
-        for part in path_parts:
+        # 只从 root 导航一次到目标节点
+        for part in node_path.split("."):
             if part == "root":
                 continue
-            current = current.get(part, {})
-
-        # 如果是leaf节点，直接返回
-        if current.get("type") == "test":
-            return [current.get("id")]
+            current = current.get(part) or _EMPTY
 
-        # 如果是suite节点，递归解析children
-        children = current.get("children", [])
+        # 从目标节点迭代深度优先遍历：子节点直接从父节点取，不再从 root 重走路径
         leaf_ids = []
-
-        for child_id in children:
-            child_path = f"{node_path}.{child_id}"
-            child_leaf_ids = self.resolve_node_to_leaf_ids(
-                child_path, root, spec_config
-            )
-            leaf_ids.extend(child_leaf_ids)
+        stack = [current]
+        while stack:
+            node = stack.pop()
+            # 如果是leaf节点，直接收集
+            if node.get("type") == "test":
+                leaf_ids.append(node.get("id"))
+                continue
+            # 如果是suite节点，children 逆序压栈以保持原有顺序
+            children = node.get("children") or _EMPTY_SEQ
+            for child_id in reversed(children):
+                stack.append(node.get(child_id) or _EMPTY)
 
         return leaf_ids
 
@@ -116,6 +275,8 @@ class SpecExecutionEngine:
         """执行Spec的入口点 - 核心逻辑"""
         # 加载和解析Spec
         spec_config = self.resolve_spec(spec_id)
+        # 每次执行重建索引：workflow 文件存在性只在本次执行内复用
+        self._index_spec(spec_config, refresh=True)
 
         self.logger.info(f"Executing spec: {spec_id}[{mode}]")
 
@@ -132,62 +293,145 @@ class SpecExecutionEngine:
         }
 
         # 去重并执行 (保持顺序)
-        seen = set()
-        unique_leaf_ids = [x for x in target_leaf_ids if not (x in seen or seen.add(x))]
+        unique_leaf_ids = list(dict.fromkeys(target_leaf_ids))
         self.logger.info(f"Resolved leaf IDs: {unique_leaf_ids}")
 
-        results = []
-        for leaf_id in unique_leaf_ids:
+        # leaf 之间相互独立：有界并发执行，结果按 leaf 顺序返回
+        semaphore = asyncio.Semaphore(self.max_parallel)
+
+        async def run_leaf(leaf_id: str) -> Dict:
             try:
                 workflow_path = self.resolve_leaf_to_workflow(leaf_id, spec_config)
-                result = await self._execute_workflow(workflow_path, leaf_id, context)
-                results.append(result)
             except Exception as e:
-                error_result = {
+                self.logger.error(f"Failed to execute {leaf_id}: {e}")
+                return {
                     "leaf_id": leaf_id,
                     "workflow_path": f"NOT_FOUND: {leaf_id}",
                     "success": False,
                     "error": str(e),
                     "duration_sec": 0,
                 }
-                results.append(error_result)
-                self.logger.error(f"Failed to execute {leaf_id}: {e}")
+            async with semaphore:
+                return await self._execute_workflow(workflow_path, leaf_id, context)
+
+        results = list(await asyncio.gather(*(run_leaf(leaf_id) for leaf_id in unique_leaf_ids)))
 
         # 聚合结果
         return self._aggregate_results(spec_id, mode, results, context)
 
+    def _get_in_process_runner(self) -> Any:
+        """按需导入 main_workflow.run_workflow；导入失败时返回 None（回退子进程模式）"""
+        if self._in_process_runner is None:
+            try:
+                from main_workflow import run_workflow
+            except Exception as e:
+                self.logger.warning(f"In-process runner unavailable, falling back to subprocess: {e}")
+                run_workflow = False
+            self._in_process_runner = run_workflow
+        return self._in_process_runner or None
+
     async def _execute_workflow(
         self, workflow_path: str, leaf_id: str, context: Dict
     ) -> Dict:
         """执行单个workflow"""
-        start_time = datetime.now()
+        runner = None if self.isolate else self._get_in_process_runner()
+        if runner is not None:
+            return await self._execute_workflow_in_process(runner, workflow_path, leaf_id)
+        return await self._execute_workflow_subprocess(workflow_path, leaf_id)
+
+    async def _execute_workflow_in_process(
+        self, runner: Any, workflow_path: str, leaf_id: str
+    ) -> Dict:
+        """在当前进程内执行单个workflow"""
+        start_time = time.perf_counter()  # 单调时钟计时，不受系统时间调整影响
+
+        try:
+            self.logger.info(f"Executing workflow in-process: {workflow_path} (leaf: {leaf_id})")
+            outcome = await asyncio.wait_for(
+                runner(workflow_path, setup_logs=False), timeout=1800  # 30分钟超时
+            )
+            result = outcome.get("result") or {}
+            success = bool(result.get("overall_success"))
+            entry = {
+                "leaf_id": leaf_id,
+                "workflow_path": workflow_path,
+                "success": success,
+                "duration_sec": time.perf_counter() - start_time,
+                "returncode": 0 if success else 1,
+                # 进程内执行不捕获输出
+                "stdout": None,
+                "stderr": None,
+            }
+            if not success:
+                error = result.get("error")
+                entry["error"] = (
+                    error.get("error", "Unknown error") if isinstance(error, dict) else str(error or "Unknown error")
+                )
+            return entry
+
+        except asyncio.TimeoutError:
+            return {
+                "leaf_id": leaf_id,
+                "workflow_path": workflow_path,
+                "success": False,
+                "duration_sec": time.perf_counter() - start_time,
+                "error": "TIMEOUT",
+                "stdout": None,
+                "stderr": None,
+            }
+        except Exception as e:
+            return {
+                "leaf_id": leaf_id,
+                "workflow_path": workflow_path,
+                "success": False,
+                "duration_sec": time.perf_counter() - start_time,
+                "error": str(e),
+                "stdout": None,
+                "stderr": None,
+            }
+
+    async def _execute_workflow_subprocess(
+        self, workflow_path: str, leaf_id: str
+    ) -> Dict:
+        """在独立子进程中执行单个workflow"""
+        start_time = time.perf_counter()
 
         try:
             self.logger.info(f"Executing workflow: {workflow_path} (leaf: {leaf_id})")
 
             # 构造执行命令
-            cmd = [sys.executable, "src/main_workflow.py", "--workflow", workflow_path]
-
-            # 执行workflow
-            result = subprocess.run(
-                cmd,
-                capture_output=True,
-                text=True,
-                timeout=1800,  # 30分钟超时
+            cmd = (*_WORKFLOW_CMD_PREFIX, workflow_path)
+
+            # 执行workflow（异步子进程，不阻塞事件循环）
+            proc = await asyncio.create_subprocess_exec(
+                *cmd,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
             )
+            try:
+                stdout_raw, stderr_raw, _ = await asyncio.wait_for(
+                    asyncio.gather(_read_tail(proc.stdout), _read_tail(proc.stderr), proc.wait()),
+                    timeout=1800,  # 30分钟超时
+                )
+            except asyncio.TimeoutError:
+                proc.kill()
+                await proc.wait()
+                raise subprocess.TimeoutExpired(cmd, 1800)
 
-            duration = (datetime.now() - start_time).total_seconds()
+            stdout = stdout_raw.decode("utf-8", errors="replace")
+            stderr = stderr_raw.decode("utf-8", errors="replace")
+            duration = time.perf_counter() - start_time
 
             return {
                 "leaf_id": leaf_id,
                 "workflow_path": workflow_path,
-                "success": result.returncode == 0,
+                "success": proc.returncode == 0,
                 "duration_sec": duration,
-                "stdout": result.stdout[-1000:]
-                if result.stdout
+                "stdout": stdout[-_OUTPUT_TAIL_CHARS:]
+                if stdout
                 else "",  # 限制输出长度
-                "stderr": result.stderr[-1000:] if result.stderr else "",
-                "returncode": result.returncode,
+                "stderr": stderr[-_OUTPUT_TAIL_CHARS:] if stderr else "",
+                "returncode": proc.returncode,
             }
 
         except subprocess.TimeoutExpired:
@@ -195,7 +439,7 @@ class SpecExecutionEngine:
                 "leaf_id": leaf_id,
                 "workflow_path": workflow_path,
                 "success": False,
-                "duration_sec": (datetime.now() - start_time).total_seconds(),
+                "duration_sec": time.perf_counter() - start_time,
                 "error": "TIMEOUT",
             }
         except Exception as e:
@@ -203,7 +447,7 @@ class SpecExecutionEngine:
                 "leaf_id": leaf_id,
                 "workflow_path": workflow_path,
                 "success": False,
-                "duration_sec": (datetime.now() - start_time).total_seconds(),
+                "duration_sec": time.perf_counter() - start_time,
                 "error": str(e),
             }
 
@@ -212,20 +456,21 @@ class SpecExecutionEngine:
     ) -> Dict:
         """聚合执行结果"""
         total_workflows = len(results)
-        successful_workflows = sum(1 for r in results if r.get("success"))
-
-        # 生成统一的复现命令
-        repro_command = f"python3 src/main_workflow.py --spec {spec_id} --mode {mode}"
 
-        # 生成leaf级别的复现命令
+        # 单次遍历同时统计成功数、总耗时并生成leaf级别的复现命令
+        successful_workflows = 0
+        total_duration = 0
         leaf_repro_commands = {}
         for result in results:
-            leaf_id = result.get("leaf_id")
+            if result.get("success"):
+                successful_workflows += 1
+            total_duration += result.get("duration_sec", 0)
             workflow_path = result.get("workflow_path")
             if workflow_path and not workflow_path.startswith("NOT_FOUND"):
-                leaf_repro_commands[leaf_id] = (
-                    f"python3 src/main_workflow.py --workflow {workflow_path}"
-                )
+                leaf_repro_commands[result.get("leaf_id")] = _LEAF_REPRO_PREFIX + workflow_path
+
+        # 生成统一的复现命令
+        repro_command = f"python3 src/main_workflow.py --spec {spec_id} --mode {mode}"
 
         return {
             "spec_id": spec_id,
@@ -238,7 +483,7 @@ class SpecExecutionEngine:
                 "success_rate": successful_workflows / total_workflows
                 if total_workflows > 0
                 else 0,
-                "total_duration_sec": sum(r.get("duration_sec", 0) for r in results),
+                "total_duration_sec": total_duration,
             },
             "repro_command": repro_command,
             "leaf_repro_commands": leaf_repro_commands,
@@ -258,6 +503,11 @@ async def main():
         "--registry", default="config/spec_registry.yaml", help="Spec registry file"
     )
     parser.add_argument("--debug", action="store_true", help="Debug mode")
+    parser.add_argument(
+        "--in-process",
+        action="store_true",
+        help="Run workflows serially in the current process instead of one subprocess each",
+    )
 
     args = parser.parse_args()
 
@@ -270,10 +520,10 @@ async def main():
 
     try:
         # 创建执行引擎
-        engine = SpecExecutionEngine()
+        engine = SpecExecutionEngine(isolate=not args.in_process)
 
-        # 加载registry
-        engine.load_registry(args.registry)
+        # 加载registry（单个 spec 执行只解析目标 spec）
+        engine.resolve_spec_lazy(args.spec, args.registry)
 
         # 执行Spec
         result = await engine.execute_spec(args.spec, args.mode)
@@ -318,10 +568,20 @@ async def main():
         report_path = f"reports/spec_{args.spec}_{args.mode}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
         os.makedirs("reports", exist_ok=True)
 
-        import json
+        if orjson is not None:
+            with open(report_path, "wb") as f:
+                f.write(
+                    orjson.dumps(
+                        result,
+                        option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS,
+                        default=str,
+                    )
+                )
+        else:
+            import json
 
-        with open(report_path, "w", encoding="utf-8") as f:
-            json.dump(result, f, indent=2, ensure_ascii=False, default=str)
+            with open(report_path, "w", encoding="utf-8") as f:
+                json.dump(result, f, indent=2, ensure_ascii=False, default=str)
 
         print(f"\n📄 Detailed report saved to: {report_path}")
         print("=" * 60)
@@ -2,7 +2,12 @@ from __future__ import annotations
 
 from abc import ABC, abstractmethod
 import copy
-from typing import Any, Dict, List, Optional
+from typing import Any, Callable, Dict, List, Optional
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 
 class TaskObserver(ABC):
@@ -25,9 +30,30 @@ class SequenceTaskObserver(TaskObserver):
     def __init__(self, statuses: List[Dict[str, Any]]):
         if not statuses:
             raise ValueError("statuses 不能为空")
-        self._statuses = [copy.deepcopy(s) for s in statuses]
+        # 每个状态预先冻结为一个“生成副本”的函数：纯 JSON 数据用 orjson 字节快照（loads 比 deepcopy 快），
+        # 无法无损往返的（tuple、datetime、非 str key 等）回退 deepcopy
+        # 同一个状态对象被多次传入（共享模板）时只冻结一次
+        frozen: Dict[int, Callable[[], Dict[str, Any]]] = {}
+        self._statuses: List[Callable[[], Dict[str, Any]]] = []
+        for s in statuses:
+            snapshot = frozen.get(id(s))
+            if snapshot is None:
+                snapshot = frozen[id(s)] = self._freeze(s)
+            self._statuses.append(snapshot)
         self._index = 0
 
+    @staticmethod
+    def _freeze(status: Dict[str, Any]) -> Callable[[], Dict[str, Any]]:
+        if orjson is not None:
+            try:
+                raw = orjson.dumps(status)
+                if orjson.loads(raw) == status:
+                    return lambda: orjson.loads(raw)
+            except (TypeError, ValueError):
+                pass
+        snapshot = copy.deepcopy(status)
+        return lambda: copy.deepcopy(snapshot)
+
     async def get_status(
         self,
         *,
@@ -36,9 +62,9 @@ class SequenceTaskObserver(TaskObserver):
         task_params: Dict[str, Any],
     ) -> Dict[str, Any]:
         if self._index < len(self._statuses):
-            status = self._statuses[self._index]
+            snapshot = self._statuses[self._index]
             self._index += 1
         else:
-            status = self._statuses[-1]
-        return copy.deepcopy(status)
+            snapshot = self._statuses[-1]
+        return snapshot()
 
@@ -2,9 +2,10 @@
 E2E 专用模块
 """
 
-from .golden_path_validator import validate_golden_path_workflow, evaluate_golden_path_coverage
+from .golden_path_validator import analyze_golden_path, validate_golden_path_workflow, evaluate_golden_path_coverage
 
 __all__ = [
+    "analyze_golden_path",
     "validate_golden_path_workflow",
     "evaluate_golden_path_coverage",
 ]
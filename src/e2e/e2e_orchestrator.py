@@ -12,9 +12,17 @@ E2E编排器 - 负责协调和管理端到端测试的完整执行流程
 """
 
 import asyncio
+from collections import deque
+import hashlib
+import inspect
+import itertools
+import json
 import logging
+import sys
+import time
+from dataclasses import asdict, dataclass, is_dataclass
 from datetime import datetime
-from typing import Dict, Any, List, Optional, Callable
+from typing import Dict, Any, List, Optional, Callable, Set, Tuple
 from pathlib import Path
 
 from ..models.context import Context
@@ -24,6 +32,222 @@ from ..utils.recovery_checker import RecoveryChecker
 from ..browser_manager import BrowserManager
 from ..executor.workflow_executor import WorkflowExecutor
 
+try:
+    import uvloop
+except ImportError:
+    uvloop = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+def install_event_loop_policy(config: Optional[Dict[str, Any]] = None) -> str:
+    """
+    为编排器入口选择事件循环实现（需在 asyncio.run 之前调用）
+
+    config["runtime"]["event_loop"]: asyncio（默认）/ auto（有 uvloop 则用）/ uvloop。
+    返回实际生效的实现名称。
+    """
+    choice = str(((config or {}).get("runtime", {}) or {}).get("event_loop") or "asyncio").lower()
+    if choice not in ("auto", "uvloop", "asyncio"):
+        raise ValueError(f"不支持的事件循环实现: {choice}")
+    if choice == "asyncio":
+        return "asyncio"
+    if uvloop is None or sys.platform == "win32":
+        if choice == "uvloop":
+            raise RuntimeError("配置要求 uvloop，但当前环境不可用")
+        return "asyncio"
+    asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    return "uvloop"
+
+
+def _json_default(obj: Any) -> Any:
+    # 与 orjson 保持一致：datetime 输出 ISO8601，dataclass 实例转为 dict，其余对象转为字符串
+    if isinstance(obj, datetime):
+        return obj.isoformat()
+    if is_dataclass(obj) and not isinstance(obj, type):
+        return asdict(obj)
+    return str(obj)
+
+
+def serialize_report(report: Dict[str, Any], *, indent: bool = False) -> bytes:
+    """
+    将编排器报告序列化为 UTF-8 JSON 字节串
+
+    优先使用 orjson（原生支持 datetime/dataclass），否则回退标准 json；无法序列化的对象转为字符串。
+    """
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(report, option=option, default=str)
+    return json.dumps(report, ensure_ascii=False, indent=2 if indent else None, default=_json_default).encode("utf-8")
+
+
+# 性能检查点批量落盘：攒满一批或等待超过间隔即提交一次
+_CHECKPOINT_BATCH_SIZE = 32
+_CHECKPOINT_FLUSH_INTERVAL = 1.0
+
+# 预编译步骤类型：整数比较代替逐步的字符串比较
+STEP_KIND_ACTION = 0
+STEP_KIND_SCREENSHOT = 1
+
+# Python 3.10+ 使用 __slots__；旧版本保持普通 dataclass
+_DATACLASS_OPTIONS: Dict[str, Any] = {"slots": True} if sys.version_info >= (3, 10) else {}
+
+
+# 浏览器池默认参数（可通过 e2e_testing.browser_pool_size / browser_pool_idle_seconds 覆盖）
+_DEFAULT_BROWSER_POOL_SIZE = 2
+_DEFAULT_BROWSER_POOL_IDLE_SECONDS = 60.0
+
+
+class _BrowserPool:
+    """
+    进程级预热浏览器池
+
+    按 BrowserManager 读取的全部配置分组缓存已初始化的实例；归还时重建 context（清空 cookie/页面状态），
+    下次获取直接复用，省去浏览器启动耗时。空闲超时的实例由后台任务关闭。
+    池绑定在当前事件循环上：最后一个使用者归还后默认立即关闭全部空闲实例；
+    配置 e2e_testing.keep_browser_pool: true 时保留给后续编排器，调用方需在批量结束时调用 shutdown()。
+    """
+
+    _idle: Dict[str, List[tuple]] = {}
+    _loop: Optional[asyncio.AbstractEventLoop] = None
+    _reaper: Optional[asyncio.Task] = None
+    _active = 0
+
+    @staticmethod
+    def _key(config: Dict[str, Any]) -> str:
+        # BrowserManager 会在运行时读取 full_config（browser 段及 test 段的各类超时），
+        # 因此按完整配置分组，避免复用到按其它配置初始化的实例
+        return json.dumps(config or {}, sort_keys=True, ensure_ascii=False, default=str)
+
+    @staticmethod
+    def _settings(config: Dict[str, Any]) -> tuple:
+        e2e_config = config.get("e2e_testing", {}) or {}
+        max_size = int(e2e_config.get("browser_pool_size", _DEFAULT_BROWSER_POOL_SIZE))
+        idle_seconds = float(e2e_config.get("browser_pool_idle_seconds", _DEFAULT_BROWSER_POOL_IDLE_SECONDS))
+        keep = bool(e2e_config.get("keep_browser_pool", False))
+        return max_size, idle_seconds, keep
+
+    @classmethod
+    def _bind_loop(cls):
+        loop = asyncio.get_running_loop()
+        if cls._loop is loop:
+            return
+        old_loop, idle = cls._loop, cls._idle
+        cls._idle = {}
+        cls._reaper = None
+        cls._active = 0
+        cls._loop = loop
+        managers = [manager for entries in idle.values() for manager, _ in entries]
+        if not managers:
+            return
+        # Playwright 对象绑定在创建它的事件循环上，只能在原循环中关闭
+        if old_loop is not None and old_loop.is_running():
+            asyncio.run_coroutine_threadsafe(cls._close_all(managers), old_loop)
+        else:
+            logging.getLogger(__name__).warning(
+                f"浏览器池的事件循环已结束，{len(managers)} 个空闲浏览器无法关闭（未调用 shutdown_browser_pool）"
+            )
+
+    @classmethod
+    async def acquire(cls, config: Dict[str, Any]) -> BrowserManager:
+        cls._bind_loop()
+        idle = cls._idle.get(cls._key(config))
+        while idle:
+            manager, _ = idle.pop()
+            if manager.browser is not None and manager.browser.is_connected() and manager.page is not None:
+                cls._active += 1
+                return manager
+            await cls._close(manager)
+
+        manager = BrowserManager(config)
+        if not await manager.initialize():
+            await cls._close(manager)
+            raise RuntimeError("浏览器初始化失败")
+        cls._active += 1
+        return manager
+
+    @classmethod
+    async def release(cls, manager: BrowserManager, config: Dict[str, Any]):
+        cls._bind_loop()
+        cls._active = max(0, cls._active - 1)
+        max_size, idle_seconds, keep = cls._settings(config)
+        key = cls._key(config)
+        if not keep and cls._active == 0:
+            await cls._close(manager)
+            await cls.shutdown()
+            return
+        if len(cls._idle.get(key, ())) >= max_size or not await manager.reset_context():
+            await cls._close(manager)
+            return
+        # reset_context 期间 _reap/shutdown 可能已替换列表，重新取当前列表
+        idle = cls._idle.setdefault(key, [])
+        if len(idle) >= max_size:
+            await cls._close(manager)
+            return
+        idle.append((manager, time.monotonic()))
+        if cls._reaper is None or cls._reaper.done():
+            cls._reaper = asyncio.ensure_future(cls._reap(idle_seconds))
+
+    @classmethod
+    async def _reap(cls, idle_seconds: float):
+        """周期性关闭空闲超时的实例，池为空时退出"""
+        while any(cls._idle.values()):
+            await asyncio.sleep(idle_seconds / 2)
+            deadline = time.monotonic() - idle_seconds
+            for key, idle in list(cls._idle.items()):
+                expired = [manager for manager, released_at in idle if released_at <= deadline]
+                cls._idle[key] = [(m, t) for m, t in idle if t > deadline]
+                for manager in expired:
+                    await cls._close(manager)
+
+    @classmethod
+    async def shutdown(cls):
+        """关闭池中所有空闲实例"""
+        idle, cls._idle = cls._idle, {}
+        reaper, cls._reaper = cls._reaper, None
+        if reaper is not None and not reaper.done():
+            reaper.cancel()
+        await cls._close_all([manager for entries in idle.values() for manager, _ in entries])
+
+    @classmethod
+    async def _close_all(cls, managers: List[BrowserManager]):
+        for manager in managers:
+            await cls._close(manager)
+
+    @staticmethod
+    async def _close(manager: BrowserManager):
+        try:
+            await manager.close()
+        except Exception as e:
+            logging.getLogger(__name__).warning(f"浏览器清理异常: {str(e)}")
+
+
+@dataclass(**_DATACLASS_OPTIONS)
+class CompiledStep:
+    """预编译步骤：action 实例与超时在每个工作流只解析一次"""
+    name: str
+    action: Optional[Action]
+    timeout_ms: float
+    kind: int
+    optional: bool
+    # 并行组标识（None 表示串行步骤）
+    parallel_key: Optional[Any] = None
+    # 截图步骤显式配置的保存路径
+    save_path: Optional[str] = None
+    # Action.create 失败时记录异常，执行到该步骤时再按原语义报告
+    error: Optional[Exception] = None
+
+
+@dataclass(**_DATACLASS_OPTIONS)
+class CompiledWorkflow:
+    """预编译工作流：套件初始化步骤与各阶段步骤"""
+    suite_setup: List[CompiledStep]
+    phases: List[List[CompiledStep]]
+
 
 class E2EOrchestrator:
     """
@@ -64,7 +288,32 @@ class E2EOrchestrator:
         self.session_id: Optional[str] = None
         self.current_phase: Optional[str] = None
         self.phase_results: List[Dict[str, Any]] = []
+        # 每个阶段的执行次数（含恢复后的重试）
+        self.phase_attempts: Dict[str, int] = {}
+        # 阶段结果的增量汇总，报告生成时无需再遍历 phase_results
+        self._agg: Dict[str, Any] = {"total_duration": 0.0, "successful_phases": 0}
+        # 已创建的截图目录；每个目录只在线程池中 mkdir 一次，不阻塞事件循环
+        self._mkdir_cache: Set[str] = set()
+        # 步骤结果流式落盘（e2e_testing.stream_step_results 开启时）：内存中只保留每阶段摘要
+        self._results_fp = None
+        self._results_path: Optional[str] = None
         self.screenshots_taken: int = 0
+        # 截图序号在执行前分配，并行截图也不会拿到相同的默认路径
+        self._shot_counter = itertools.count()
+        # 工作流开始时刻（事件循环单调时钟），用于计算总耗时
+        self._t_start: Optional[float] = None
+
+        # 性能检查点队列：阶段内只入队，由后台任务批量提交，异常留待主循环抛出
+        self._ckpt_queue: Optional[asyncio.Queue] = None
+        self._ckpt_task: Optional[asyncio.Task] = None
+        self._ckpt_error: Optional[Exception] = None
+        # kind -> 是否可入队后台提交（监控器能接收入队时刻时才可延迟提交）
+        self._ckpt_deferrable: Dict[str, bool] = {}
+
+        # 预编译缓存：工作流内容哈希 -> CompiledWorkflow；当前运行按步骤 dict 的 id 绑定
+        self._compiled_cache: Dict[str, CompiledWorkflow] = {}
+        self._compiled_steps: Dict[int, tuple] = {}
+        self._compiled_recovery: Optional[List[CompiledStep]] = None
 
     async def execute_workflow(
         self,
@@ -84,30 +333,45 @@ class E2EOrchestrator:
             执行结果报告
         """
         self.session_id = session_id or f"e2e_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+        self._t_start = asyncio.get_running_loop().time()
         self.logger.info(f"开始执行E2E工作流 - Session: {self.session_id}")
 
         try:
+            # 预编译工作流（内容相同的重复运行直接命中缓存）
+            self._bind_compiled_workflow(workflow)
+
             # 初始化浏览器和执行器
             await self._initialize_executor()
 
             # 执行套件初始化步骤
             await self._execute_suite_setup(workflow.get("suite_setup", []), context)
 
-            # 执行核心阶段
+            # 执行核心阶段：阶段队列 + 有界重试（失败的阶段在恢复后重新放回队首）
             phases = workflow.get("phases", [])
-            for i, phase in enumerate(phases):
-                phase_name = phase.get("name", f"phase_{i+1}")
+            max_retries = int((self.config.get("e2e_testing", {}) or {}).get("max_phase_retries", 1))
+            phase_queue = deque(enumerate(phases, 1))
+            while phase_queue:
+                phase_index, phase = phase_queue.popleft()
+                phase_name = phase.get("name", f"phase_{phase_index}")
                 self.current_phase = phase_name
+                self._raise_checkpoint_error()
+
+                attempt = self.phase_attempts.get(phase_name, 0) + 1
+                self.phase_attempts[phase_name] = attempt
+                phase_result = await self._execute_phase(phase, context, phase_index, len(phases))
+                phase_result["attempts"] = attempt
 
-                phase_result = await self._execute_phase(phase, context, i + 1, len(phases))
-                self.phase_results.append(phase_result)
+                # 检查阶段执行结果：失败且仍有重试额度时，执行恢复步骤后重跑该阶段
+                if not phase_result.get("success", False) and attempt <= max_retries:
+                    if await self._run_recovery_steps(phase, context):
+                        phase_queue.appendleft((phase_index, phase))
+                        continue
 
-                # 检查阶段执行结果
+                # 每个阶段只记录最终一次执行的结果
+                self._append_phase_result(phase_result)
                 if not phase_result.get("success", False):
-                    # 尝试错误恢复
-                    recovery_success = await self._attempt_phase_recovery(phase, context)
-                    if not recovery_success:
-                        break  # 恢复失败，终止执行
+                    self.logger.error(f"阶段 {phase_name} 执行失败且恢复无效，终止执行")
+                    break  # 恢复失败，终止执行
 
             # 生成最终报告
             final_result = self._generate_final_report(workflow)
@@ -124,12 +388,12 @@ class E2EOrchestrator:
     async def _initialize_executor(self):
         """初始化浏览器和工作流执行器"""
         self.logger.info("初始化浏览器和执行器...")
+        self._start_checkpoint_writer()
+        self._get_recovery_steps()
+        await self._open_results_stream()
 
-        # 初始化浏览器管理器
-        self.browser_manager = BrowserManager(self.config)
-        browser_ok = await self.browser_manager.initialize()
-        if not browser_ok:
-            raise RuntimeError("浏览器初始化失败")
+        # 从预热池获取浏览器管理器（首次获取时才启动浏览器）
+        self.browser_manager = await _BrowserPool.acquire(self.config)
 
         # 初始化工作流执行器
         self.workflow_executor = WorkflowExecutor(
@@ -140,22 +404,48 @@ class E2EOrchestrator:
 
         self.logger.info("浏览器和执行器初始化完成")
 
+    @staticmethod
+    async def shutdown_browser_pool():
+        """关闭预热池中的所有浏览器（keep_browser_pool 开启时，批量执行结束后调用）"""
+        await _BrowserPool.shutdown()
+
     async def _execute_suite_setup(self, setup_steps: List[Dict[str, Any]], context: Context):
-        """执行套件初始化步骤"""
+        """执行套件初始化步骤（同一并行组内的连续步骤并发执行）"""
         self.logger.info("执行套件初始化步骤...")
 
-        for step in setup_steps:
-            action = Action.create(step["action"], step.get("params", {}))
-            timeout = step.get("timeout", self.config.get("test", {}).get("timeout", {}).get("element_load", 10000))
+        compiled_steps = [self._get_compiled_step(step) for step in setup_steps]
+        for run in self._partition_steps(compiled_steps):
+            if len(run) == 1:
+                await self._run_setup_step(run[0], context)
+                continue
 
-            try:
-                # 执行action
-                await self._execute_action_with_timeout(action, context, timeout)
-                self.logger.debug(f"套件初始化步骤完成: {step['action']}")
+            # 并发执行后按步骤顺序抛出第一个异常，与串行路径的失败语义一致
+            results = await asyncio.gather(
+                *(self._run_setup_step(compiled, context) for compiled in run),
+                return_exceptions=True
+            )
+            for result in results:
+                if isinstance(result, BaseException):
+                    raise result
 
-            except Exception as e:
-                self.logger.error(f"套件初始化步骤失败: {step['action']}, 错误: {str(e)}")
-                raise
+    async def _run_setup_step(self, compiled: CompiledStep, context: Context):
+        """执行单个套件初始化步骤，失败或超时时抛出异常"""
+        if compiled.error is not None:
+            raise compiled.error
+
+        try:
+            # 执行action
+            ok, _, error_message = await self._execute_action_with_timeout(
+                compiled.action, context, compiled.timeout_ms
+            )
+        except Exception as e:
+            self.logger.error(f"套件初始化步骤失败: {compiled.name}, 错误: {str(e)}")
+            raise
+
+        if not ok:
+            self.logger.error(f"套件初始化步骤失败: {compiled.name}, 错误: {error_message}")
+            raise RuntimeError(error_message)
+        self.logger.debug(f"套件初始化步骤完成: {compiled.name}")
 
     async def _execute_phase(
         self,
@@ -184,31 +474,40 @@ class E2EOrchestrator:
 
         # 开始性能监控
         checkpoint_name = f"phase_{phase_index}_{phase_name}"
-        await self.performance_monitor.start_checkpoint(self.session_id, checkpoint_name)
+        await self._record_checkpoint("start", self.session_id, checkpoint_name)
 
-        start_time = datetime.now()
+        loop = asyncio.get_running_loop()
+        start_time = loop.time()
         step_results = []
 
         try:
-            # 执行阶段中的所有步骤
-            for step in steps:
-                step_result = await self._execute_step(step, context)
-                step_results.append(step_result)
+            # 执行阶段中的所有步骤：同一并行组内的连续步骤并发执行，其余保持串行
+            compiled_steps = [self._get_compiled_step(step) for step in steps]
+            executed: List[CompiledStep] = []
+            for run in self._partition_steps(compiled_steps):
+                if len(run) == 1:
+                    run_results = [await self._run_compiled_step(run[0], context)]
+                else:
+                    run_results = await self._execute_parallel_steps(run, context)
+                executed.extend(run)
+                step_results.extend(run_results)
 
                 # 如果步骤失败且不可跳过，终止阶段执行
-                if not step_result.get("success", False) and not step.get("optional", False):
+                if any(
+                    not result.get("success", False) and not compiled.optional
+                    for compiled, result in zip(run, run_results)
+                ):
                     break
 
-            duration = (datetime.now() - start_time).total_seconds()
-            phase_success = all(step.get("success", False) for step in step_results if not step.get("optional", False))
+            duration = loop.time() - start_time
+            phase_success = all(
+                result.get("success", False)
+                for compiled, result in zip(executed, step_results)
+                if not compiled.optional
+            )
 
             # 记录性能检查点
-            await self.performance_monitor.end_checkpoint(
-                self.session_id,
-                checkpoint_name,
-                duration,
-                phase_success
-            )
+            await self._record_checkpoint("end", self.session_id, checkpoint_name, duration, phase_success)
 
             phase_result = {
                 "phase_index": phase_index,
@@ -217,24 +516,23 @@ class E2EOrchestrator:
                 "success": phase_success,
                 "duration": duration,
                 "steps_executed": len(step_results),
-                "step_results": step_results,
                 "timestamp": datetime.now().isoformat()
             }
+            if self._results_fp is not None:
+                phase_result["step_summary"] = self._stream_step_results(phase_index, step_results)
+                phase_result["step_results_file"] = self._results_path
+            else:
+                phase_result["step_results"] = step_results
 
             self.logger.info(f"阶段 {phase_name} 执行完成, 成功: {phase_success}, 耗时: {duration:.2f}秒")
             return phase_result
 
         except Exception as e:
-            duration = (datetime.now() - start_time).total_seconds()
+            duration = loop.time() - start_time
             self.logger.error(f"阶段 {phase_name} 执行异常: {str(e)}")
 
             # 记录失败的性能检查点
-            await self.performance_monitor.end_checkpoint(
-                self.session_id,
-                checkpoint_name,
-                duration,
-                False
-            )
+            await self._record_checkpoint("end", self.session_id, checkpoint_name, duration, False)
 
             return {
                 "phase_index": phase_index,
@@ -246,6 +544,252 @@ class E2EOrchestrator:
                 "timestamp": datetime.now().isoformat()
             }
 
+    def _default_timeout_ms(self) -> float:
+        """配置中的默认步骤超时（毫秒）"""
+        return self.config.get("test", {}).get("timeout", {}).get("element_load", 10000)
+
+    @staticmethod
+    def _compile_step(step: Dict[str, Any], default_timeout_ms: float) -> CompiledStep:
+        """编译单个步骤：创建action并解析超时；创建失败时记录异常而不是立即抛出"""
+        name = step.get("action", "")
+        try:
+            action = Action.create(step["action"], step.get("params", {}))
+            error = None
+        except Exception as e:
+            action, error = None, e
+        return CompiledStep(
+            name=name,
+            action=action,
+            timeout_ms=step.get("timeout", default_timeout_ms),
+            kind=STEP_KIND_SCREENSHOT if name == "screenshot" else STEP_KIND_ACTION,
+            optional=bool(step.get("optional", False)),
+            parallel_key=E2EOrchestrator._parallel_key(step),
+            save_path=(step.get("params") or {}).get("save_path") if name == "screenshot" else None,
+            error=error,
+        )
+
+    @staticmethod
+    def _workflow_digest(workflow: Dict[str, Any]) -> str:
+        """工作流内容哈希，用作预编译缓存键"""
+        payload = json.dumps(workflow, sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.blake2b(payload.encode("utf-8"), digest_size=16).hexdigest()
+
+    def _compile_workflow(self, workflow: Dict[str, Any]) -> CompiledWorkflow:
+        """一次遍历套件初始化与各阶段步骤，生成 CompiledWorkflow"""
+        default_timeout = self._default_timeout_ms()
+        return CompiledWorkflow(
+            suite_setup=[self._compile_step(step, default_timeout) for step in workflow.get("suite_setup", [])],
+            phases=[
+                [self._compile_step(step, default_timeout) for step in phase.get("steps", [])]
+                for phase in workflow.get("phases", [])
+            ],
+        )
+
+    def _bind_compiled_workflow(self, workflow: Dict[str, Any]) -> CompiledWorkflow:
+        """取得（或编译）工作流，并把编译结果按步骤 dict 的 id 绑定到本次运行"""
+        digest = self._workflow_digest(workflow)
+        compiled = self._compiled_cache.get(digest)
+        if compiled is None:
+            compiled = self._compiled_cache[digest] = self._compile_workflow(workflow)
+
+        # 同时持有步骤 dict 的引用，防止运行期间 id 被复用
+        bound: Dict[int, tuple] = {}
+        for step, compiled_step in zip(workflow.get("suite_setup", []), compiled.suite_setup):
+            bound[id(step)] = (step, compiled_step)
+        for phase, compiled_phase in zip(workflow.get("phases", []), compiled.phases):
+            for step, compiled_step in zip(phase.get("steps", []), compiled_phase):
+                bound[id(step)] = (step, compiled_step)
+        self._compiled_steps = bound
+        return compiled
+
+    def _get_compiled_step(self, step: Dict[str, Any]) -> CompiledStep:
+        """查找步骤的预编译结果；未绑定的步骤（如直接调用阶段执行）即时编译"""
+        entry = self._compiled_steps.get(id(step))
+        if entry is not None and entry[0] is step:
+            return entry[1]
+        return self._compile_step(step, self._default_timeout_ms())
+
+    def _start_checkpoint_writer(self):
+        """启动检查点后台提交任务（幂等）"""
+        if self._ckpt_task is None:
+            self._ckpt_queue = asyncio.Queue()
+            self._ckpt_task = asyncio.ensure_future(self._drain_checkpoints())
+
+    def _checkpoint_deferrable(self, kind: str) -> bool:
+        """
+        检查点能否延迟到后台批量提交：监控器提供 batch_record，或 {kind}_checkpoint 接受 timestamp 参数。
+        否则监控器会以提交时刻打点，只能在调用处同步提交。
+        """
+        deferrable = self._ckpt_deferrable.get(kind)
+        if deferrable is None:
+            monitor = self.performance_monitor
+            deferrable = getattr(monitor, "batch_record", None) is not None
+            if not deferrable:
+                try:
+                    params = inspect.signature(getattr(monitor, f"{kind}_checkpoint")).parameters.values()
+                except (AttributeError, TypeError, ValueError):
+                    params = ()
+                deferrable = any(
+                    p.name == "timestamp" or p.kind is inspect.Parameter.VAR_KEYWORD for p in params
+                )
+            self._ckpt_deferrable[kind] = deferrable
+        return deferrable
+
+    async def _record_checkpoint(self, kind: str, *args: Any):
+        """记录检查点：可延迟时带上当前时刻入队，不阻塞阶段执行；否则直接提交"""
+        if not self._checkpoint_deferrable(kind):
+            result = getattr(self.performance_monitor, f"{kind}_checkpoint")(*args)
+            if inspect.isawaitable(result):
+                await result
+            return
+        self._start_checkpoint_writer()
+        self._ckpt_queue.put_nowait((kind, args, time.time()))
+
+    def _raise_checkpoint_error(self):
+        """抛出后台提交任务记录的异常"""
+        if self._ckpt_error is not None:
+            error, self._ckpt_error = self._ckpt_error, None
+            raise error
+
+    async def _drain_checkpoints(self):
+        """后台批量提交检查点；收到 None 时提交剩余批次并退出"""
+        queue = self._ckpt_queue
+        loop = asyncio.get_running_loop()
+        # 等待中的 queue.get() 任务跨批次保留；不用 wait_for 包裹 get()，避免取消信号被吞掉
+        getter: Optional[asyncio.Future] = None
+        stopping = False
+        try:
+            while not stopping:
+                if getter is None:
+                    getter = asyncio.ensure_future(queue.get())
+                item = await getter
+                getter = None
+                batch = []
+                if item is None:
+                    stopping = True
+                else:
+                    batch.append(item)
+                    deadline = loop.time() + _CHECKPOINT_FLUSH_INTERVAL
+                    while len(batch) < _CHECKPOINT_BATCH_SIZE:
+                        try:
+                            item = queue.get_nowait()
+                        except asyncio.QueueEmpty:
+                            remaining = deadline - loop.time()
+                            if remaining <= 0:
+                                break
+                            getter = asyncio.ensure_future(queue.get())
+                            done, _ = await asyncio.wait((getter,), timeout=remaining)
+                            if not done:
+                                break
+                            item, getter = getter.result(), None
+                        if item is None:
+                            stopping = True
+                            break
+                        batch.append(item)
+
+                try:
+                    if batch:
+                        await self._flush_checkpoints(batch)
+                except Exception as e:
+                    self.logger.error(f"性能检查点提交失败: {str(e)}")
+                    self._ckpt_error = e
+                finally:
+                    for _ in range(len(batch) + (1 if stopping else 0)):
+                        queue.task_done()
+        finally:
+            if getter is not None:
+                getter.cancel()
+
+    async def _flush_checkpoints(self, batch: List[tuple]):
+        """提交一批检查点：优先 batch_record，否则逐条回退到带 timestamp 的 start/end_checkpoint"""
+        batch_record = getattr(self.performance_monitor, "batch_record", None)
+        if batch_record is not None:
+            result = batch_record(batch)
+            if inspect.isawaitable(result):
+                await result
+            return
+
+        for kind, args, ts in batch:
+            # 入队时刻随参数传给监控器，避免以提交时刻（最多晚 _CHECKPOINT_FLUSH_INTERVAL）打点
+            result = getattr(self.performance_monitor, f"{kind}_checkpoint")(*args, timestamp=ts)
+            if inspect.isawaitable(result):
+                await result
+
+    async def _stop_checkpoint_writer(self):
+        """提交剩余检查点并停止后台任务"""
+        if self._ckpt_task is None:
+            return
+        task, self._ckpt_task = self._ckpt_task, None
+        if not task.done():
+            self._ckpt_queue.put_nowait(None)
+            await self._ckpt_queue.join()
+        await task
+        self._ckpt_queue = None
+        if self._ckpt_error is not None:
+            self.logger.warning(f"性能检查点提交异常: {str(self._ckpt_error)}")
+            self._ckpt_error = None
+
+    @staticmethod
+    def _parallel_key(step: Dict[str, Any]) -> Optional[Any]:
+        """步骤的并行组标识：显式 parallel_group 优先，parallel: true 归入匿名组"""
+        group = step.get("parallel_group")
+        if group is not None:
+            return group
+        return "__parallel__" if step.get("parallel") else None
+
+    @staticmethod
+    def _partition_steps(steps: List[CompiledStep]) -> List[List[CompiledStep]]:
+        """将步骤划分为连续的执行段：相邻且并行组相同的步骤合为一段，其余每步单独一段"""
+        runs: List[List[CompiledStep]] = []
+        last_key: Optional[Any] = None
+        for step in steps:
+            key = step.parallel_key
+            if key is not None and runs and key == last_key:
+                runs[-1].append(step)
+            else:
+                runs.append([step])
+            last_key = key
+        return runs
+
+    async def _execute_parallel_steps(
+        self,
+        steps: List[CompiledStep],
+        context: Context
+    ) -> List[Dict[str, Any]]:
+        """
+        并发执行同一并行组内的步骤
+
+        并行步骤共享同一个 context，应为只读操作（预热导航、截图、遥测采集等）。
+        整组以组内最大步骤超时为上限，超时未完成的步骤会被取消并记为失败。
+        """
+        group_timeout = max(step.timeout_ms for step in steps) / 1000.0
+
+        tasks = [asyncio.ensure_future(self._run_compiled_step(step, context)) for step in steps]
+        _, pending = await asyncio.wait(tasks, timeout=group_timeout)
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+
+        results: List[Dict[str, Any]] = []
+        for step, task in zip(steps, tasks):
+            if task in pending:
+                results.append({
+                    "action": step.name,
+                    "success": False,
+                    "duration": group_timeout,
+                    "error": f"并行组执行超时: {group_timeout * 1000:.0f}ms"
+                })
+            elif task.exception() is not None:
+                results.append({
+                    "action": step.name,
+                    "success": False,
+                    "error": str(task.exception())
+                })
+            else:
+                results.append(task.result())
+        return results
+
     async def _execute_step(self, step: Dict[str, Any], context: Context) -> Dict[str, Any]:
         """
         执行单个步骤
@@ -257,27 +801,43 @@ class E2EOrchestrator:
         Returns:
             步骤执行结果
         """
-        action_name = step["action"]
-        params = step.get("params", {})
-        timeout = step.get("timeout", self.config.get("test", {}).get("timeout", {}).get("element_load", 10000))
+        return await self._run_compiled_step(self._get_compiled_step(step), context)
+
+    async def _run_compiled_step(self, compiled: CompiledStep, context: Context) -> Dict[str, Any]:
+        """执行预编译步骤"""
+        action_name = compiled.name
 
-        start_time = datetime.now()
+        loop = asyncio.get_running_loop()
+        start_time = loop.time()
 
         try:
             self.logger.debug(f"执行步骤: {action_name}")
 
-            # 创建action并执行
-            action = Action.create(action_name, params)
+            if compiled.error is not None:
+                raise compiled.error
 
             # 如果是截图action，特殊处理
-            if action_name == "screenshot":
-                screenshot_result = await self._handle_screenshot_action(action, context)
+            if compiled.kind == STEP_KIND_SCREENSHOT:
+                screenshot_result = await self._handle_screenshot_action(
+                    compiled.action, context, shot_index=next(self._shot_counter), save_path=compiled.save_path
+                )
                 self.screenshots_taken += 1
                 return screenshot_result
 
             # 执行普通action
-            updated_context = await self._execute_action_with_timeout(action, context, timeout)
-            duration = (datetime.now() - start_time).total_seconds()
+            ok, _, error_message = await self._execute_action_with_timeout(
+                compiled.action, context, compiled.timeout_ms
+            )
+            duration = loop.time() - start_time
+
+            if not ok:
+                self.logger.error(f"步骤执行失败: {action_name}, 错误: {error_message}")
+                return {
+                    "action": action_name,
+                    "success": False,
+                    "duration": duration,
+                    "error": error_message
+                }
 
             return {
                 "action": action_name,
@@ -287,7 +847,7 @@ class E2EOrchestrator:
             }
 
         except Exception as e:
-            duration = (datetime.now() - start_time).total_seconds()
+            duration = loop.time() - start_time
             self.logger.error(f"步骤执行失败: {action_name}, 错误: {str(e)}")
 
             return {
@@ -302,27 +862,42 @@ class E2EOrchestrator:
         action: Action,
         context: Context,
         timeout: int
-    ) -> Context:
-        """执行action并处理超时"""
+    ) -> Tuple[bool, Optional[Context], Optional[str]]:
+        """
+        执行action并处理超时
+
+        Returns:
+            (是否成功, 更新后的上下文, 错误信息)；超时以返回值表示，action 自身的异常照常抛出
+        """
         try:
-            return await asyncio.wait_for(
+            updated_context = await asyncio.wait_for(
                 action.execute(context),
                 timeout=timeout / 1000.0  # 转换为秒
             )
         except asyncio.TimeoutError:
-            raise RuntimeError(f"Action执行超时: {action.action}, 超时时间: {timeout}ms")
+            return False, None, f"Action执行超时: {action.action}, 超时时间: {timeout}ms"
+        return True, updated_context, None
 
-    async def _handle_screenshot_action(self, action: Action, context: Context) -> Dict[str, Any]:
+    async def _handle_screenshot_action(
+        self,
+        action: Action,
+        context: Context,
+        *,
+        shot_index: Optional[int] = None,
+        save_path: Optional[str] = None
+    ) -> Dict[str, Any]:
         """处理截图action的特殊逻辑"""
+        if shot_index is None:
+            shot_index = next(self._shot_counter)
         try:
             # 执行截图
             updated_context = await action.execute(context)
 
             # 获取截图路径
-            screenshot_path = action.params.get("save_path", f"screenshots/e2e/screenshot_{self.screenshots_taken}.png")
+            screenshot_path = save_path or action.params.get("save_path") or f"screenshots/e2e/screenshot_{shot_index}.png"
 
             # 确保目录存在
-            Path(screenshot_path).parent.mkdir(parents=True, exist_ok=True)
+            await self._ensure_dir(Path(screenshot_path).parent)
 
             return {
                 "action": "screenshot",
@@ -338,37 +913,97 @@ class E2EOrchestrator:
                 "error": str(e)
             }
 
-    async def _attempt_phase_recovery(self, phase: Dict[str, Any], context: Context) -> bool:
-        """尝试阶段错误恢复"""
-        self.logger.warning(f"尝试恢复阶段: {phase.get('name', 'unknown')}")
+    async def _open_results_stream(self):
+        """按配置打开步骤结果 JSONL 文件"""
+        if self._results_fp is not None:
+            return
+        if not (self.config.get("e2e_testing", {}) or {}).get("stream_step_results", False):
+            return
+        output_dirs = (self.config.get("reporting", {}) or {}).get("output_dirs", {}) or {}
+        directory = Path(output_dirs.get("reports", "reports/e2e"))
+        await self._ensure_dir(directory)
+        path = directory / f"{self.session_id}_steps.jsonl"
+        loop = asyncio.get_running_loop()
+        self._results_fp = await loop.run_in_executor(None, path.open, "ab")
+        self._results_path = str(path)
+
+    def _stream_step_results(self, phase_index: int, step_results: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """将阶段的步骤结果追加写入 JSONL（缓冲写），返回内存中保留的摘要"""
+        lines = []
+        success_count = 0
+        first_error = None
+        for result in step_results:
+            lines.append(serialize_report(dict(result, phase_index=phase_index, session_id=self.session_id)))
+            if result.get("success", False):
+                success_count += 1
+            elif first_error is None:
+                first_error = result.get("error")
+        self._results_fp.write(b"\n".join(lines) + b"\n" if lines else b"")
+        return {"total": len(step_results), "success_count": success_count, "first_error": first_error}
+
+    async def _close_results_stream(self):
+        """刷新并关闭步骤结果文件"""
+        fp, self._results_fp = self._results_fp, None
+        if fp is not None:
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(None, fp.close)
+
+    async def _ensure_dir(self, directory: Path):
+        """在线程池中创建目录，已创建过的目录直接跳过"""
+        key = str(directory)
+        if key in self._mkdir_cache:
+            return
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, lambda: directory.mkdir(parents=True, exist_ok=True))
+        self._mkdir_cache.add(key)
+
+    async def _run_recovery_steps(self, phase: Dict[str, Any], context: Context) -> bool:
+        """
+        执行错误恢复步骤（不重跑阶段，重跑由 execute_workflow 的阶段队列负责）
 
-        recovery_steps = self.config.get("error_recovery", [])
+        Returns:
+            是否至少有一个恢复步骤执行成功
+        """
+        self.logger.warning(f"尝试恢复阶段: {phase.get('name', 'unknown')}")
 
-        for recovery_step in recovery_steps:
+        recovered = False
+        for compiled in self._get_recovery_steps():
             try:
-                action = Action.create(recovery_step["action"], recovery_step.get("params", {}))
-                await action.execute(context)
-                self.logger.info(f"恢复步骤执行成功: {recovery_step['action']}")
-
-                # 重新执行阶段
-                phase_result = await self._execute_phase(phase, context,
-                                                   self.phase_results[-1]["phase_index"],
-                                                   len(self.phase_results) + 1)
-
-                if phase_result.get("success", False):
-                    self.logger.info("阶段恢复成功")
-                    return True
-
+                if compiled.error is not None:
+                    raise compiled.error
+                await compiled.action.execute(context)
+                self.logger.info(f"恢复步骤执行成功: {compiled.name}")
+                recovered = True
             except Exception as e:
-                self.logger.error(f"恢复步骤失败: {recovery_step['action']}, 错误: {str(e)}")
-
-        self.logger.error("阶段恢复失败")
-        return False
+                self.logger.error(f"恢复步骤失败: {compiled.name}, 错误: {str(e)}")
+
+        if not recovered:
+            self.logger.error("阶段恢复失败")
+        return recovered
+
+    def _get_recovery_steps(self) -> List[CompiledStep]:
+        """错误恢复步骤只编译一次，重试时复用同一批 action"""
+        if self._compiled_recovery is None:
+            default_timeout = self._default_timeout_ms()
+            self._compiled_recovery = [
+                self._compile_step(step, default_timeout) for step in self.config.get("error_recovery", [])
+            ]
+        return self._compiled_recovery
+
+    def _append_phase_result(self, phase_result: Dict[str, Any]):
+        """记录阶段结果并更新增量汇总"""
+        self.phase_results.append(phase_result)
+        self._agg["total_duration"] += phase_result.get("duration", 0)
+        self._agg["successful_phases"] += 1 if phase_result.get("success", False) else 0
 
     def _generate_final_report(self, workflow: Dict[str, Any]) -> Dict[str, Any]:
         """生成最终执行报告"""
-        total_duration = sum(phase.get("duration", 0) for phase in self.phase_results)
-        successful_phases = sum(1 for phase in self.phase_results if phase.get("success", False))
+        # 总耗时取工作流墙钟时间（含套件初始化与恢复），而非各阶段耗时之和
+        if self._t_start is not None:
+            total_duration = asyncio.get_running_loop().time() - self._t_start
+        else:
+            total_duration = self._agg["total_duration"]
+        successful_phases = self._agg["successful_phases"]
         total_phases = len(self.phase_results)
 
         return {
@@ -377,11 +1012,13 @@ class E2EOrchestrator:
             "success": successful_phases == total_phases and total_phases > 0,
             "total_duration": total_duration,
             "phase_results": self.phase_results,
+            "step_results_file": self._results_path,
             "summary": {
                 "total_phases": total_phases,
                 "successful_phases": successful_phases,
                 "success_rate": successful_phases / total_phases if total_phases > 0 else 0,
-                "screenshots_taken": self.screenshots_taken
+                "screenshots_taken": self.screenshots_taken,
+                "phase_attempts": dict(self.phase_attempts)
             },
             "timestamp": datetime.now().isoformat()
         }
@@ -399,8 +1036,9 @@ class E2EOrchestrator:
             "phase_results": self.phase_results,
             "summary": {
                 "total_phases": len(self.phase_results),
-                "successful_phases": sum(1 for phase in self.phase_results if phase.get("success", False)),
-                "screenshots_taken": self.screenshots_taken
+                "successful_phases": self._agg["successful_phases"],
+                "screenshots_taken": self.screenshots_taken,
+                "phase_attempts": dict(self.phase_attempts)
             },
             "timestamp": datetime.now().isoformat()
         }
@@ -409,11 +1047,31 @@ class E2EOrchestrator:
         """清理资源"""
         self.logger.info("清理E2E编排器资源...")
 
+        await self._stop_checkpoint_writer()
+        await self._close_results_stream()
+
         if self.browser_manager:
-            try:
-                await self.browser_manager.close()
-            except Exception as e:
-                self.logger.warning(f"浏览器清理异常: {str(e)}")
+            # 归还到预热池（重建 context），超出池容量或重建失败时才真正关闭
+            await _BrowserPool.release(self.browser_manager, self.config)
 
         self.browser_manager = None
-        self.workflow_executor = None
\ No newline at end of file
+        self.workflow_executor = None
+
+
+def run_e2e_workflow(
+    config: Dict[str, Any],
+    workflow: Dict[str, Any],
+    context: Optional[Context] = None,
+    session_id: Optional[str] = None
+) -> Dict[str, Any]:
+    """同步入口：按配置安装事件循环实现后执行工作流，并在结束时关闭预热池"""
+    install_event_loop_policy(config)
+
+    async def _run() -> Dict[str, Any]:
+        orchestrator = E2EOrchestrator(config, PerformanceMonitor(config), RecoveryChecker(config))
+        try:
+            return await orchestrator.execute_workflow(workflow, context or Context(), session_id)
+        finally:
+            await E2EOrchestrator.shutdown_browser_pool()
+
+    return asyncio.run(_run())
@@ -1,12 +1,18 @@
 from __future__ import annotations
 
+from collections import Counter
 from dataclasses import dataclass
+import sys
 from typing import Any
 
 from models import Workflow
 
 
-@dataclass(frozen=True)
+# Python 3.10+ 使用 __slots__；旧版本保持普通 dataclass
+_DATACLASS_OPTIONS: dict[str, Any] = {"slots": True} if sys.version_info >= (3, 10) else {}
+
+
+@dataclass(frozen=True, **_DATACLASS_OPTIONS)
 class GoldenPathCoverageItem:
     key: str
     required_phase: str
@@ -23,87 +29,114 @@ REQUIRED_PHASES: list[str] = [
     "generate_video_segments",
     "export_final_video",
 ]
+_REQUIRED_SET = frozenset(REQUIRED_PHASES)
+
+
+_SCREENSHOT = "screenshot"
 
 
 def _count_screenshot_steps(phase) -> int:
+    steps = getattr(phase, "steps", None) or ()
+    target = _SCREENSHOT
     count = 0
-    for step in getattr(phase, "steps", []) or []:
+    for step in steps:
+        # try 只包住可能失败的调用，比较与计数留在异常处理之外
         try:
-            if step.get_step_name() == "screenshot":
-                count += 1
+            name = step.get_step_name()
         except Exception:
             continue
+        if name == target:
+            count += 1
     return count
 
 
-def validate_golden_path_workflow(workflow: Workflow) -> list[str]:
+def analyze_golden_path(workflow: Workflow) -> tuple[list[str], dict[str, Any]]:
     """
-    对黄金路径 E2E workflow 做静态结构校验。
+    一次遍历 phases，同时得到结构校验错误与覆盖度评估。
 
-    目标：
-    - 能被 `Workflow.from_yaml` 成功解析（调用方保证）
-    - 必须包含 7 个关键阶段（Phase 1.1）
-    - 每个阶段至少包含 1 个截图步骤作为证据（best-effort）
+    返回 (validate_golden_path_workflow 的结果, evaluate_golden_path_coverage 的结果)。
     """
-    errors: list[str] = []
-
     phases = list(getattr(workflow, "phases", []) or [])
-    phase_names = [getattr(p, "name", None) for p in phases]
 
+    name_counts: Counter = Counter()
+    evidence_errors: list[str] = []
+    # 关键 phase -> 截图步骤数；同名 phase 以最后一个为准（与重复告警配合）
+    required_screenshots: dict[str, int] = {}
+    for phase in phases:
+        name = getattr(phase, "name", None)
+        name_counts[name] += 1
+        screenshots = _count_screenshot_steps(phase)
+        if screenshots <= 0:
+            label = getattr(phase, "name", "unknown_phase")
+            evidence_errors.append(f"phase '{label}' 缺少 screenshot 证据步骤")
+        if name in _REQUIRED_SET:
+            required_screenshots[name] = screenshots
+
+    errors: list[str] = []
     if len(phases) != 7:
         errors.append(f"phase 数量应为 7，实际为 {len(phases)}")
 
-    missing = [name for name in REQUIRED_PHASES if name not in phase_names]
+    missing = [name for name in REQUIRED_PHASES if name not in name_counts]
     if missing:
         errors.append(f"缺少关键 phase: {', '.join(missing)}")
 
-    duplicated = sorted({n for n in phase_names if phase_names.count(n) > 1 and n is not None})
+    duplicated = sorted(n for n, c in name_counts.items() if c > 1 and n is not None)
     if duplicated:
         errors.append(f"phase name 重复: {', '.join(duplicated)}")
 
-    for phase in phases:
-        phase_name = getattr(phase, "name", "unknown_phase")
-        screenshots = _count_screenshot_steps(phase)
-        if screenshots <= 0:
-            errors.append(f"phase '{phase_name}' 缺少 screenshot 证据步骤")
+    errors.extend(evidence_errors)
 
     criteria = list(getattr(workflow, "success_criteria", []) or [])
     if len(criteria) < 7:
         errors.append(f"success_criteria 建议至少 7 条（当前 {len(criteria)}）")
 
-    return errors
-
-
-def evaluate_golden_path_coverage(workflow: Workflow) -> dict[str, Any]:
-    """
-    覆盖度评估（静态）：以“7阶段是否存在 + 是否有截图证据”为判断依据。
-    """
-    phases = list(getattr(workflow, "phases", []) or [])
-    by_name = {getattr(p, "name", ""): p for p in phases}
-
-    items: list[GoldenPathCoverageItem] = []
-    for phase_name in REQUIRED_PHASES:
-        phase = by_name.get(phase_name)
-        present = phase is not None
-        screenshots = _count_screenshot_steps(phase) if phase is not None else 0
-        items.append(
-            GoldenPathCoverageItem(
-                key=phase_name,
-                required_phase=phase_name,
-                present=present,
-                screenshot_steps=screenshots,
-            )
+    items: list[GoldenPathCoverageItem] = [
+        GoldenPathCoverageItem(
+            key=phase_name,
+            required_phase=phase_name,
+            present=phase_name in required_screenshots,
+            screenshot_steps=required_screenshots.get(phase_name, 0),
         )
+        for phase_name in REQUIRED_PHASES
+    ]
 
     covered = [i for i in items if i.present]
     covered_with_evidence = [i for i in items if i.present and i.screenshot_steps > 0]
 
-    return {
+    coverage = {
         "required_phases": list(REQUIRED_PHASES),
-        "items": [i.__dict__ for i in items],
+        # 显式按固定键序构造（slots 实例没有 __dict__），各 dict 键布局一致
+        "items": [
+            {
+                "key": i.key,
+                "required_phase": i.required_phase,
+                "present": i.present,
+                "screenshot_steps": i.screenshot_steps,
+            }
+            for i in items
+        ],
         "present_count": len(covered),
         "present_with_screenshot_count": len(covered_with_evidence),
         "coverage_ratio": (len(covered) / 7.0) if 7 else 0.0,
         "evidence_ratio": (len(covered_with_evidence) / 7.0) if 7 else 0.0,
     }
+    return errors, coverage
+
 
+def validate_golden_path_workflow(workflow: Workflow) -> list[str]:
+    """
+    对黄金路径 E2E workflow 做静态结构校验。
+
+    目标：
+    - 能被 `Workflow.from_yaml` 成功解析（调用方保证）
+    - 必须包含 7 个关键阶段（Phase 1.1）
+    - 每个阶段至少包含 1 个截图步骤作为证据（best-effort）
+    """
+    return analyze_golden_path(workflow)[0]
+
+
+def evaluate_golden_path_coverage(workflow: Workflow) -> dict[str, Any]:
+    """
+    覆盖度评估（静态）：以“7阶段是否存在 + 是否有截图证据”为判断依据。
+    """
+    return analyze_golden_path(workflow)[1]
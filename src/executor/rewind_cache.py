@@ -0,0 +1,122 @@
+"""RewindCache: 跨运行复用已成功步骤结果的事务日志"""
+
+import hashlib
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+DEFAULT_REWIND_PATH = ".autotestbot/rewind.jsonl"
+DEFAULT_MAX_ENTRIES = 1000
+# 行数低于该值时不压缩，避免少量指纹反复覆盖时频繁重写文件
+_COMPACT_MIN_LINES = 100
+
+logger = logging.getLogger(__name__)
+
+
+def step_fingerprint(step_name: str, params: Dict[str, Any], ctx_fp: str) -> str:
+    """步骤指纹：步骤名 + 解析后参数 + 上游 context 指纹"""
+    raw = json.dumps([step_name, params, ctx_fp], sort_keys=True, default=str, ensure_ascii=False)
+    return hashlib.blake2b(raw.encode('utf-8'), digest_size=16).hexdigest()
+
+
+class RewindCache:
+    """
+    以 JSONL 追加写入的指纹 -> 步骤结果映射。
+
+    - 首次 get/put 时才加载文件，未声明 cacheable 的工作流不会触碰磁盘
+    - 同一指纹多次写入时以最后一条为准
+    - 最多保留 max_entries 个指纹（超出时淘汰最早写入的）；日志行数超过存活条目两倍（且不少于 _COMPACT_MIN_LINES）时重写压缩
+    """
+
+    def __init__(self, path: str = DEFAULT_REWIND_PATH, max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.path = Path(path)
+        self.max_entries = max(1, int(max_entries))
+        self._entries: Optional[Dict[str, Dict[str, Any]]] = None
+        # 文件中的行数（含被覆盖/淘汰的旧记录），用于判断是否需要压缩
+        self._lines = 0
+
+    def _load(self) -> Dict[str, Dict[str, Any]]:
+        if self._entries is not None:
+            return self._entries
+        entries: Dict[str, Dict[str, Any]] = {}
+        lines = 0
+        try:
+            with self.path.open('r', encoding='utf-8') as f:
+                for line in f:
+                    lines += 1
+                    try:
+                        item = json.loads(line)
+                    except ValueError:
+                        continue
+                    if isinstance(item, dict) and isinstance(item.get('fp'), str):
+                        # 重新插入，使字典顺序反映最后写入时间
+                        entries.pop(item['fp'], None)
+                        entries[item['fp']] = item.get('result') or {}
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            logger.warning(f"Rewind cache load failed: {e}")
+        self._entries = entries
+        self._lines = lines
+        self._evict()
+        self._maybe_compact()
+        return entries
+
+    def _evict(self) -> None:
+        entries = self._entries
+        while len(entries) > self.max_entries:
+            entries.pop(next(iter(entries)))
+
+    def _maybe_compact(self) -> None:
+        if self._lines > max(2 * len(self._entries), _COMPACT_MIN_LINES):
+            self.compact()
+
+    def compact(self) -> None:
+        """只保留存活条目，原子地重写事务日志"""
+        entries = self._load()
+        tmp = self.path.with_name(self.path.name + '.tmp')
+        try:
+            with tmp.open('w', encoding='utf-8') as f:
+                for fp, result in entries.items():
+                    f.write(json.dumps({'fp': fp, 'result': result}, ensure_ascii=False) + '\n')
+            os.replace(tmp, self.path)
+        except OSError as e:
+            logger.warning(f"Rewind cache compaction failed: {e}")
+            return
+        self._lines = len(entries)
+
+    def get(self, fp: str) -> Optional[Dict[str, Any]]:
+        """返回命中的步骤结果；未命中返回 None"""
+        return self._load().get(fp)
+
+    def put(self, fp: str, result: Dict[str, Any]) -> bool:
+        """记录步骤结果；结果不可 JSON 序列化或写盘失败时返回 False（仅影响下次命中）"""
+        try:
+            line = json.dumps({'fp': fp, 'result': result}, ensure_ascii=False)
+        except (TypeError, ValueError):
+            return False
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with self.path.open('a', encoding='utf-8') as f:
+                f.write(line + '\n')
+        except OSError as e:
+            logger.warning(f"Rewind cache write failed: {e}")
+            return False
+        entries = self._load()
+        entries.pop(fp, None)
+        entries[fp] = result
+        self._lines += 1
+        self._evict()
+        self._maybe_compact()
+        return True
+
+    def clear(self) -> None:
+        """删除事务日志"""
+        self._entries = {}
+        self._lines = 0
+        try:
+            self.path.unlink()
+        except FileNotFoundError:
+            pass
@@ -1,19 +1,55 @@
 """WorkflowExecutor for highest-level orchestration"""
 
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Set, Tuple
 import logging
 import asyncio
+import hashlib
+import json
 import time
 import os
 import re
+from datetime import datetime
+from functools import lru_cache
 from pathlib import Path
 from dataclasses import dataclass, field
 
 from models import Workflow, Context
+from models.context import SNAPSHOT_KIND_KEY, SNAPSHOT_KIND
 from browser_manager import BrowserManager
 from utils import create_test_logger
 from mcp_monitor import MCPObserver
 from framework.core.adapter_loader import load_adapter
+from .rewind_cache import RewindCache, DEFAULT_REWIND_PATH, DEFAULT_MAX_ENTRIES, step_fingerprint
+
+# 超时上下文：3.11+ 用 asyncio.timeout，旧版本尝试 async_timeout；都不可用时回退 wait_for
+try:
+    from asyncio import timeout as _atimeout
+except ImportError:
+    try:
+        from async_timeout import timeout as _atimeout
+    except ImportError:
+        _atimeout = None
+
+
+@lru_cache(maxsize=512)
+def _split_selector_str(selector: str) -> Tuple[str, ...]:
+    parts = (p.strip() for p in selector.split(','))
+    return tuple(p for p in parts if p)
+
+
+def split_selectors(selector: Any) -> Tuple[str, ...]:
+    """拆分逗号分隔的候选选择器；同一选择器串在各步骤间复用拆分结果"""
+    if not isinstance(selector, str):
+        return ()
+    return _split_selector_str(selector)
+
+
+async def _await_with_timeout(awaitable, seconds: float):
+    """在超时限制内等待 awaitable；超时上下文只调度一个定时回调，不像 wait_for 那样额外创建 Task"""
+    if _atimeout is None:
+        return await asyncio.wait_for(awaitable, timeout=seconds)
+    async with _atimeout(seconds):
+        return await awaitable
 
 
 @dataclass
@@ -91,12 +127,19 @@ class WorkflowExecutor:
         #     fail_fast: true
         self.fail_fast = bool(exec_cfg.get('fail_fast', False))
         self.phase_success_mode = str(exec_cfg.get('phase_success_mode', 'recover')).strip().lower()
+        # 声明 cacheable: true 的步骤按指纹跨运行复用上次成功结果
+        self.rewind_cache = RewindCache(
+            str(exec_cfg.get('rewind_cache_path', DEFAULT_REWIND_PATH)),
+            max_entries=int(exec_cfg.get('rewind_cache_max_entries', DEFAULT_MAX_ENTRIES)),
+        )
 
         # Execution state
         self._current_workflow: Optional[Workflow] = None
         self._execution_context: Optional[Context] = None
         self._is_running = False
         self._template_context: Optional[Dict[str, Any]] = None
+        # 失败截图落盘的后台任务：执行结束（停止观测/关闭浏览器）前统一等待
+        self._bg_tasks: Set[asyncio.Task] = set()
 
     async def execute_workflow(self, workflow: Workflow) -> Dict[str, Any]:
         """
@@ -144,9 +187,9 @@ class WorkflowExecutor:
         # Auto baseline preparation (RF-style: 用例写意图，不写数据前置)
         if self.auto_ensure_baseline:
             try:
-                await asyncio.wait_for(
+                await _await_with_timeout(
                     self._ensure_baseline_story_cards(min_cards=self.ensure_baseline_min_story_cards),
-                    timeout=float(self.max_step_duration_ms) / 1000.0 if self.max_step_duration_ms else 240.0,
+                    float(self.max_step_duration_ms) / 1000.0 if self.max_step_duration_ms else 240.0,
                 )
             except Exception as e:
                 result.overall_success = False
@@ -184,7 +227,7 @@ class WorkflowExecutor:
                 self._execution_context.update_phase(group_name)
 
                 for step in steps:
-                    step_start_time = time.time()
+                    step_t0 = time.perf_counter()
                     step_name = step.get_step_name()
                     self._execution_context.update_step(step_name)
 
@@ -193,13 +236,7 @@ class WorkflowExecutor:
                     is_optional = bool(params.get('optional', False))
 
                     try:
-                        if self.max_step_duration_ms and self.max_step_duration_ms > 0:
-                            action_result = await asyncio.wait_for(
-                                self.execute_single_action(step_name, params),
-                                timeout=float(self.max_step_duration_ms) / 1000.0,
-                            )
-                        else:
-                            action_result = await self.execute_single_action(step_name, params)
+                        action_result, from_cache = await self._run_step_action(step_name, params)
 
                         if not action_result.get('success', False):
                             raise RuntimeError(str(action_result.get('error') or f"{step_name} failed"))
@@ -208,30 +245,16 @@ class WorkflowExecutor:
                             'phase': group_name,
                             'step': step_name,
                             'action': step_name,
-                            'status': 'success',
+                            'status': 'cached' if from_cache else 'success',
                             'timestamp': self._get_timestamp(),
-                            'duration_seconds': time.time() - step_start_time,
+                            'duration_seconds': time.perf_counter() - step_t0,
                             'params': params
                         }
                         result.execution_history.append(execution_record)
                         group_result['steps_executed'].append(step_name)
 
                         # Update context with action result（与 phases 执行逻辑保持一致）
-                        if self._execution_context:
-                            context_payload = action_result.get('context', {})
-                            if isinstance(context_payload, dict):
-                                is_snapshot = (
-                                    'data' in context_payload
-                                    and 'timestamp' in context_payload
-                                    and ('workflow_name' in context_payload or 'state' in context_payload)
-                                )
-                                if is_snapshot:
-                                    self._execution_context.restore_from_snapshot(context_payload)
-                                else:
-                                    for key, value in context_payload.items():
-                                        if key == 'current_url' and isinstance(value, str):
-                                            self._execution_context.update_url(value)
-                                        self._execution_context.set_data(key, value)
+                        self._apply_context_payload(action_result.get('context', {}))
 
                     except Exception as step_error:
                         if is_optional:
@@ -242,20 +265,22 @@ class WorkflowExecutor:
                                 'status': 'skipped',
                                 'error': str(step_error),
                                 'timestamp': self._get_timestamp(),
-                                'duration_seconds': time.time() - step_start_time,
+                                'duration_seconds': time.perf_counter() - step_t0,
                                 'params': params
                             }
                             result.execution_history.append(execution_record)
                             continue
 
                         group_result['success'] = False
+                        # 同一次失败的 error_history 与 execution_history 共用一个时间戳
+                        failed_at = self._get_timestamp()
                         if record_error_history:
                             result.overall_success = False
                             result.error_history.append({
                                 'phase': group_name,
                                 'step': step_name,
                                 'error': str(step_error),
-                                'timestamp': self._get_timestamp()
+                                'timestamp': failed_at
                             })
 
                         execution_record = {
@@ -264,8 +289,8 @@ class WorkflowExecutor:
                             'action': step_name,
                             'status': 'failure',
                             'error': str(step_error),
-                            'timestamp': self._get_timestamp(),
-                            'duration_seconds': time.time() - step_start_time,
+                            'timestamp': failed_at,
+                            'duration_seconds': time.perf_counter() - step_t0,
                             'params': params
                         }
                         result.execution_history.append(execution_record)
@@ -309,7 +334,7 @@ class WorkflowExecutor:
                 phase_last_required_success = True
                 phase_last_required_error: Optional[str] = None
                 for step_index, step in enumerate(phase.steps):
-                    step_start_time = time.time()
+                    step_t0 = time.perf_counter()
 
                     # Get step name from action
                     step_name = step.get_step_name()
@@ -324,13 +349,7 @@ class WorkflowExecutor:
                         is_optional = bool(params.get('optional', False))
 
                         # Execute the action (4分钟以上单步等待即中止，用于快速发现卡点)
-                        if self.max_step_duration_ms and self.max_step_duration_ms > 0:
-                            action_result = await asyncio.wait_for(
-                                self.execute_single_action(step_name, params),
-                                timeout=float(self.max_step_duration_ms) / 1000.0,
-                            )
-                        else:
-                            action_result = await self.execute_single_action(step_name, params)
+                        action_result, from_cache = await self._run_step_action(step_name, params)
                         if not action_result.get('success', False):
                             raise RuntimeError(str(action_result.get('error') or f"{step_name} failed"))
 
@@ -339,9 +358,9 @@ class WorkflowExecutor:
                             'phase': phase.name,
                             'step': step_name,
                             'action': step_name,
-                            'status': 'success',
+                            'status': 'cached' if from_cache else 'success',
                             'timestamp': self._get_timestamp(),
-                            'duration_seconds': time.time() - step_start_time,
+                            'duration_seconds': time.perf_counter() - step_t0,
                             'params': params  # Add actual parameters used
                         }
                         result.execution_history.append(execution_record)
@@ -352,21 +371,7 @@ class WorkflowExecutor:
                             phase_last_required_error = None
 
                         # Update context with action result
-                        if self._execution_context:
-                            context_payload = action_result.get('context', {})
-                            if isinstance(context_payload, dict):
-                                is_snapshot = (
-                                    'data' in context_payload
-                                    and 'timestamp' in context_payload
-                                    and ('workflow_name' in context_payload or 'state' in context_payload)
-                                )
-                                if is_snapshot:
-                                    self._execution_context.restore_from_snapshot(context_payload)
-                                else:
-                                    for key, value in context_payload.items():
-                                        if key == 'current_url' and isinstance(value, str):
-                                            self._execution_context.update_url(value)
-                                        self._execution_context.set_data(key, value)
+                        self._apply_context_payload(action_result.get('context', {}))
 
                     except Exception as step_error:
                         if 'params' not in locals():
@@ -382,7 +387,7 @@ class WorkflowExecutor:
                                 'status': 'skipped',
                                 'error': str(step_error),
                                 'timestamp': self._get_timestamp(),
-                                'duration_seconds': time.time() - step_start_time,
+                                'duration_seconds': time.perf_counter() - step_t0,
                                 'params': params
                             }
                             result.execution_history.append(execution_record)
@@ -403,15 +408,16 @@ class WorkflowExecutor:
                         phase_last_required_success = False
                         phase_last_required_error = str(step_error)
 
-                        # Record step failure
+                        # Record step failure（与 error_history 共用一个时间戳）
+                        failed_at = self._get_timestamp()
                         execution_record = {
                             'phase': phase.name,
                             'step': step_name,
                             'action': step_name,
                             'status': 'failed',
                             'error': str(step_error),
-                            'timestamp': self._get_timestamp(),
-                            'duration_seconds': time.time() - step_start_time
+                            'timestamp': failed_at,
+                            'duration_seconds': time.perf_counter() - step_t0
                         }
                         result.execution_history.append(execution_record)
 
@@ -420,7 +426,7 @@ class WorkflowExecutor:
                             'phase': phase.name,
                             'step': step_name,
                             'error': str(step_error),
-                            'timestamp': self._get_timestamp()
+                            'timestamp': failed_at
                         })
 
                         # 失败不直接中断整个 phase：继续执行后续步骤用于错误恢复
@@ -464,6 +470,8 @@ class WorkflowExecutor:
             result.final_context = self._execution_context.create_snapshot()
             result.overall_success = all(p.get('success', False) for p in result.phase_results)
 
+            await self._drain_background_tasks()
+
             # Stop MCP observation and collect evidence
             if self.mcp_observer:
                 mcp_evidence = await self.mcp_observer.stop_observation()
@@ -499,6 +507,8 @@ class WorkflowExecutor:
             result.duration_seconds = end_time - start_time
             result.final_context = self._execution_context.create_snapshot() if self._execution_context else None
 
+            await self._drain_background_tasks()
+
             # Try to collect MCP evidence even on error
             if self.mcp_observer:
                 try:
@@ -513,6 +523,7 @@ class WorkflowExecutor:
 
         finally:
             self._is_running = False
+            await self._drain_background_tasks()
             try:
                 await self.browser_manager.close()
             except Exception:
@@ -553,12 +564,6 @@ class WorkflowExecutor:
                 await res
             return
 
-        def split_selectors(selector: str) -> List[str]:
-            if not isinstance(selector, str):
-                return []
-            parts = [p.strip() for p in selector.split(',')]
-            return [p for p in parts if p]
-
         def remaining_timeout_ms(start_time: float, total_timeout_ms: int) -> int:
             elapsed_ms = int((time.time() - start_time) * 1000)
             return max(0, int(total_timeout_ms) - elapsed_ms)
@@ -587,7 +592,7 @@ class WorkflowExecutor:
             url = params.get('url')
             if not url:
                 raise ValueError("open_page requires 'url'")
-            ok = await self.browser_manager.navigate_to(url, timeout=params.get('timeout'))
+            ok = await self.browser_manager.navigate_to(url, timeout=params.get('timeout'), wait_until=params.get('wait_until'))
             if not ok:
                 raise RuntimeError(f"Failed to open page: {url}")
             self._execution_context.update_url(await self.browser_manager.get_page_url())
@@ -616,35 +621,42 @@ class WorkflowExecutor:
             poll_ms = int(((self.config.get('execution', {}) or {}).get('wait_poll_interval_ms', 2000)))
             if poll_ms <= 0:
                 poll_ms = 2000
-            # 多候选等待必须轮询所有候选：否则第一个候选耗尽 timeout，会导致后续候选“几乎不被尝试”，造成不必要的失败/波动。
-            # 参考 click 分支的 chunk/poll 机制。
-            if int(timeout_ms) <= int(poll_ms) or len(candidates) <= 1:
-                # 对于很短的等待，直接一次性等待，避免把 timeout 裁剪成极小值导致测试不稳定
-                for sel in candidates:
-                    await raise_if_auth_issue()
-                    if await self.browser_manager.wait_for_selector(sel, state=state, timeout=int(timeout_ms)):
-                        ok = True
-                        selector = sel
-                        break
+            if len(candidates) <= 1:
+                if await self.browser_manager.wait_for_selector(candidates[0], state=state, timeout=int(timeout_ms)):
+                    ok = True
+                    selector = candidates[0]
             else:
-                per_candidate_ms = max(250, int(poll_ms) // max(1, len(candidates)))
-                while True:
-                    await raise_if_auth_issue()
-                    remaining = remaining_timeout_ms(start_wait, timeout_ms)
-                    if remaining <= 0:
-                        break
-                    # 本轮最多消耗 poll_ms（近似），均摊给各候选
-                    for sel in candidates:
+                # 多候选并发等待、先满足者胜出：避免顺序轮询时已出现的候选还要排队等其它候选的时间片。
+                # wait_for_selector 失败返回 False 而非抛错，因此需等到有候选成功或全部结束；
+                # 每个 poll_ms 周期仍复查一次认证状态，避免 token 过期导致整段 timeout 白等。
+                tasks = {
+                    asyncio.ensure_future(self.browser_manager.wait_for_selector(sel, state=state, timeout=int(timeout_ms))): sel
+                    for sel in candidates
+                }
+                pending = set(tasks)
+                try:
+                    while pending and not ok:
                         remaining = remaining_timeout_ms(start_wait, timeout_ms)
                         if remaining <= 0:
                             break
-                        chunk = min(int(remaining), int(per_candidate_ms))
-                        if await self.browser_manager.wait_for_selector(sel, state=state, timeout=max(1, chunk)):
-                            ok = True
-                            selector = sel
-                            break
-                    if ok:
-                        break
+                        done, pending = await asyncio.wait(
+                            pending,
+                            timeout=min(remaining, poll_ms) / 1000.0,
+                            return_when=asyncio.FIRST_COMPLETED,
+                        )
+                        # 同一轮多个候选同时满足时，按声明顺序取第一个
+                        for task, sel in tasks.items():
+                            if task in done and not task.cancelled() and task.exception() is None and task.result():
+                                ok = True
+                                selector = sel
+                                break
+                        if not ok and pending:
+                            await raise_if_auth_issue()
+                finally:
+                    for task in pending:
+                        task.cancel()
+                    if pending:
+                        await asyncio.gather(*pending, return_exceptions=True)
             if not ok:
                 raise TimeoutError(f"Timeout waiting for selector: {selector} (state={state})")
 
@@ -984,7 +996,6 @@ class WorkflowExecutor:
         # Environment overrides
         test_url = os.getenv('TEST_URL') or test_cfg.get('url')
         test_prompt = os.getenv('TEST_PROMPT') or test_cfg.get('prompt') or test_cfg.get('test_prompt') or steps_cfg.get('test_prompt')
-        from datetime import datetime
         timestamp = os.getenv('TEST_TIMESTAMP') or datetime.now().strftime("%Y%m%d_%H%M%S")
 
         selectors: Dict[str, Any] = dict(self._adapter_selectors or {})
@@ -1019,6 +1030,61 @@ class WorkflowExecutor:
 
     _PLACEHOLDER_RE = re.compile(r"\$\{([^}]+)\}")
 
+    def _apply_context_payload(self, context_payload: Any) -> None:
+        """把动作结果中的 context 写回执行上下文：完整快照整体恢复，其余按键合并"""
+        if not self._execution_context or not isinstance(context_payload, dict):
+            return
+        is_snapshot = context_payload.get(SNAPSHOT_KIND_KEY) == SNAPSHOT_KIND
+        if not is_snapshot:
+            # 兼容未打标记的旧快照（例如 rewind 缓存中的历史记录）
+            is_snapshot = (
+                'data' in context_payload
+                and 'timestamp' in context_payload
+                and ('workflow_name' in context_payload or 'state' in context_payload)
+            )
+        if is_snapshot:
+            self._execution_context.restore_from_snapshot(context_payload)
+            return
+        self._execution_context.merge(context_payload)
+
+    async def _run_step_action(self, step_name: str, params: Dict[str, Any]) -> Tuple[Dict[str, Any], bool]:
+        """
+        执行单个步骤（受 max_step_duration_ms 限制），返回 (action_result, 是否命中 rewind 缓存)
+
+        仅 params 声明 cacheable: true 的步骤参与缓存：指纹相同（步骤名、参数、上游 context 均未变）
+        时直接复用上次成功结果的 context，不再驱动浏览器。
+        """
+        fp = None
+        if params.get('cacheable') is True:
+            fp = step_fingerprint(step_name, params, self._context_fingerprint())
+            cached = self.rewind_cache.get(fp)
+            if cached is not None:
+                self.logger.info(f"Rewind cache hit, skipping step: {step_name}")
+                return {'success': True, 'context': cached.get('context', {})}, True
+
+        if self.max_step_duration_ms and self.max_step_duration_ms > 0:
+            action_result = await _await_with_timeout(
+                self.execute_single_action(step_name, params),
+                float(self.max_step_duration_ms) / 1000.0,
+            )
+        else:
+            action_result = await self.execute_single_action(step_name, params)
+
+        if fp is not None and action_result.get('success', False):
+            self.rewind_cache.put(fp, {'context': action_result.get('context', {})})
+        return action_result, False
+
+    def _context_fingerprint(self) -> str:
+        """上游执行上下文指纹（只含 URL 与数据，不含 phase/step/时间戳）"""
+        if not self._execution_context:
+            return ''
+        snapshot = self._execution_context.create_snapshot()
+        raw = json.dumps(
+            [snapshot.get('current_url'), snapshot.get('data')],
+            sort_keys=True, default=str, ensure_ascii=False,
+        )
+        return hashlib.blake2b(raw.encode('utf-8'), digest_size=16).hexdigest()
+
     def _resolve_placeholders(self, value: Any) -> Any:
         from models.semantic_variables import resolve_semantic_value
 
@@ -1084,35 +1150,50 @@ class WorkflowExecutor:
             timeout=timeout_ms
         )
 
+    async def _drain_background_tasks(self) -> None:
+        """等待所有失败截图落盘完成（best-effort，忽略异常）"""
+        if self._bg_tasks:
+            await asyncio.gather(*list(self._bg_tasks), return_exceptions=True)
+
     async def _capture_error_screenshot(self, workflow_name: str, phase_name: str, step_name: str) -> None:
         """
         尝试在失败时截图，避免“看起来卡住”但无法定位现场。
         该方法必须是 best-effort：任何异常都不能影响主流程。
+
+        截图在当前步骤内完成（保证画面是失败现场而非后续恢复步骤之后的状态），
+        只有写文件放到后台线程，执行结束前统一等待。
         """
         if not self.screenshot_on_error:
             return
-        take_fn = getattr(self.browser_manager, "take_screenshot", None)
-        if not callable(take_fn):
-            return
-        if getattr(self.browser_manager, "page", None) is None:
+        page = getattr(self.browser_manager, "page", None)
+        if page is None:
             return
 
         try:
-            base = Path(self.screenshots_dir)
-            base.mkdir(parents=True, exist_ok=True)
-
-            def safe(s: str) -> str:
-                return re.sub(r"[^a-zA-Z0-9_.-]+", "_", str(s))[:80]
-
-            filename = f"{safe(workflow_name)}__{safe(phase_name)}__{safe(step_name)}__{int(time.time())}.png"
-            path = base / filename
             # 远端页面可能因字体/资源加载较慢导致 screenshot 超时；提高超时以保证证据采集稳定性。
-            ok = await take_fn(str(path), timeout=60000, full_page=False)
-            if ok:
-                self.logger.info(f"失败截图已保存: {path}")
+            data = await page.screenshot(timeout=60000, full_page=False)
         except Exception:
             return
 
+        def safe(s: str) -> str:
+            return re.sub(r"[^a-zA-Z0-9_.-]+", "_", str(s))[:80]
+
+        filename = f"{safe(workflow_name)}__{safe(phase_name)}__{safe(step_name)}__{int(time.time())}.png"
+        task = asyncio.ensure_future(self._write_error_screenshot(Path(self.screenshots_dir) / filename, data))
+        self._bg_tasks.add(task)
+        task.add_done_callback(self._bg_tasks.discard)
+
+    async def _write_error_screenshot(self, path: Path, data: bytes) -> None:
+        def _write() -> None:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_bytes(data)
+
+        try:
+            await asyncio.get_running_loop().run_in_executor(None, _write)
+            self.logger.info(f"失败截图已保存: {path}")
+        except Exception as e:
+            self.logger.warning(f"失败截图写入失败: {path}: {e}")
+
     async def _ensure_baseline_story_cards(self, min_cards: int = 1) -> None:
         """
         确保 AI创作/剧本列表至少存在 min_cards 个剧本卡片；为空则自动创建一个“基线剧本”。
@@ -1374,7 +1455,6 @@ class WorkflowExecutor:
 
     def _get_timestamp(self) -> str:
         """Get current timestamp in ISO format"""
-        from datetime import datetime
         return datetime.now().isoformat()
 
     def _execution_result_to_dict(self, result: ExecutionResult) -> Dict[str, Any]:
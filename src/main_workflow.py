@@ -100,57 +100,20 @@ async def main():
             sys.exit(1)
 
     try:
-        # Setup logging
-        config_loader = ConfigLoader(args.config)
-        config = config_loader.load_config()
-        setup_logging(config.get("logging", {}))
-
-        logger = logging.getLogger(__name__)
-
-        # Load workflow
-        workflow = await load_workflow(args.workflow)
-        logger.info(f"Loaded workflow: {workflow.name}")
-
-        # Initialize components
-        browser_manager = BrowserManager(config)
-        await browser_manager.initialize()
-
-        if args.report_dir:
-            config.setdefault("reporting", {})
-            config["reporting"]["output_dir"] = args.report_dir
-
-        # MCP observation is optional; keep disabled by default for now
-        mcp_observer = None
-
-        reporter = DecisionReporter(config)
-        issue_gen = IssueGenerator()
-
-        # Create executor
-        executor = WorkflowExecutor(config, browser_manager, mcp_observer)
-
-        # Execute workflow
-        result = await executor.execute_workflow(workflow)
-
-        # Generate and save report
-        report = reporter.generate_report(result)
-        saved_files = reporter.save_report(report)
-
-        logger.info("Report generated and saved:")
-        for format_type, filepath in saved_files.items():
-            logger.info(f"  {format_type.upper()}: {filepath}")
+        outcome = await run_workflow(
+            args.workflow, config_path=args.config, report_dir=args.report_dir
+        )
+        workflow_name = outcome["workflow_name"]
+        result = outcome["result"]
 
         # Output result
         if result.get("overall_success"):
-            print(f"✅ Workflow '{workflow.name}' completed successfully")
+            print(f"✅ Workflow '{workflow_name}' completed successfully")
         else:
             error_msg = result.get("error", {}).get("error", "Unknown error")
-            print(f"❌ Workflow '{workflow.name}' failed: {error_msg}")
-
-            # Auto-generate Issue
-            issue_path = issue_gen.generate_issue(workflow.name, result, config)
-            if issue_path:
-                print(f"📝 Auto-created Issue report: {issue_path}")
-                logger.info(f"Auto-created Issue report: {issue_path}")
+            print(f"❌ Workflow '{workflow_name}' failed: {error_msg}")
+            if outcome.get("issue_path"):
+                print(f"📝 Auto-created Issue report: {outcome['issue_path']}")
 
         # Exit with appropriate code
         sys.exit(0 if result.get("overall_success") else 1)
@@ -170,6 +133,79 @@ async def main():
         pass
 
 
+async def run_workflow(
+    workflow_path: str,
+    *,
+    config_path: str = "config/config.yaml",
+    report_dir: Optional[str] = None,
+    setup_logs: bool = True,
+) -> Dict[str, Any]:
+    """
+    Execute a single workflow in-process
+
+    Args:
+        workflow_path: Path to workflow YAML file
+        config_path: Configuration file path
+        report_dir: Override report output directory
+        setup_logs: Whether to (re)configure root logging from config
+
+    Returns:
+        Dict with workflow_name, result, saved_files and issue_path
+    """
+    config_loader = ConfigLoader(config_path)
+    config = config_loader.load_config()
+    if setup_logs:
+        setup_logging(config.get("logging", {}))
+
+    logger = logging.getLogger(__name__)
+
+    # Load workflow
+    workflow = await load_workflow(workflow_path)
+    logger.info(f"Loaded workflow: {workflow.name}")
+
+    # Initialize components
+    browser_manager = BrowserManager(config)
+    await browser_manager.initialize()
+
+    if report_dir:
+        config.setdefault("reporting", {})
+        config["reporting"]["output_dir"] = report_dir
+
+    # MCP observation is optional; keep disabled by default for now
+    mcp_observer = None
+
+    reporter = DecisionReporter(config)
+    issue_gen = IssueGenerator()
+
+    # Create executor
+    executor = WorkflowExecutor(config, browser_manager, mcp_observer)
+
+    # Execute workflow
+    result = await executor.execute_workflow(workflow)
+
+    # Generate and save report
+    report = reporter.generate_report(result)
+    saved_files = reporter.save_report(report)
+
+    logger.info("Report generated and saved:")
+    for format_type, filepath in saved_files.items():
+        logger.info(f"  {format_type.upper()}: {filepath}")
+
+    issue_path = None
+    if not result.get("overall_success"):
+        # Auto-generate Issue
+        issue_path = issue_gen.generate_issue(workflow.name, result, config)
+        if issue_path:
+            logger.info(f"Auto-created Issue report: {issue_path}")
+
+    return {
+        "workflow_name": workflow.name,
+        "result": result,
+        "saved_files": saved_files,
+        "issue_path": issue_path,
+    }
+
+
 async def load_workflow(workflow_path: str) -> Workflow:
     """
     Load workflow from file
@@ -4,6 +4,10 @@ from typing import Dict, Any, Optional
 from threading import Lock
 import copy
 
+# create_snapshot 产出的快照带此标记，消费方据此一次判定“整体恢复”而非按键合并
+SNAPSHOT_KIND_KEY = '__kind__'
+SNAPSHOT_KIND = 'snapshot'
+
 
 class Context:
     """
@@ -43,6 +47,17 @@ class Context:
             self.current_url = url
             self._save_snapshot(f"url={url}")
 
+    def merge(self, payload: Dict[str, Any]) -> None:
+        """批量写入 state（current_url 同步更新 URL），只加锁并记录历史快照一次"""
+        if not payload:
+            return
+        with self._lock:
+            url = payload.get('current_url')
+            if isinstance(url, str):
+                self.current_url = url
+            self._state.update(payload)
+            self._save_snapshot(f"merge {', '.join(map(str, payload))}")
+
     def update_phase(self, phase: str) -> None:
         """Update current phase atomically"""
         with self._lock:
@@ -75,6 +90,7 @@ class Context:
         """Create current state snapshot"""
         with self._lock:
             snapshot = {
+                SNAPSHOT_KIND_KEY: SNAPSHOT_KIND,
                 'workflow_name': self.workflow_name,
                 'current_phase': self.current_phase,
                 'current_step': self.current_step,
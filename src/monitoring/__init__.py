@@ -10,7 +10,8 @@ from .performance_monitor import (
     reset_performance_monitor,
     PerformanceThreshold,
     AIGenerationMetrics,
-    SystemResourceMetrics
+    SystemResourceMetrics,
+    PhaseCheckpoint
 )
 
 __all__ = [
@@ -19,5 +20,6 @@ __all__ = [
     'reset_performance_monitor',
     'PerformanceThreshold',
     'AIGenerationMetrics',
-    'SystemResourceMetrics'
+    'SystemResourceMetrics',
+    'PhaseCheckpoint'
 ]
\ No newline at end of file
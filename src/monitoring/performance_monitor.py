@@ -53,6 +53,17 @@ class SystemResourceMetrics:
     timestamp: float = None
 
 
+@dataclass
+class PhaseCheckpoint:
+    """阶段检查点"""
+    session_id: str
+    name: str
+    start_time: float
+    end_time: Optional[float] = None
+    duration: Optional[float] = None
+    success: Optional[bool] = None
+
+
 class PerformanceMonitor:
     """性能监控器"""
 
@@ -69,6 +80,9 @@ class PerformanceMonitor:
         self.system_metrics: List[SystemResourceMetrics] = []
         self.thresholds: Dict[str, PerformanceThreshold] = {}
         self.active_timers: Dict[str, Timer] = {}
+        self.checkpoints: List[PhaseCheckpoint] = []
+        # (session_id, name) -> 尚未结束的检查点
+        self._open_checkpoints: Dict[tuple, PhaseCheckpoint] = {}
 
         # 初始化性能阈值
         self._init_thresholds()
@@ -170,6 +184,52 @@ class PerformanceMonitor:
         self.logger.info(f"停止性能监控: {monitor_id}, 耗时: {duration_ms:.2f}ms")
         return metrics
 
+    def start_checkpoint(self, session_id: str, name: str, timestamp: Optional[float] = None) -> PhaseCheckpoint:
+        """记录阶段开始；timestamp 为调用方打点时刻，缺省取当前时间"""
+        checkpoint = PhaseCheckpoint(
+            session_id=session_id,
+            name=name,
+            start_time=timestamp if timestamp is not None else time.time()
+        )
+        self.checkpoints.append(checkpoint)
+        self._open_checkpoints[(session_id, name)] = checkpoint
+        return checkpoint
+
+    def end_checkpoint(
+        self,
+        session_id: str,
+        name: str,
+        duration: float,
+        success: bool,
+        timestamp: Optional[float] = None
+    ) -> PhaseCheckpoint:
+        """记录阶段结束；没有对应的开始记录时按 timestamp - duration 补一条"""
+        end_time = timestamp if timestamp is not None else time.time()
+        checkpoint = self._open_checkpoints.pop((session_id, name), None)
+        if checkpoint is None:
+            checkpoint = PhaseCheckpoint(session_id=session_id, name=name, start_time=end_time - duration)
+            self.checkpoints.append(checkpoint)
+        checkpoint.end_time = end_time
+        checkpoint.duration = duration
+        checkpoint.success = success
+        return checkpoint
+
+    def batch_record(self, items: List[tuple]):
+        """
+        批量提交检查点
+
+        Args:
+            items: (kind, args, timestamp) 列表，kind 为 "start" 或 "end"，
+                args 为对应 start_checkpoint / end_checkpoint 的位置参数
+        """
+        for kind, args, ts in items:
+            if kind == "start":
+                self.start_checkpoint(*args, timestamp=ts)
+            elif kind == "end":
+                self.end_checkpoint(*args, timestamp=ts)
+            else:
+                raise ValueError(f"未知检查点类型: {kind}")
+
     def _get_current_resource_usage(self) -> Dict[str, float]:
         """获取当前资源使用情况"""
         try:
@@ -261,6 +321,7 @@ class PerformanceMonitor:
             'summary': self._generate_summary(),
             'ai_generation_metrics': [asdict(m) for m in self.metrics],
             'system_metrics': [asdict(m) for m in self.system_metrics],
+            'phase_checkpoints': [asdict(c) for c in self.checkpoints],
             'threshold_violations': self._get_threshold_violations(),
             'recommendations': self._generate_recommendations()
         }
@@ -393,6 +454,8 @@ class PerformanceMonitor:
         self.metrics.clear()
         self.system_metrics.clear()
         self.active_timers.clear()
+        self.checkpoints.clear()
+        self._open_checkpoints.clear()
         self._system_monitor_active = False
         self.logger.info("性能监控数据已重置")
 
@@ -0,0 +1,50 @@
+import asyncio
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+src_path = str(PROJECT_ROOT / "src")
+if src_path not in sys.path:
+    sys.path.insert(0, src_path)
+
+from core.async_bridge import AsyncLoopThread
+
+
+async def _value(v):
+    return v
+
+
+def test_run_is_not_blocked_by_hung_job_and_timeout_cancels_it():
+    bridge = AsyncLoopThread(name="test-async-bridge", run_timeout=0.5)
+    cancelled = threading.Event()
+
+    async def hang():
+        try:
+            await asyncio.sleep(30)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    errors = []
+    worker = threading.Thread(target=lambda: errors.append(pytest.raises(TimeoutError, bridge.run, hang())))
+    worker.start()
+    time.sleep(0.05)
+    try:
+        started = time.perf_counter()
+        assert bridge.run(_value(1)) == 1
+        assert time.perf_counter() - started < 0.3
+
+        worker.join()
+        assert errors
+        assert cancelled.wait(1)
+        assert [bridge.run(_value(i)) for i in range(3)] == [0, 1, 2]
+    finally:
+        bridge.stop()
+
+    with pytest.raises(RuntimeError):
+        bridge.run(_value(2))
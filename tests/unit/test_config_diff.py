@@ -0,0 +1,61 @@
+import sys
+from pathlib import Path
+
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+src_path = str(PROJECT_ROOT / "src")
+if src_path not in sys.path:
+    sys.path.insert(0, src_path)
+
+from core.migration.config_diff import diff_dicts
+
+
+def test_diff_dicts_reports_removed_added_and_changed_in_order():
+    a = {"x": 1, "nested": {"keep": 1, "old": 2, "val": "a"}, "gone": True}
+    b = {"x": 1, "nested": {"keep": 1, "new": 3, "val": "b"}, "extra": [1]}
+
+    assert diff_dicts(a, b) == [
+        {"type": "removed", "path": "gone", "before": True},
+        {"type": "added", "path": "extra", "after": [1]},
+        {"type": "removed", "path": "nested.old", "before": 2},
+        {"type": "added", "path": "nested.new", "after": 3},
+        {"type": "changed", "path": "nested.val", "before": "a", "after": "b"},
+    ]
+
+
+def test_diff_dicts_handles_nesting_beyond_recursion_limit():
+    depth = 10_000
+    a: dict = {"leaf": 1}
+    b: dict = {"leaf": 2}
+    for _ in range(depth):
+        a = {"k": a}
+        b = {"k": b}
+
+    diffs = diff_dicts(a, b)
+
+    assert len(diffs) == 1
+    assert diffs[0]["path"] == ".".join(["k"] * depth + ["leaf"])
+    assert (diffs[0]["before"], diffs[0]["after"]) == (1, 2)
+
+
+def test_diff_dicts_recurses_into_lists_element_wise():
+    a = {"steps": [{"name": "a", "timeout": 1}, {"name": "b"}, "tail"]}
+    b = {"steps": [{"name": "a", "timeout": 2}, {"name": "b"}]}
+
+    assert diff_dicts(a, b) == [
+        {"type": "removed", "path": "steps[2]", "before": "tail"},
+        {"type": "changed", "path": "steps[0].timeout", "before": 1, "after": 2},
+    ]
+
+
+def test_diff_dicts_aligns_lists_by_key():
+    a = {"plugins": [{"name": "x", "on": True}, {"name": "y", "on": True}]}
+    b = {"plugins": [{"name": "z", "on": True}, {"name": "x", "on": False}]}
+
+    diffs = diff_dicts(a, b, list_key=lambda item: item.get("name") if isinstance(item, dict) else None)
+
+    assert diffs == [
+        {"type": "removed", "path": "plugins[y]", "before": {"name": "y", "on": True}},
+        {"type": "added", "path": "plugins[z]", "after": {"name": "z", "on": True}},
+        {"type": "changed", "path": "plugins[x].on", "before": True, "after": False},
+    ]
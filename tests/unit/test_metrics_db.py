@@ -0,0 +1,83 @@
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+src_path = str(PROJECT_ROOT / "src")
+if src_path not in sys.path:
+    sys.path.insert(0, src_path)
+
+from core.monitoring.metrics_db import MetricsDB
+
+
+def _scan_counts(db: MetricsDB, domain: str) -> Counter:
+    return Counter(str(r["data"].get("event_type") or "") for r in db.query(domain))
+
+
+def test_incremental_counts_match_records(tmp_path):
+    persist = tmp_path / "metrics.jsonl"
+    db = MetricsDB(persist_path=str(persist))
+    for i in range(20):
+        db.record("task", {"event_type": "task.completed" if i % 3 else "task.failed"})
+    db.record("task", {"value": 1})
+    db.record("file", {"event_type": "file.download_completed"})
+
+    assert db.event_type_counts("task") == _scan_counts(db, "task")
+    assert db.count_event_type("task", "task.failed") == 7
+    assert db.count_event_types("task", ["task.completed", "missing"]) == {"task.completed": 13, "missing": 0}
+
+    db.close()
+    replayed = MetricsDB(persist_path=str(persist))
+    for domain in ("task", "file"):
+        assert replayed.event_type_counts(domain) == _scan_counts(replayed, domain)
+        assert replayed.event_type_counts(domain) == db.event_type_counts(domain)
+
+
+def test_ring_buffer_evicts_oldest_and_keeps_counts_consistent():
+    db = MetricsDB(max_records_per_domain=5)
+    for i in range(8):
+        db.record("task", {"event_type": "task.failed" if i < 3 else "task.completed", "i": i})
+
+    assert [r["data"]["i"] for r in db.query("task")] == [3, 4, 5, 6, 7]
+    assert db.event_type_counts("task") == _scan_counts(db, "task") == Counter({"task.completed": 5})
+    assert db.evicted == 3
+
+
+def test_buffered_records_are_flushed_after_interval_without_further_writes(tmp_path):
+    persist = tmp_path / "metrics.jsonl"
+    db = MetricsDB(persist_path=str(persist), flush_every=100, flush_interval=0.05)
+    db.record("task", {"event_type": "task.completed"})
+    db.record("task", {"event_type": "task.failed"})
+
+    deadline = time.monotonic() + 2
+    while persist.read_bytes().count(b"\n") < 2 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert persist.read_bytes().count(b"\n") == 2
+    db.close()
+
+
+def test_default_replay_keeps_full_history_beyond_service_cap(tmp_path):
+    persist = tmp_path / "metrics.jsonl"
+    writer = MetricsDB(persist_path=str(persist), max_records_per_domain=10)
+    for i in range(25):
+        writer.record("task", {"event_type": "task.failed" if i < 5 else "task.completed"})
+    writer.close()
+    assert writer.count_event_types("task", ["task.completed", "task.failed"]) == {"task.completed": 10, "task.failed": 0}
+
+    replayed = MetricsDB(persist_path=str(persist))
+    assert replayed.count_event_types("task", ["task.completed", "task.failed"]) == {"task.completed": 20, "task.failed": 5}
+    assert replayed.evicted == 0
+
+    from core.migration.baseline_compare import compare_event_ratio_slo
+
+    result = compare_event_ratio_slo(
+        baseline_path=str(persist),
+        current_path=str(persist),
+        domain="task",
+        numerator_event="task.completed",
+        denominator_events=["task.completed", "task.failed"],
+    )
+    assert result["baseline_counts"] == {"numerator": 20, "denominator": 25}
+    assert result["baseline_value"] == 0.8
@@ -0,0 +1,42 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+pytest.importorskip("psutil")
+
+from src.monitoring.performance_monitor import PerformanceMonitor
+
+
+def test_batch_record_keeps_enqueue_timestamps():
+    monitor = PerformanceMonitor({})
+    monitor.batch_record([
+        ("start", ("s1", "phase_0_login"), 100.0),
+        ("end", ("s1", "phase_0_login", 2.5, True), 102.5),
+        ("start", ("s1", "phase_1_create"), 103.0),
+    ])
+    monitor.end_checkpoint("s1", "phase_1_create", 1.0, False, timestamp=104.0)
+
+    first, second = monitor.checkpoints
+    assert (first.start_time, first.end_time, first.duration, first.success) == (100.0, 102.5, 2.5, True)
+    assert (second.start_time, second.end_time, second.success) == (103.0, 104.0, False)
+
+    report = monitor.generate_performance_report()
+    assert [c["name"] for c in report["phase_checkpoints"]] == ["phase_0_login", "phase_1_create"]
+
+
+def test_end_without_start_and_unknown_kind():
+    monitor = PerformanceMonitor({})
+    checkpoint = monitor.end_checkpoint("s1", "phase_2_x", 3.0, True, timestamp=10.0)
+    assert checkpoint.start_time == 7.0
+
+    with pytest.raises(ValueError):
+        monitor.batch_record([("pause", ("s1", "phase_2_x"), 11.0)])
+
+    monitor.reset()
+    assert monitor.checkpoints == []
@@ -0,0 +1,70 @@
+import asyncio
+import logging
+import sys
+from pathlib import Path
+
+import pytest
+
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+src_path = str(PROJECT_ROOT / "src")
+if src_path not in sys.path:
+    sys.path.insert(0, src_path)
+
+# executor 包会导入 WorkflowExecutor（依赖 Playwright / psutil）
+pytest.importorskip("playwright")
+pytest.importorskip("psutil")
+
+from executor.rewind_cache import RewindCache, step_fingerprint
+from executor.workflow_executor import WorkflowExecutor
+
+
+def test_put_get_last_write_wins(tmp_path):
+    path = tmp_path / "rewind.jsonl"
+    cache = RewindCache(str(path))
+    assert cache.get("fp1") is None
+    assert cache.put("fp1", {"context": {"a": 1}})
+    assert cache.put("fp1", {"context": {"a": 2}})
+    assert cache.get("fp1") == {"context": {"a": 2}}
+
+    reloaded = RewindCache(str(path))
+    assert reloaded.get("fp1") == {"context": {"a": 2}}
+    assert not reloaded.put("fp2", {"context": {"bad": object()}})
+
+
+def test_evicts_oldest_and_compacts(tmp_path):
+    path = tmp_path / "rewind.jsonl"
+    cache = RewindCache(str(path), max_entries=3)
+    for i in range(150):
+        cache.put(f"fp{i % 5}", {"context": {"i": i}})
+
+    assert [cache.get(f"fp{i}") for i in range(2)] == [None, None]
+    assert cache.get("fp4") == {"context": {"i": 149}}
+    assert len(path.read_text(encoding="utf-8").splitlines()) <= 100
+
+    reloaded = RewindCache(str(path), max_entries=3)
+    assert [reloaded.get(f"fp{i}") for i in range(2, 5)] == [cache.get(f"fp{i}") for i in range(2, 5)]
+
+
+def test_run_step_action_reuses_cached_result(tmp_path):
+    calls = []
+
+    async def execute_single_action(step_name, params):
+        calls.append(step_name)
+        return {"success": True, "context": {"story_id": "s-1"}}
+
+    executor = WorkflowExecutor.__new__(WorkflowExecutor)
+    executor.logger = logging.getLogger(__name__)
+    executor.rewind_cache = RewindCache(str(tmp_path / "rewind.jsonl"))
+    executor.max_step_duration_ms = 0
+    executor._execution_context = None
+    executor.execute_single_action = execute_single_action
+
+    params = {"cacheable": True, "prompt": "hello"}
+    first, first_cached = asyncio.run(executor._run_step_action("create_story", params))
+    second, second_cached = asyncio.run(executor._run_step_action("create_story", params))
+
+    assert (first_cached, second_cached) == (False, True)
+    assert second == {"success": True, "context": {"story_id": "s-1"}}
+    assert calls == ["create_story"]
+    assert executor.rewind_cache.get(step_fingerprint("create_story", params, "")) is not None